@@ -1,7 +1,7 @@
-import configparser
 import logging
 import os
 
+from functools import lru_cache
 from pathlib import Path
 
 API_VERSION = "0.0.1"
@@ -14,94 +14,239 @@ CONFIG_FILE_DIRECTORY = Path(os.path.dirname(__file__)).parent
 # get environment on which API is running
 DEPLOYMENT_ENVIRONMENT = os.environ.get("DEPLOYMENT_NAME") or "development"
 
-# ensure console shows dev environment they are running on:
-log.info("CURRENT DEPLOYMENT ENVIRONMENT: " + DEPLOYMENT_ENVIRONMENT)
-
 # get config file name
 COMMON_CONFIG_FILENAME = "common_secrets.ini"
 SECRETS_CONFIG_FILENAME = f"{DEPLOYMENT_ENVIRONMENT.lower()}_secrets.ini"
 PUBLIC_CONFIG_FILENAME = f"{DEPLOYMENT_ENVIRONMENT.lower()}_config.ini"
 
 
-# define config file parser
-common_config_file_parser = configparser.ConfigParser()
-public_config_file_parser = configparser.ConfigParser()
-secrets_config_file_parser = configparser.ConfigParser()
-
-# get folder for path for config files
-public_config_files_folder_path = os.path.join(CONFIG_FILE_DIRECTORY, "config/public/" + PUBLIC_CONFIG_FILENAME)
-common_config_files_folder_path = os.path.join(CONFIG_FILE_DIRECTORY, "config/secret/" + COMMON_CONFIG_FILENAME)
-secret_config_files_folder_path = os.path.join(CONFIG_FILE_DIRECTORY, "config/secret/" + SECRETS_CONFIG_FILENAME)
-
-# check if specific config files are present
-if not os.path.isfile(common_config_files_folder_path):
-    raise Exception(f"Missing Common Config File: {COMMON_CONFIG_FILENAME}")
-
-if not os.path.isfile(public_config_files_folder_path):
-    raise Exception(f"Missing Config File: {PUBLIC_CONFIG_FILENAME}")
-
-# read files from config file paths
-common_config_file_parser.read(common_config_files_folder_path)
-public_config_file_parser.read(public_config_files_folder_path)
-secrets_config_file_parser.read(secret_config_files_folder_path)
-
-# get deployment name
-DEPLOYMENT_NAME = public_config_file_parser["APP"]["DEPLOYMENT_NAME"]
-
-# check that the deployment name specified by the env matches the one in the config file
-if DEPLOYMENT_ENVIRONMENT.lower() != DEPLOYMENT_NAME.lower():
-    raise RuntimeError(
-        f"deployment name in env ({DEPLOYMENT_ENVIRONMENT.lower()}) does not match that in config ({DEPLOYMENT_NAME.lower()}), aborting"
-    )
-
-# define checks for deployment environment
-IS_TEST = public_config_file_parser["APP"].getboolean("IS_TEST")
-IS_PRODUCTION = public_config_file_parser["APP"].getboolean("IS_PRODUCTION")
-
-# get application configs
-SECRET_KEY = secrets_config_file_parser["APP"].get("secret_key")
-APP_HOST = public_config_file_parser["APP"].get("host")
-APP_PORT = public_config_file_parser["APP"].get("port")
-APP_DOMAIN = public_config_file_parser["APP"].get("client_domain")
-DEFAULT_COUNTRY = public_config_file_parser["APP"].get("default_country")
-
-# define redis configs
-REDIS_URL = "redis://" + public_config_file_parser["REDIS"].get("uri")
-
-# get database configs
-DATABASE_USER = public_config_file_parser["DATABASE"].get("user")
-DATABASE_PASSWORD = public_config_file_parser["DATABASE"].get("password")
-DATABASE_HOST = public_config_file_parser["DATABASE"].get("host")
-DATABASE_NAME = public_config_file_parser["DATABASE"].get("database")
-DATABASE_PORT = public_config_file_parser["DATABASE"].get("port")
-
-
-def get_database_uri(name, host, censored=True):
-    return f'postgresql://{DATABASE_USER}:{"*******" if censored else DATABASE_PASSWORD}@{host}:{DATABASE_PORT}/{name}'
-
-
-SQLALCHEMY_DATABASE_URI = get_database_uri(DATABASE_NAME, DATABASE_HOST, censored=False)
-
-# build censored uri for logging
-CENSORED_URI = get_database_uri(DATABASE_NAME, DATABASE_HOST, censored=True)
-
-log.info("Working database URI: " + CENSORED_URI)
-
-SQLALCHEMY_TRACK_MODIFICATIONS = False
-
-# get password pepper
-PASSWORD_PEPPER = secrets_config_file_parser["APP"].get("password_pepper")
-
-# get africa's talking credentials
-AFRICASTALKING_USERNAME = secrets_config_file_parser["AFRICASTALKING"].get("username")
-AFRICASTALKING_API_KEY = secrets_config_file_parser["AFRICASTALKING"].get("api_key")
-
-# define mailer settings
-MAILER_SERVER = common_config_file_parser["MAILER"].get("server")
-MAILER_PORT = common_config_file_parser["MAILER"].get("port")
-MAILER_USERNAME = common_config_file_parser["MAILER"].get("username")
-MAILER_PASSWORD = common_config_file_parser["MAILER"].get("password")
-MAILER_DEFAULT_SENDER = common_config_file_parser["MAILER"].get("default_sender")
-MAILER_MAX_EMAILS = common_config_file_parser["MAILER"].get("max_emails")
-MAILER_USE_SSL = common_config_file_parser["MAILER"].getboolean("use_ssl")
-MAILER_USE_TSL = common_config_file_parser["MAILER"].getboolean("use_tsl")
+class Settings:
+    """
+    Application settings read from the deployment's config files.
+    """
+
+    def __init__(self):
+        # imported here so importing this module stays cheap until settings are first read
+        import configparser
+
+        # ensure console shows dev environment they are running on:
+        log.info("CURRENT DEPLOYMENT ENVIRONMENT: " + DEPLOYMENT_ENVIRONMENT)
+
+        # define config file parser
+        common_config_file_parser = configparser.ConfigParser()
+        public_config_file_parser = configparser.ConfigParser()
+        secrets_config_file_parser = configparser.ConfigParser()
+
+        # get folder for path for config files
+        public_config_files_folder_path = os.path.join(
+            CONFIG_FILE_DIRECTORY, "config/public/" + PUBLIC_CONFIG_FILENAME
+        )
+        common_config_files_folder_path = os.path.join(
+            CONFIG_FILE_DIRECTORY, "config/secret/" + COMMON_CONFIG_FILENAME
+        )
+        secret_config_files_folder_path = os.path.join(
+            CONFIG_FILE_DIRECTORY, "config/secret/" + SECRETS_CONFIG_FILENAME
+        )
+
+        # check if specific config files are present
+        if not os.path.isfile(common_config_files_folder_path):
+            raise Exception(f"Missing Common Config File: {COMMON_CONFIG_FILENAME}")
+
+        if not os.path.isfile(public_config_files_folder_path):
+            raise Exception(f"Missing Config File: {PUBLIC_CONFIG_FILENAME}")
+
+        # read files from config file paths
+        common_config_file_parser.read(common_config_files_folder_path)
+        public_config_file_parser.read(public_config_files_folder_path)
+        secrets_config_file_parser.read(secret_config_files_folder_path)
+
+        # get deployment name
+        self.DEPLOYMENT_NAME = public_config_file_parser["APP"]["DEPLOYMENT_NAME"]
+
+        # check that the deployment name specified by the env matches the one in the config file
+        if DEPLOYMENT_ENVIRONMENT.lower() != self.DEPLOYMENT_NAME.lower():
+            raise RuntimeError(
+                f"deployment name in env ({DEPLOYMENT_ENVIRONMENT.lower()}) does not match that in config ({self.DEPLOYMENT_NAME.lower()}), aborting"
+            )
+
+        # define checks for deployment environment
+        self.IS_TEST = public_config_file_parser["APP"].getboolean("IS_TEST")
+        self.IS_PRODUCTION = public_config_file_parser["APP"].getboolean(
+            "IS_PRODUCTION"
+        )
+
+        # get application configs
+        self.SECRET_KEY = secrets_config_file_parser["APP"].get("secret_key")
+        self.APP_HOST = public_config_file_parser["APP"].get("host")
+        self.APP_PORT = public_config_file_parser["APP"].get("port")
+        self.APP_DOMAIN = public_config_file_parser["APP"].get("client_domain")
+        self.DEFAULT_COUNTRY = public_config_file_parser["APP"].get("default_country")
+
+        # define redis configs
+        self.REDIS_URL = "redis://" + public_config_file_parser["REDIS"].get("uri")
+
+        # define cache configs
+        self.BLACKLIST_CACHE_MAX_SIZE = public_config_file_parser["CACHE"].getint(
+            "blacklist_max_size"
+        )
+        self.BLACKLIST_CACHE_NEGATIVE_TTL = public_config_file_parser["CACHE"].getint(
+            "blacklist_negative_ttl"
+        )
+        self.TOKEN_VERSION_CACHE_MAX_SIZE = public_config_file_parser["CACHE"].getint(
+            "token_version_max_size"
+        )
+        self.TOKEN_VERSION_CACHE_TTL = public_config_file_parser["CACHE"].getint(
+            "token_version_ttl"
+        )
+        self.ORGANIZATION_CACHE_MAX_SIZE = public_config_file_parser["CACHE"].getint(
+            "organization_max_size"
+        )
+        self.ORGANIZATION_CACHE_TTL = public_config_file_parser["CACHE"].getint(
+            "organization_ttl"
+        )
+        self.ORGANIZATION_MAILER_CACHE_MAX_SIZE = public_config_file_parser[
+            "CACHE"
+        ].getint("organization_mailer_max_size")
+        self.ORGANIZATION_MAILER_CACHE_TTL = public_config_file_parser["CACHE"].getint(
+            "organization_mailer_ttl"
+        )
+
+        # define authentication configs
+        self.AUTH_TRUSTED_CLAIMS = public_config_file_parser["AUTH"].getboolean(
+            "trusted_claims"
+        )
+        self.PASSWORD_HASH_ALGORITHM = public_config_file_parser["AUTH"].get(
+            "password_hash_algorithm"
+        )
+        self.BCRYPT_ROUNDS = public_config_file_parser["AUTH"].getint("bcrypt_rounds")
+        self.ARGON2_TIME_COST = public_config_file_parser["AUTH"].getint(
+            "argon2_time_cost"
+        )
+        self.ARGON2_MEMORY_COST = public_config_file_parser["AUTH"].getint(
+            "argon2_memory_cost"
+        )
+        self.ARGON2_PARALLELISM = public_config_file_parser["AUTH"].getint(
+            "argon2_parallelism"
+        )
+        self.PASSWORD_CHECK_POOL_SIZE = public_config_file_parser["AUTH"].getint(
+            "password_check_pool_size"
+        )
+        self.OTP_LENGTH = public_config_file_parser["AUTH"].getint("otp_length")
+        self.OTP_MAX_ATTEMPTS = public_config_file_parser["AUTH"].getint(
+            "otp_max_attempts"
+        )
+        self.OTP_TTL = public_config_file_parser["AUTH"].getint("otp_ttl")
+
+        # define rate limiting configs
+        self.RATE_LIMIT_BACKEND = public_config_file_parser["RATE_LIMIT"].get("backend")
+        self.RATE_LIMIT_IDENTIFIER_LIMIT = public_config_file_parser[
+            "RATE_LIMIT"
+        ].getint("identifier_limit")
+        self.RATE_LIMIT_IP_LIMIT = public_config_file_parser["RATE_LIMIT"].getint(
+            "ip_limit"
+        )
+        self.RATE_LIMIT_PERIOD = public_config_file_parser["RATE_LIMIT"].getint(
+            "period"
+        )
+
+        # define sms configs
+        self.SMS_PROVIDER = public_config_file_parser["SMS"].get("provider")
+        self.SMS_BATCH_DELAY = public_config_file_parser["SMS"].getint("batch_delay")
+        self.SMS_MAX_BATCH_SIZE = public_config_file_parser["SMS"].getint(
+            "max_batch_size"
+        )
+        self.SMS_MAX_RECIPIENTS = public_config_file_parser["SMS"].getint(
+            "max_recipients"
+        )
+        self.SMS_RETRY_BACKOFF = public_config_file_parser["SMS"].getint(
+            "retry_backoff"
+        )
+
+        # define pagination configs
+        self.PAGINATION_DEFAULT_PER_PAGE = public_config_file_parser[
+            "PAGINATION"
+        ].getint("default_per_page")
+        self.PAGINATION_MAX_PER_PAGE = public_config_file_parser["PAGINATION"].getint(
+            "max_per_page"
+        )
+        self.PAGINATION_COUNT_STRATEGY = public_config_file_parser["PAGINATION"].get(
+            "count_strategy"
+        )
+        self.PAGINATION_COUNT_CACHE_TTL = public_config_file_parser[
+            "PAGINATION"
+        ].getint("count_cache_ttl")
+        self.PAGINATION_COUNT_ESTIMATE_THRESHOLD = public_config_file_parser[
+            "PAGINATION"
+        ].getint("count_estimate_threshold")
+
+        # define bulk user import configs
+        self.IMPORT_CHUNK_SIZE = public_config_file_parser["IMPORT"].getint(
+            "chunk_size"
+        )
+        self.IMPORT_HASH_POOL_SIZE = public_config_file_parser["IMPORT"].getint(
+            "hash_pool_size"
+        )
+        self.IMPORT_INSERT_METHOD = public_config_file_parser["IMPORT"].get(
+            "insert_method"
+        )
+        self.IMPORT_JOB_TTL = public_config_file_parser["IMPORT"].getint("job_ttl")
+        self.IMPORT_MAX_UPLOAD_SIZE = public_config_file_parser["IMPORT"].getint(
+            "max_upload_size"
+        )
+
+        # get database configs
+        self.DATABASE_USER = public_config_file_parser["DATABASE"].get("user")
+        self.DATABASE_PASSWORD = public_config_file_parser["DATABASE"].get("password")
+        self.DATABASE_HOST = public_config_file_parser["DATABASE"].get("host")
+        self.DATABASE_NAME = public_config_file_parser["DATABASE"].get("database")
+        self.DATABASE_PORT = public_config_file_parser["DATABASE"].get("port")
+
+        self.SQLALCHEMY_DATABASE_URI = self.get_database_uri(
+            self.DATABASE_NAME, self.DATABASE_HOST, censored=False
+        )
+
+        # build censored uri for logging
+        self.CENSORED_URI = self.get_database_uri(
+            self.DATABASE_NAME, self.DATABASE_HOST, censored=True
+        )
+
+        log.info("Working database URI: " + self.CENSORED_URI)
+
+        self.SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+        # get password pepper
+        self.PASSWORD_PEPPER = secrets_config_file_parser["APP"].get("password_pepper")
+
+        # get africa's talking credentials
+        self.AFRICASTALKING_USERNAME = secrets_config_file_parser["AFRICASTALKING"].get(
+            "username"
+        )
+        self.AFRICASTALKING_API_KEY = secrets_config_file_parser["AFRICASTALKING"].get(
+            "api_key"
+        )
+
+        # define mailer settings
+        self.MAILER_SERVER = common_config_file_parser["MAILER"].get("server")
+        self.MAILER_PORT = common_config_file_parser["MAILER"].get("port")
+        self.MAILER_USERNAME = common_config_file_parser["MAILER"].get("username")
+        self.MAILER_PASSWORD = common_config_file_parser["MAILER"].get("password")
+        self.MAILER_DEFAULT_SENDER = common_config_file_parser["MAILER"].get(
+            "default_sender"
+        )
+        self.MAILER_MAX_EMAILS = common_config_file_parser["MAILER"].get("max_emails")
+        self.MAILER_USE_SSL = common_config_file_parser["MAILER"].getboolean("use_ssl")
+        self.MAILER_USE_TSL = common_config_file_parser["MAILER"].getboolean("use_tsl")
+        self.MAILER_RENDER_IN_WORKER = public_config_file_parser["MAILER"].getboolean(
+            "render_in_worker"
+        )
+
+    def get_database_uri(self, name, host, censored=True):
+        return f'postgresql://{self.DATABASE_USER}:{"*******" if censored else self.DATABASE_PASSWORD}@{host}:{self.DATABASE_PORT}/{name}'
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """
+    :return: process-wide settings, read from the deployment's config files on first use.
+    """
+    return Settings()
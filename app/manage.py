@@ -14,5 +14,33 @@ migrate = Migrate(app=app, db=db, directory=MIGRATION_DIR)
 manager = Manager(app=app)
 manager.add_command("db", MigrateCommand)
 
+
+@manager.option("-f", "--file", dest="file_path", help="csv or ndjson file of users.")
+@manager.option(
+    "-o",
+    "--organization",
+    dest="public_identifier",
+    default=None,
+    help="public identifier of the organization for rows without one.",
+)
+def import_users(file_path, public_identifier):
+    from app.server.utils.user_import import import_users as import_users_file
+
+    import_format = "csv"
+    if file_path.endswith((".ndjson", ".jsonl")):
+        import_format = "ndjson"
+
+    with open(file_path, encoding="utf-8", newline="") as file:
+        result = import_users_file(
+            stream=file,
+            import_format=import_format,
+            default_public_identifier=public_identifier,
+        )
+
+    print(f"Imported {result.imported} users.")
+    for error in result.errors:
+        print(f"Row {error['row']}: {error['message']}")
+
+
 if __name__ == "__main__":
     manager.run()
@@ -0,0 +1,34 @@
+"""Widens users password hash for versioned password hashes.
+
+Revision ID: 35af2e31f527
+Revises: 5488c0e69d73
+Create Date: 2026-10-17 21:02:44.871203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "35af2e31f527"
+down_revision = "5488c0e69d73"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column(
+        "users",
+        "password_hash",
+        existing_type=sa.String(length=200),
+        type_=sa.String(length=500),
+    )
+
+
+def downgrade():
+    op.alter_column(
+        "users",
+        "password_hash",
+        existing_type=sa.String(length=500),
+        type_=sa.String(length=200),
+    )
@@ -0,0 +1,74 @@
+"""Moves password reset tokens from the users.password_reset_tokens array to a password_reset_tokens table.
+
+Revision ID: 4b7d2e9a1c6f
+Revises: 9c1f4e7a2b3d
+Create Date: 2026-10-17 23:12:40.518302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "4b7d2e9a1c6f"
+down_revision = "9c1f4e7a2b3d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "password_reset_tokens",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("token_digest", sa.String(length=64), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_password_reset_tokens_token_digest"),
+        "password_reset_tokens",
+        ["token_digest"],
+        unique=True,
+    )
+    op.create_index(
+        op.f("ix_password_reset_tokens_user_id"),
+        "password_reset_tokens",
+        ["user_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_password_reset_tokens_expires_at"),
+        "password_reset_tokens",
+        ["expires_at"],
+        unique=False,
+    )
+    # outstanding tokens are not carried over, users request a new password reset email
+    op.drop_column("users", "password_reset_tokens")
+
+
+def downgrade():
+    op.add_column(
+        "users",
+        sa.Column(
+            "password_reset_tokens",
+            postgresql.ARRAY(sa.String()),
+            autoincrement=False,
+            nullable=True,
+        ),
+    )
+    op.drop_index(
+        op.f("ix_password_reset_tokens_expires_at"), table_name="password_reset_tokens"
+    )
+    op.drop_index(
+        op.f("ix_password_reset_tokens_user_id"), table_name="password_reset_tokens"
+    )
+    op.drop_index(
+        op.f("ix_password_reset_tokens_token_digest"),
+        table_name="password_reset_tokens",
+    )
+    op.drop_table("password_reset_tokens")
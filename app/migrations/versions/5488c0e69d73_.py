@@ -0,0 +1,27 @@
+"""Adds token version to users.
+
+Revision ID: 5488c0e69d73
+Revises: d885c619682c
+Create Date: 2026-10-17 20:48:31.118540
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5488c0e69d73"
+down_revision = "d885c619682c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade():
+    op.drop_column("users", "token_version")
@@ -0,0 +1,61 @@
+"""Replaces users._otp_secret with a one_time_passwords table of hashed codes.
+
+Revision ID: 7e3a9c5d1b2f
+Revises: 4b7d2e9a1c6f
+Create Date: 2026-10-18 00:34:17.026953
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7e3a9c5d1b2f"
+down_revision = "4b7d2e9a1c6f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "one_time_passwords",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("code_digest", sa.String(length=64), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_one_time_passwords_user_id"),
+        "one_time_passwords",
+        ["user_id"],
+        unique=True,
+    )
+    op.create_index(
+        op.f("ix_one_time_passwords_expires_at"),
+        "one_time_passwords",
+        ["expires_at"],
+        unique=False,
+    )
+    # outstanding one time passwords are not carried over, users request a new one
+    op.drop_column("users", "_otp_secret")
+
+
+def downgrade():
+    op.add_column(
+        "users",
+        sa.Column(
+            "_otp_secret", sa.String(length=200), autoincrement=False, nullable=True
+        ),
+    )
+    op.drop_index(
+        op.f("ix_one_time_passwords_expires_at"), table_name="one_time_passwords"
+    )
+    op.drop_index(
+        op.f("ix_one_time_passwords_user_id"), table_name="one_time_passwords"
+    )
+    op.drop_table("one_time_passwords")
@@ -0,0 +1,33 @@
+"""Adds created_at, id indexes for cursor pagination of users and organizations.
+
+Revision ID: 9c1f4e7a2b3d
+Revises: 35af2e31f527
+Create Date: 2026-10-17 21:45:12.304518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9c1f4e7a2b3d"
+down_revision = "35af2e31f527"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_users_created_at_id", "users", ["created_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_organizations_created_at_id",
+        "organizations",
+        ["created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_organizations_created_at_id", table_name="organizations")
+    op.drop_index("ix_users_created_at_id", table_name="users")
@@ -0,0 +1,70 @@
+"""Stores blacklisted token digests and expiry.
+
+Revision ID: d885c619682c
+Revises: 5b369778c622
+Create Date: 2026-10-17 20:35:12.402113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d885c619682c"
+down_revision = "5b369778c622"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "blacklisted_tokens",
+        sa.Column("token_digest", sa.String(length=64), nullable=True),
+    )
+    op.add_column(
+        "blacklisted_tokens", sa.Column("expires_at", sa.DateTime(), nullable=True)
+    )
+
+    # existing tokens are kept for the longest authentication token lifetime
+    op.execute(
+        "UPDATE blacklisted_tokens "
+        "SET token_digest = encode(sha256(convert_to(token, 'UTF8')), 'hex'), "
+        "expires_at = blacklisted_on + interval '7 days'"
+    )
+
+    op.alter_column("blacklisted_tokens", "token_digest", nullable=False)
+    op.alter_column("blacklisted_tokens", "expires_at", nullable=False)
+    op.create_index(
+        op.f("ix_blacklisted_tokens_token_digest"),
+        "blacklisted_tokens",
+        ["token_digest"],
+        unique=True,
+    )
+    op.create_index(
+        op.f("ix_blacklisted_tokens_expires_at"),
+        "blacklisted_tokens",
+        ["expires_at"],
+        unique=False,
+    )
+    op.drop_column("blacklisted_tokens", "token")
+
+
+def downgrade():
+    # token digests cannot be reversed into tokens
+    op.execute("DELETE FROM blacklisted_tokens")
+
+    op.add_column(
+        "blacklisted_tokens",
+        sa.Column("token", sa.String(length=500), nullable=False),
+    )
+    op.create_unique_constraint(
+        "blacklisted_tokens_token_key", "blacklisted_tokens", ["token"]
+    )
+    op.drop_index(
+        op.f("ix_blacklisted_tokens_expires_at"), table_name="blacklisted_tokens"
+    )
+    op.drop_index(
+        op.f("ix_blacklisted_tokens_token_digest"), table_name="blacklisted_tokens"
+    )
+    op.drop_column("blacklisted_tokens", "expires_at")
+    op.drop_column("blacklisted_tokens", "token_digest")
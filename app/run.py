@@ -1,10 +1,11 @@
 #!flask/bin/python
 import os
 
-from app import config
+from app.config import get_settings
 from app.server import create_app
 
 os.environ["DEPLOYMENT_NAME"] = "DEVELOPMENT"
 
 app = create_app()
-app.run(debug=True, host=config.APP_HOST, port=config.APP_PORT, threaded=True)
+settings = get_settings()
+app.run(debug=True, host=settings.APP_HOST, port=settings.APP_PORT, threaded=True)
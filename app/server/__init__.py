@@ -1,8 +1,9 @@
-import africastalking
 import logging
 import os
+import redis
+
+from functools import lru_cache
 
-from cryptography.fernet import Fernet
 from flask import Flask
 from flask import jsonify
 from flask import make_response
@@ -12,8 +13,8 @@ from flask_mail import Mail
 from flask_sqlalchemy import SQLAlchemy
 
 from app import config
-
-fernet_key = Fernet(config.SECRET_KEY)
+from app.server.constants import RAW_UPLOAD_MIMETYPES
+from app.server.utils.templates import TemplateEngine
 
 
 def boilerplate_app():
@@ -21,11 +22,14 @@ def boilerplate_app():
     app = Flask(__name__, instance_relative_config=True)
 
     # define config file
-    app.config.from_object(config)
+    app.config.from_object(config.get_settings())
 
     # define base directory
     app.config["BASEDIR"] = os.path.abspath(os.path.dirname(__file__))
 
+    # configure logging
+    configure_logging()
+
     # register extensions
     register_extensions(app)
 
@@ -57,7 +61,7 @@ def register_extensions(app):
 
     @app.before_request
     def before_request():
-        if request.method == "POST":
+        if request.method == "POST" and request.mimetype not in RAW_UPLOAD_MIMETYPES:
             # check for json data
             json_data = request.get_json()
             if not json_data:
@@ -69,37 +73,37 @@ def register_extensions(app):
                 }
                 return make_response(jsonify(response), 403)
 
+    # test sessions keep objects loaded after a commit
+    db.session.configure(expire_on_commit=not app.config["IS_TEST"])
     db.init_app(app)
     mailer.init_app(app)
+    template_engine.init_app(app)
 
 
-def fernet_encrypt(secret):
-    # covert secret to bytes
-    b_secret = bytes(secret, encoding="utf-8")
-    token = fernet_key.encrypt(b_secret)
-    return token
+def configure_logging():
+    # application logger defaults to DEBUG
+    logging.basicConfig(level=logging.DEBUG)
 
 
-def fernet_decrypt(token):
-    secret = fernet_key.decrypt(token)
-    return secret
+# define db, configured when an app is created
+db = SQLAlchemy()
 
+# initialize mailer
+mailer = Mail()
 
-# define db
-db = SQLAlchemy(session_options={"expire_on_commit": not config.IS_TEST})
+# initialize email template engine
+template_engine = TemplateEngine()
 
-# africa's talking sms client
-africastalking.initialize(
-    username=config.AFRICASTALKING_USERNAME, api_key=config.AFRICASTALKING_API_KEY
-)
 
-sms = africastalking.SMS
+@lru_cache(maxsize=None)
+def get_redis_client() -> redis.Redis:
+    """
+    :return: process-wide redis client, connections are only opened on first command.
+    """
+    return redis.Redis.from_url(config.get_settings().REDIS_URL)
 
-# initialize mailer
-mailer = Mail()
 
-# application logger defaults to DEBUG
-logging.basicConfig(level=logging.DEBUG)
+# application logger, configured when an app is created
 app_logger = logging.getLogger(__name__)
 
 
@@ -1,4 +1,3 @@
-import pyotp
 from flask import Blueprint
 from flask import jsonify
 from flask import make_response
@@ -6,6 +5,7 @@ from flask import request
 from flask.views import MethodView
 from jsonschema.exceptions import ValidationError
 
+from app.config import get_settings
 from app.server import db
 from app.server.models.blacklisted_token import BlacklistedToken
 from app.server.models.user import User
@@ -19,7 +19,8 @@ from app.server.templates.responses import (
 )
 from app.server.utils.mailer import check_mailer_configured
 from app.server.utils.mailer import Mailer
-from app.server.utils.messaging import send_sms, send_one_time_pin
+from app.server.utils.messaging import send_one_time_pin
+from app.server.utils.rate_limit import rate_limit
 from app.server.utils.user import process_create_or_update_user_request
 from app.server.utils.validation import validate_request
 
@@ -104,12 +105,12 @@ class VerifyOneTimePasswordAPI(MethodView):
     Verify OTP
     """
 
+    @rate_limit(scope="verify_otp", identifier_fields=["phone"])
     def post(self):
         otp_data = request.get_json()
 
         phone = otp_data.get("phone")
         otp_token = otp_data.get("otp")
-        otp_expiry_interval = otp_data.get("otp_expiry_interval")
 
         # validate request
         try:
@@ -122,7 +123,7 @@ class VerifyOneTimePasswordAPI(MethodView):
         if not isinstance(otp_token, str):
             response = {
                 "error": {
-                    "message": "OTP must be a 6 digit numeric string",
+                    "message": f"OTP must be a {get_settings().OTP_LENGTH} digit numeric string",
                     "status": "Fail",
                 }
             }
@@ -131,9 +132,7 @@ class VerifyOneTimePasswordAPI(MethodView):
         user = User.query.filter_by(phone=phone).first()
 
         if user:
-            is_valid_otp = user.verify_otp(
-                one_time_password=otp_token, expiry_interval=otp_expiry_interval
-            )
+            is_valid_otp = user.verify_otp(one_time_password=otp_token)
 
             if is_valid_otp:
                 # activated user
@@ -151,6 +150,9 @@ class VerifyOneTimePasswordAPI(MethodView):
                 }
                 return make_response(jsonify(response), 200)
 
+            # persist the failed attempt
+            db.session.commit()
+
             response = {"error": {"message": "Invalid OTP provided.", "status": "Fail"}}
             return make_response(jsonify(response), 400)
 
@@ -172,7 +174,15 @@ class ResendOneTimePasswordAPI(MethodView):
         resend_otp_data = request.get_json()
         phone = resend_otp_data.get("phone")
         user = User.query.filter_by(phone=phone).first()
-        otp_secret = user.get_otp_secret()
+
+        if not user:
+            response = {
+                "error": {
+                    "message": "No user found for phone number {}.".format(phone),
+                    "status": "Fail",
+                }
+            }
+            return make_response(jsonify(response), 400)
 
         # check if use is always activated
         if user.is_activated:
@@ -184,17 +194,9 @@ class ResendOneTimePasswordAPI(MethodView):
             }
             return make_response(jsonify(response), 400)
 
-        # get old OTP
-        old_otp = pyotp.TOTP(otp_secret, interval=3600).now()
-
-        # check if old OTP is expired
-        is_valid_otp = user.verify_otp(one_time_password=old_otp, expiry_interval=3600)
-        if is_valid_otp:
-            message = f"Hello {user.given_names}, your activation code is: {old_otp}"
-            send_sms(message=message, phone_number=phone)
-        else:
-            # generate new OTP
-            send_one_time_pin(user)
+        # only digests of one time passwords are stored, so a new one replaces the old one
+        send_one_time_pin(user)
+        db.session.commit()
 
         response, status_code = otp_resent_successfully()
         return make_response(jsonify(response), status_code)
@@ -205,6 +207,7 @@ class LoginAPI(MethodView):
     Login user
     """
 
+    @rate_limit(scope="login", identifier_fields=["email", "phone"])
     def post(self):
         login_data = request.get_json()
 
@@ -230,6 +233,10 @@ class LoginAPI(MethodView):
                 }
                 return response, 401
 
+            # transparently upgrade outdated password hashes
+            if user.upgrade_password_hash(password):
+                db.session.commit()
+
             if not user.is_activated:
                 response = {
                     "error": {
@@ -278,7 +285,7 @@ class LogoutAPI(MethodView):
 
         action = logout_instruction.get("action", None)
 
-        if not action or action != "logout":
+        if action not in ["logout", "logout_all"]:
             response = {
                 "error": {
                     "message": "Invalid action provided for logout.",
@@ -301,12 +308,27 @@ class LogoutAPI(MethodView):
             if not isinstance(decoded_auth_token, str):
 
                 # mark the token as blacklisted
-                blacklist_token = BlacklistedToken(token=auth_token)
+                blacklist_token = BlacklistedToken(
+                    token=auth_token, expires_at=decoded_auth_token.get("exp")
+                )
                 try:
+                    # revoke all tokens issued to the user
+                    if action == "logout_all":
+                        user = User.query.execution_options(show_all=True).get(
+                            decoded_auth_token.get("id")
+                        )
+                        if user:
+                            user.bump_token_version()
+
                     # insert the token
                     db.session.add(blacklist_token)
                     db.session.commit()
 
+                    # write through to the blacklist and token version caches
+                    blacklist_token.cache()
+                    if action == "logout_all" and user:
+                        user.cache_token_version()
+
                     response = {
                         "message": "Successfully logged out.",
                         "status": "Success",
@@ -417,10 +439,10 @@ class ResetPasswordAPI(MethodView):
 
         user: User = decoded_token_response.get("user", None)
 
-        is_used_token = user.check_is_used_password_reset_token(
+        is_outstanding_token = user.consume_password_reset_token(
             password_reset_token=password_reset_token
         )
-        if is_used_token:
+        if not is_outstanding_token:
             response = {
                 "error": {
                     "message": "This token has already been used.",
@@ -431,7 +453,9 @@ class ResetPasswordAPI(MethodView):
 
         user.hash_password(new_password)
         user.remove_all_password_reset_tokens()
+        user.bump_token_version()
         db.session.commit()
+        user.cache_token_version()
 
         response = {
             "message": "Password successfully changed. Please log in.",
@@ -5,14 +5,20 @@ from flask import request
 from flask.views import MethodView
 
 from app.server import db
+from app.server.exceptions import InvalidPaginationCursorException
 from app.server.models.organization import Organization
 from app.server.schemas.organization import organization_schema
 from app.server.schemas.organization import organizations_schema
 from app.server.templates.responses import (
+    invalid_export_format,
+    invalid_pagination_cursor,
     organization_id_not_provided,
     organization_not_found,
 )
 from app.server.utils.auth import requires_auth
+from app.server.utils.export import EXPORT_FORMATS
+from app.server.utils.export import stream_export
+from app.server.utils.organization import invalidate_organization_cache
 from app.server.utils.organization import process_create_or_update_organization_request
 from app.server.utils.query import paginate_query
 
@@ -43,7 +49,7 @@ class OrganizationAPI(MethodView):
 
         return make_response(jsonify(response), status_code)
 
-    @requires_auth(authenticated_roles=["ADMIN"])
+    @requires_auth(authenticated_roles=["ADMIN"], trusted_claims=True)
     def get(self, organization_id):
         if organization_id:
             organization = Organization.query.execution_options(show_all=True).get(
@@ -66,9 +72,16 @@ class OrganizationAPI(MethodView):
         else:
             organizations_query = Organization.query.execution_options(show_all=True)
 
-            organizations, total_items, total_pages = paginate_query(
-                organizations_query, Organization
-            )
+            try:
+                (
+                    organizations,
+                    total_items,
+                    total_pages,
+                    next_cursor,
+                ) = paginate_query(organizations_query, Organization)
+            except InvalidPaginationCursorException:
+                response, status_code = invalid_pagination_cursor()
+                return make_response(jsonify(response), status_code)
 
             if not organizations:
                 response = {
@@ -85,6 +98,7 @@ class OrganizationAPI(MethodView):
                 },
                 "items": total_items,
                 "message": "Successfully loaded all organizations.",
+                "next_cursor": next_cursor,
                 "pages": total_pages,
                 "status": "Success",
             }
@@ -107,12 +121,36 @@ class OrganizationAPI(MethodView):
             if status_code == 200:
                 db.session.commit()
 
+                # drop cached snapshots of the organization once the update is committed
+                organization = get_organization_by_id(organization_id)
+                if organization:
+                    invalidate_organization_cache(organization)
+
             return make_response(jsonify(response), status_code)
 
         response, status_code = organization_id_not_provided()
         return make_response(jsonify(response), status_code)
 
 
+class OrganizationExportAPI(MethodView):
+    @requires_auth(authenticated_roles=["ADMIN"])
+    def get(self):
+        export_format = request.args.get("format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            response, status_code = invalid_export_format(export_format)
+            return make_response(jsonify(response), status_code)
+
+        organizations_query = Organization.query.execution_options(
+            show_all=True
+        ).order_by(Organization.id)
+        return stream_export(
+            query=organizations_query,
+            schema=organization_schema,
+            export_format=export_format,
+            filename="organizations",
+        )
+
+
 organization_view = OrganizationAPI.as_view("organization_view")
 single_organization_view = OrganizationAPI.as_view("single_organization_view")
 
@@ -132,3 +170,9 @@ organization_blueprint.add_url_rule(
     view_func=single_organization_view,
     methods=["GET", "PUT"],
 )
+
+organization_blueprint.add_url_rule(
+    "/organization/export/",
+    view_func=OrganizationExportAPI.as_view("organization_export_view"),
+    methods=["GET"],
+)
@@ -1,16 +1,30 @@
 from flask import Blueprint, jsonify, make_response, request
 from flask.views import MethodView
 
+from app.config import get_settings
 from app.server import db
+from app.server.exceptions import InvalidPaginationCursorException
 from app.server.models.user import User
+from app.server.utils.auth import get_active_user_role
 from app.server.utils.auth import requires_auth
+from app.server.utils.export import EXPORT_FORMATS
+from app.server.utils.export import stream_export
+from app.server.utils.query import apply_loader_profile
 from app.server.utils.query import paginate_query
-from app.server.utils.user import (
-    process_create_or_update_user_request,
-    get_user_role_from_auth_token,
-)
+from app.server.utils.user import process_create_or_update_user_request
+from app.server.utils.user_import import IMPORT_FORMATS
+from app.server.utils.user_import import get_import_job
+from app.server.utils.user_import import queue_import_users
 from app.server.schemas.user import user_schema, users_schema
-from app.server.templates.responses import user_not_found, user_id_not_provided
+from app.server.templates.responses import (
+    import_file_too_large,
+    import_job_not_found,
+    invalid_export_format,
+    invalid_import_format,
+    invalid_pagination_cursor,
+    user_not_found,
+    user_id_not_provided,
+)
 
 user_blueprint = Blueprint("user", __name__)
 
@@ -21,10 +35,12 @@ def get_organization_by_id(user_id):
 
 
 class UserAPI(MethodView):
-    @requires_auth(authenticated_roles=["ADMIN", "CLIENT"])
+    @requires_auth(authenticated_roles=["ADMIN", "CLIENT"], trusted_claims=True)
     def get(self, user_id):
         if user_id:
-            user = User.query.execution_options(show_all=True).get(user_id)
+            user = apply_loader_profile(
+                User.query.execution_options(show_all=True), User, "detail"
+            ).get(user_id)
 
             if not user:
                 response, status_code = user_not_found(user_id=user_id)
@@ -38,9 +54,7 @@ class UserAPI(MethodView):
             return make_response(jsonify(response), 200)
 
         else:
-            auth_header = request.headers.get("Authorization")
-            auth_token = auth_header.split(" ")[1]
-            user_role = get_user_role_from_auth_token(auth_token)
+            user_role = get_active_user_role()
             if user_role != "ADMIN":
                 response = {
                     "error": {
@@ -49,9 +63,17 @@ class UserAPI(MethodView):
                     }
                 }
                 return make_response(jsonify(response), 401)
-            users_query = User.query.execution_options(show_all=True)
+            users_query = apply_loader_profile(
+                User.query.execution_options(show_all=True), User, "list"
+            )
 
-            users, total_items, total_pages = paginate_query(users_query, User)
+            try:
+                users, total_items, total_pages, next_cursor = paginate_query(
+                    users_query, User
+                )
+            except InvalidPaginationCursorException:
+                response, status_code = invalid_pagination_cursor()
+                return make_response(jsonify(response), status_code)
 
             if not users:
                 response = {
@@ -63,6 +85,7 @@ class UserAPI(MethodView):
                 "data": {"users": users_schema.dump(users).data},
                 "items": total_items,
                 "message": "Successfully loaded all users.",
+                "next_cursor": next_cursor,
                 "pages": total_pages,
                 "status": "Success",
             }
@@ -90,8 +113,11 @@ class UserAPI(MethodView):
         if user_id:
             user = User.query.get(user_id)
             if user:
+                # revoke tokens issued to the deleted user
+                user.bump_token_version()
                 db.session.delete(user)
                 db.session.commit()
+                user.cache_token_version()
                 response = {"message": "Successfully deleted user", "status": "Fail"}
                 return make_response(jsonify(response), 200)
             response, status_code = user_not_found(user_id)
@@ -100,6 +126,79 @@ class UserAPI(MethodView):
         return make_response(jsonify(response), status_code)
 
 
+class UserExportAPI(MethodView):
+    @requires_auth(authenticated_roles=["ADMIN"])
+    def get(self):
+        export_format = request.args.get("format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            response, status_code = invalid_export_format(export_format)
+            return make_response(jsonify(response), status_code)
+
+        users_query = apply_loader_profile(
+            User.query.execution_options(show_all=True), User, "list"
+        ).order_by(User.id)
+        return stream_export(
+            query=users_query,
+            schema=user_schema,
+            export_format=export_format,
+            filename="users",
+        )
+
+
+class UserImportAPI(MethodView):
+    @requires_auth(authenticated_roles=["ADMIN"])
+    def post(self):
+        import_format = next(
+            (
+                supported_format
+                for supported_format, mimetype in IMPORT_FORMATS.items()
+                if mimetype == request.mimetype
+            ),
+            None,
+        )
+        if import_format is None:
+            response, status_code = invalid_import_format(request.mimetype)
+            return make_response(jsonify(response), status_code)
+
+        # reject oversized files before reading them
+        max_upload_size = get_settings().IMPORT_MAX_UPLOAD_SIZE
+        if (request.content_length or 0) > max_upload_size:
+            response, status_code = import_file_too_large(max_upload_size)
+            return make_response(jsonify(response), status_code)
+
+        # bodies without a content length are read up to one byte past the limit
+        contents = request.stream.read(max_upload_size + 1)
+        if len(contents) > max_upload_size:
+            response, status_code = import_file_too_large(max_upload_size)
+            return make_response(jsonify(response), status_code)
+
+        job_id = queue_import_users(
+            contents=contents,
+            import_format=import_format,
+            default_public_identifier=request.args.get("public_identifier"),
+        )
+        response = {
+            "data": {"job_id": job_id},
+            "message": "User import queued.",
+            "status": "Success",
+        }
+        return make_response(jsonify(response), 202)
+
+    @requires_auth(authenticated_roles=["ADMIN"])
+    def get(self, job_id):
+        job = get_import_job(job_id)
+        if job is None:
+            response, status_code = import_job_not_found(job_id=job_id)
+            return make_response(jsonify(response), status_code)
+
+        response = {
+            "data": {"job": job},
+            "message": "Successfully loaded import job.",
+            "status": "Success",
+        }
+        return make_response(jsonify(response), 200)
+
+
 users_view = UserAPI.as_view("users_api")
 single_user_view = UserAPI.as_view("single_user_view")
 
@@ -110,3 +209,21 @@ user_blueprint.add_url_rule(
 user_blueprint.add_url_rule(
     "/user/<int:user_id>/", view_func=single_user_view, methods=["GET", "DELETE", "PUT"]
 )
+
+user_blueprint.add_url_rule(
+    "/user/export/",
+    view_func=UserExportAPI.as_view("user_export_view"),
+    methods=["GET"],
+)
+
+user_blueprint.add_url_rule(
+    "/user/import/",
+    view_func=UserImportAPI.as_view("user_import_view"),
+    methods=["POST"],
+)
+
+user_blueprint.add_url_rule(
+    "/user/import/<string:job_id>/",
+    view_func=UserImportAPI.as_view("user_import_job_view"),
+    methods=["GET"],
+)
@@ -1,5 +1,9 @@
+from datetime import timedelta
+
 IDENTIFICATION_TYPES = ["NATIONAL_ID", "PASSPORT"]
 SUPPORTED_ROLES = ["ADMIN", "CLIENT"]
+# post requests with these content types carry file uploads rather than json
+RAW_UPLOAD_MIMETYPES = ["text/csv", "application/x-ndjson"]
 SUPPORTED_MAILER_SETTINGS = [
     "DEFAULT_SENDER",
     "MAX_EMAILS",
@@ -10,3 +14,9 @@ SUPPORTED_MAILER_SETTINGS = [
     "USE_SSL",
     "USE_TSL",
 ]
+
+# authentication tokens expire after
+AUTHENTICATION_TOKEN_LIFETIME = timedelta(days=7)
+
+# single use activation and password reset tokens expire after
+SINGLE_USE_TOKEN_LIFETIME = timedelta(days=1)
@@ -1,6 +1,7 @@
 from app.server import create_app, db
 from app.server.constants import SUPPORTED_ROLES
 from app.server.models.role import Role
+from app.server.utils.role import invalidate_role_cache
 
 
 def system_seed():
@@ -11,6 +12,9 @@ def system_seed():
         db.session.add(user_role)
         db.session.commit()
 
+    # reload seeded roles on next lookup in this process, other processes reload them after ROLE_CACHE_TTL seconds
+    invalidate_role_cache()
+
 
 if __name__ == "__main__":
     app = create_app()
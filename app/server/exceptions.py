@@ -12,3 +12,35 @@ class RoleNotFoundException(Exception):
     """
 
     pass
+
+
+class InvalidPasswordHashException(Exception):
+    """
+    Raise if a stored password hash is malformed or names an unsupported algorithm
+    """
+
+    pass
+
+
+class InvalidPaginationCursorException(Exception):
+    """
+    Raise if a pagination cursor cannot be decoded
+    """
+
+    pass
+
+
+class InvalidSignedTokenException(Exception):
+    """
+    Raise if a signed token is malformed or its signature is not valid
+    """
+
+    pass
+
+
+class ExpiredSignedTokenException(InvalidSignedTokenException):
+    """
+    Raise if a signed token's signature is valid but it has expired
+    """
+
+    pass
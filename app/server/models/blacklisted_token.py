@@ -1,6 +1,12 @@
 from datetime import datetime
 
 from app.server import db
+from app.server.constants import AUTHENTICATION_TOKEN_LIFETIME
+from app.server.utils.blacklist import cache_blacklisted_token
+from app.server.utils.blacklist import cache_non_blacklisted_token
+from app.server.utils.blacklist import get_cached_blacklist_status
+from app.server.utils.blacklist import get_token_digest
+from app.server.utils.blacklist import get_token_expiry
 from app.server.utils.models import BaseModel
 
 
@@ -11,21 +17,56 @@ class BlacklistedToken(BaseModel):
 
     __tablename__ = "blacklisted_tokens"
 
-    token = db.Column(db.String(500), unique=True, nullable=False)
+    token_digest = db.Column(db.String(64), index=True, unique=True, nullable=False)
+    expires_at = db.Column(db.DateTime, index=True, nullable=False)
     blacklisted_on = db.Column(db.DateTime, nullable=False)
 
     @staticmethod
-    def check_if_blacklisted(token):
+    def check_if_blacklisted(token, expires_at=None):
+        """
+        :param token: authentication token.
+        :param expires_at: token expiry as a unix timestamp, used to expire cached results.
+        :return: boolean if token is blacklisted.
+        """
+        token_digest = get_token_digest(token)
+
+        # check the blacklist cache before the db
+        is_blacklisted = get_cached_blacklist_status(token_digest)
+        if is_blacklisted is not None:
+            return is_blacklisted
+
         # check whether token has been blacklisted
-        result = BlacklistedToken.query.filter_by(token=str(token)).first()
+        result = BlacklistedToken.query.filter_by(token_digest=token_digest).first()
         if result:
+            cache_blacklisted_token(token_digest, expires_at=expires_at)
             return True
         else:
+            cache_non_blacklisted_token(token_digest)
             return False
 
-    def __init__(self, token):
-        self.token = token
+    def cache(self):
+        """
+        Writes the blacklisted token through to the blacklist cache.
+        """
+        expires_at = (self.expires_at - datetime(1970, 1, 1)).total_seconds()
+        cache_blacklisted_token(self.token_digest, expires_at=expires_at)
+
+    def __init__(self, token, expires_at=None):
+        """
+        :param token: authentication token.
+        :param expires_at: token expiry as a unix timestamp, read from the token if not provided.
+        """
+        self.token_digest = get_token_digest(token)
         self.blacklisted_on = datetime.now()
 
+        if expires_at is None:
+            expires_at = get_token_expiry(token)
+
+        # tokens without a readable expiry are kept for the longest token lifetime
+        if expires_at is None:
+            self.expires_at = datetime.utcnow() + AUTHENTICATION_TOKEN_LIFETIME
+        else:
+            self.expires_at = datetime.utcfromtimestamp(expires_at)
+
     def __repr__(self):
-        return f"<id: token: {self.token}"
+        return f"<id: token_digest: {self.token_digest}"
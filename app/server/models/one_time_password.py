@@ -0,0 +1,98 @@
+import hashlib
+import hmac
+import secrets
+from datetime import datetime
+from datetime import timedelta
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import get_settings
+from app.server import db
+from app.server.utils.models import BaseModel
+
+
+def get_one_time_password_digest(one_time_password: str) -> str:
+    """
+    :param one_time_password: one time password.
+    :return: hex encoded hmac sha256 digest of the one time password, keyed so short codes can not be brute forced
+    from the digest alone.
+    """
+    return hmac.new(
+        get_settings().SECRET_KEY.encode("utf-8"),
+        one_time_password.encode("utf-8"),
+        hashlib.sha256,
+    ).hexdigest()
+
+
+class OneTimePassword(BaseModel):
+    """
+    Create a user's outstanding one time password
+    """
+
+    __tablename__ = "one_time_passwords"
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
+        unique=True,
+        nullable=False,
+    )
+    code_digest = db.Column(db.String(64), nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    expires_at = db.Column(db.DateTime, index=True, nullable=False)
+
+    @staticmethod
+    def issue(user_id) -> str:
+        """
+        Replaces the user's outstanding one time password, if any, with a new one.
+        :param user_id: id of the user to issue the one time password to.
+        :return: one time password of OTP_LENGTH digits, valid for OTP_TTL seconds.
+        """
+        otp_length = get_settings().OTP_LENGTH
+        one_time_password = f"{secrets.randbelow(10 ** otp_length):0{otp_length}d}"
+        now = datetime.utcnow()
+        values = {
+            "code_digest": get_one_time_password_digest(one_time_password),
+            "attempts": 0,
+            "expires_at": now + timedelta(seconds=get_settings().OTP_TTL),
+            "updated_at": now,
+        }
+        db.session.execute(
+            insert(OneTimePassword.__table__)
+            .values(user_id=user_id, created_at=now, **values)
+            .on_conflict_do_update(index_elements=["user_id"], set_=values)
+        )
+        return one_time_password
+
+    @staticmethod
+    def verify(user_id, one_time_password: str) -> bool:
+        """
+        Counts an attempt against the user's outstanding one time password and consumes it if it matches. Expired one
+        time passwords and those with OTP_MAX_ATTEMPTS failed attempts are rejected.
+        :param user_id: id of the user the one time password was issued to.
+        :param one_time_password: one time password to verify.
+        :return: boolean if the one time password is valid.
+        """
+        table = OneTimePassword.__table__
+        outstanding_one_time_password = db.session.execute(
+            table.update()
+            .where(table.c.user_id == user_id)
+            .where(table.c.expires_at > datetime.utcnow())
+            .where(table.c.attempts < get_settings().OTP_MAX_ATTEMPTS)
+            .values(attempts=table.c.attempts + 1)
+            .returning(table.c.code_digest)
+        ).first()
+        if outstanding_one_time_password is None:
+            return False
+
+        is_valid = hmac.compare_digest(
+            outstanding_one_time_password.code_digest,
+            get_one_time_password_digest(one_time_password),
+        )
+        if is_valid:
+            db.session.execute(table.delete().where(table.c.user_id == user_id))
+        return is_valid
+
+    def __repr__(self):
+        return f"<id: user_id: {self.user_id}"
@@ -11,6 +11,7 @@ class Organization(BaseModel):
     """
 
     __tablename__ = "organizations"
+    __table_args__ = (db.Index("ix_organizations_created_at_id", "created_at", "id"),)
 
     # attributes
     name = db.Column(db.String(100))
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app.server import db
+from app.server.constants import SINGLE_USE_TOKEN_LIFETIME
+from app.server.utils.blacklist import get_token_digest
+from app.server.utils.models import BaseModel
+
+
+class PasswordResetToken(BaseModel):
+    """
+    Create an outstanding password reset token
+    """
+
+    __tablename__ = "password_reset_tokens"
+
+    token_digest = db.Column(db.String(64), index=True, unique=True, nullable=False)
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    expires_at = db.Column(db.DateTime, index=True, nullable=False)
+
+    @staticmethod
+    def save(token, user_id):
+        """
+        Stores an outstanding password reset token. Tokens issued to a user within the same second are identical, so a
+        token that is already outstanding is left as is.
+        :param token: password reset token.
+        :param user_id: id of the user the token was issued to.
+        """
+        now = datetime.utcnow()
+        db.session.execute(
+            insert(PasswordResetToken.__table__)
+            .values(
+                token_digest=get_token_digest(token),
+                user_id=user_id,
+                expires_at=now + SINGLE_USE_TOKEN_LIFETIME,
+                created_at=now,
+                updated_at=now,
+            )
+            .on_conflict_do_nothing(index_elements=["token_digest"])
+        )
+
+    @staticmethod
+    def consume(token, user_id) -> bool:
+        """
+        Deletes an outstanding password reset token in a single statement, so a token can only be consumed once.
+        :param token: password reset token.
+        :param user_id: id of the user the token was issued to.
+        :return: boolean if the token was outstanding and has been consumed.
+        """
+        consumed_tokens = PasswordResetToken.query.filter(
+            PasswordResetToken.token_digest == get_token_digest(token),
+            PasswordResetToken.user_id == user_id,
+            PasswordResetToken.expires_at > datetime.utcnow(),
+        ).delete(synchronize_session=False)
+        return consumed_tokens == 1
+
+    @staticmethod
+    def revoke_all(user_id):
+        """
+        :param user_id: id of the user whose outstanding password reset tokens to delete.
+        """
+        PasswordResetToken.query.filter_by(user_id=user_id).delete(
+            synchronize_session=False
+        )
+
+    def __repr__(self):
+        return f"<id: token_digest: {self.token_digest}"
@@ -1,33 +1,33 @@
 from datetime import datetime
-from datetime import timedelta
 
-import bcrypt
 import jwt
-import pyotp
-from cryptography.fernet import Fernet
-from itsdangerous import BadSignature
-from itsdangerous import SignatureExpired
-from itsdangerous import TimedJSONWebSignatureSerializer
-from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import joinedload
 from sqlalchemy.orm.attributes import flag_modified
 
-from app import config
+from app.config import get_settings
 from app.server import db
-from app.server import fernet_decrypt
-from app.server import fernet_encrypt
+from app.server.constants import AUTHENTICATION_TOKEN_LIFETIME
 from app.server.constants import IDENTIFICATION_TYPES, SUPPORTED_ROLES
 from app.server.exceptions import (
+    ExpiredSignedTokenException,
     IdentificationTypeNotFoundException,
+    InvalidSignedTokenException,
     RoleNotFoundException,
 )
 from app.server.models.blacklisted_token import BlacklistedToken
+from app.server.models.one_time_password import OneTimePassword
 from app.server.models.organization import Organization
-from app.server.models.role import Role
+from app.server.models.password_reset_token import PasswordResetToken
 from app.server.utils.enums.auth_enums import SignupMethod
 from app.server.utils.models import BaseModel
-from app.server.utils.models import MutableList
+from app.server.utils.password import check_password
+from app.server.utils.password import hash_password
+from app.server.utils.password import password_hash_needs_upgrade
+from app.server.utils.role import get_role_id
+from app.server.utils.signed_token import get_single_use_token_signer
+from app.server.utils.token_version import cache_token_version
 
 
 class User(BaseModel):
@@ -36,6 +36,7 @@ class User(BaseModel):
     """
 
     __tablename__ = "users"
+    __table_args__ = (db.Index("ix_users_created_at_id", "created_at", "id"),)
 
     given_names = db.Column(db.String(length=35), nullable=False)
     surname = db.Column(db.String(length=35), nullable=False)
@@ -47,14 +48,14 @@ class User(BaseModel):
 
     date_of_birth = db.Column(db.Date)
 
-    password_hash = db.Column(db.String(200))
-    _otp_secret = db.Column(db.String(200))
+    password_hash = db.Column(db.String(500))
 
     is_activated = db.Column(db.Boolean, default=False)
 
-    signup_method = db.Column(db.Enum(SignupMethod))
+    # bumped to revoke all authentication tokens issued to the user
+    token_version = db.Column(db.Integer, default=0, nullable=False)
 
-    password_reset_tokens = db.Column(MutableList.as_mutable(ARRAY(db.String)))
+    signup_method = db.Column(db.Enum(SignupMethod))
 
     parent_organization_id = db.Column(db.Integer, db.ForeignKey("organizations.id"))
     parent_organization = db.relationship(
@@ -67,6 +68,12 @@ class User(BaseModel):
     role_id = db.Column(db.Integer, db.ForeignKey("roles.id"))
     role = db.relationship("Role", back_populates="users")
 
+    # eager loading options applied by apply_loader_profile for serializing users
+    loader_profiles = {
+        "list": [joinedload("role")],
+        "detail": [joinedload("role")],
+    }
+
     @hybrid_property
     def identification(self):
         return self._identification
@@ -101,10 +108,7 @@ class User(BaseModel):
         :param password: user password.
         :return: encrypted password with system password pepper.
         """
-        fernet_key = Fernet(config.PASSWORD_PEPPER)
-        return fernet_key.encrypt(
-            bcrypt.hashpw(password.encode(), bcrypt.gensalt())
-        ).decode()
+        return hash_password(password)
 
     @staticmethod
     def check_salt_hashed_secret(password, hashed_password):
@@ -113,9 +117,7 @@ class User(BaseModel):
         :param hashed_password: hashed password stored in db.
         :return: boolean if password matches.
         """
-        fernet_key = Fernet(config.PASSWORD_PEPPER)
-        hashed_password = fernet_key.decrypt(hashed_password.encode())
-        return bcrypt.checkpw(password.encode(), hashed_password)
+        return check_password(password, hashed_password)
 
     def hash_password(self, password):
         """
@@ -131,6 +133,17 @@ class User(BaseModel):
         """
         return self.check_salt_hashed_secret(password, self.password_hash)
 
+    def upgrade_password_hash(self, password):
+        """
+        Rehashes a verified password if its hash was not produced with the configured algorithm and parameters.
+        :param password: verified user password.
+        :return: boolean if the password hash was upgraded.
+        """
+        if password_hash_needs_upgrade(self.password_hash):
+            self.hash_password(password)
+            return True
+        return False
+
     def encode_auth_token(self):
         """
         Generates the authentication token.
@@ -139,13 +152,15 @@ class User(BaseModel):
         try:
 
             payload = {
-                "exp": datetime.utcnow() + timedelta(days=7, seconds=0),
+                "exp": datetime.utcnow() + AUTHENTICATION_TOKEN_LIFETIME,
                 "iat": datetime.utcnow(),
                 "id": self.id,
                 "role": self.role.name,
+                "is_activated": self.is_activated,
+                "token_version": self.token_version or 0,
             }
 
-            return jwt.encode(payload, config.SECRET_KEY, algorithm="HS256")
+            return jwt.encode(payload, get_settings().SECRET_KEY, algorithm="HS256")
         except Exception as exception:
             return exception
 
@@ -158,8 +173,12 @@ class User(BaseModel):
         :return: integer|string
         """
         try:
-            payload = jwt.decode(jwt=token, key=config.SECRET_KEY, algorithms="HS256")
-            is_blacklisted_token = BlacklistedToken.check_if_blacklisted(token=token)
+            payload = jwt.decode(
+                jwt=token, key=get_settings().SECRET_KEY, algorithms="HS256"
+            )
+            is_blacklisted_token = BlacklistedToken.check_if_blacklisted(
+                token=token, expires_at=payload.get("exp")
+            )
 
             if is_blacklisted_token:
                 return "Token is blacklisted. Please log in again."
@@ -170,122 +189,122 @@ class User(BaseModel):
         except jwt.InvalidTokenError:
             return f"Invalid {token_type} Token."
 
+    def bump_token_version(self):
+        """
+        Revokes all authentication tokens issued to the user once committed.
+        """
+        self.token_version = (self.token_version or 0) + 1
+
+    def cache_token_version(self):
+        """
+        Writes the user's token version through to the token version cache, called once it is committed.
+        """
+        cache_token_version(self.id, self.token_version)
+
     def encode_single_use_jws(self, token_type):
         """
         :param token_type: token type to sign.
-        :return: JSON Web Signature.
+        :return: signed token, valid for SINGLE_USE_TOKEN_LIFETIME.
         """
-        signature = TimedJSONWebSignatureSerializer(
-            config.SECRET_KEY, expires_in=(60 * 60 * 24)
-        )
-        return signature.dumps({"id": self.id, "type": token_type}).decode("utf-8")
+        return get_single_use_token_signer().sign({"id": self.id, "type": token_type})
 
-    @classmethod
-    def decode_single_use_jws(cls, token, required_token_type):
+    @staticmethod
+    def verify_single_use_jws(token, required_token_type):
         """
-        :param token: JSON Web Token to verify.
-        :param required_token_type: token type expected in JSON Web Signature.
-        :return: JSON response.
+        Checks a single use token's signature, expiry and type without loading its user.
+        :param token: signed token to verify.
+        :param required_token_type: token type expected in the signed token.
+        :return: JSON response with the id of the user the token was issued to.
         """
         try:
-            # define signature with application
-            signature = TimedJSONWebSignatureSerializer(config.SECRET_KEY)
-
             # get data from signature
-            data = signature.loads(token.encode("utf-8"))
-
-            # get user_id
-            user_id = data.get("id")
-
-            # get token type
-            token_type = data.get("type")
-
-            # check if token type is equivalent
-            if token_type != required_token_type:
-                return {
-                    "status": "Fail",
-                    "message": f"Wrong token type (needed {required_token_type})",
-                }
-
-            # check if user_id is present
-            if not user_id:
-                return {"status": "Fail", "message": "No User ID provided."}
-
-            # check if user exists in DB
-            user = (
-                cls.query.filter_by(id=user_id).execution_options(show_all=True).first()
-            )
-
-            # if user is not found
-            if not user:
-                return {"status": "Fail", "message": "User not found."}
-            return {"status": "Success", "user": user}
-
-        except BadSignature:
-            return {"status": "Fail", "message": "Token signature not valid."}
+            data = get_single_use_token_signer().verify(token)
 
-        except SignatureExpired:
+        except ExpiredSignedTokenException:
             return {"status": "Fail", "message": "Token has expired."}
 
+        except InvalidSignedTokenException as exception:
+            return {"status": "Fail", "message": str(exception)}
+
         except Exception as exception:
             return {"status": "Fail", "message": exception}
 
-    def clear_invalid_password_reset_tokens(self):
-        if self.password_reset_tokens is None:
-            self.password_reset_tokens = []
-
-        valid_tokens = []
-        for token in self.password_reset_tokens:
-            decoded_token_response = self.decode_single_use_jws(
-                token=token, required_token_type="password_reset"
-            )
-            is_valid_token = decoded_token_response.get("status") == "Success"
-            if is_valid_token:
-                valid_tokens.append(token)
-        return valid_tokens
+        # get user_id
+        user_id = data.get("id")
 
-    def save_password_reset_token(self, password_reset_token):
-        if self.password_reset_tokens is None:
-            self.password_reset_tokens = []
-        self.password_reset_tokens.append(password_reset_token)
+        # get token type
+        token_type = data.get("type")
 
-    def check_is_used_password_reset_token(self, password_reset_token):
-        self.clear_invalid_password_reset_tokens()
-        is_used = password_reset_token not in self.password_reset_tokens
-        return is_used
+        # check if token type is equivalent
+        if token_type != required_token_type:
+            return {
+                "status": "Fail",
+                "message": f"Wrong token type (needed {required_token_type})",
+            }
 
-    def remove_all_password_reset_tokens(self):
-        self.password_reset_tokens = []
+        # check if user_id is present
+        if not user_id:
+            return {"status": "Fail", "message": "No User ID provided."}
 
-    def set_otp_secret(self):
-        # generate random otp_secret
-        otp_secret = pyotp.random_base32()
+        return {"status": "Success", "user_id": user_id}
 
-        # encrypt otp secret
-        token = fernet_encrypt(otp_secret)
+    @classmethod
+    def decode_single_use_jws(cls, token, required_token_type):
+        """
+        :param token: signed token to verify.
+        :param required_token_type: token type expected in the signed token.
+        :return: JSON response with the user the token was issued to, with their role loaded.
+        """
+        verified_token_response = cls.verify_single_use_jws(
+            token=token, required_token_type=required_token_type
+        )
+        if verified_token_response["status"] != "Success":
+            return verified_token_response
+
+        # check if user exists in DB
+        user = (
+            cls.query.options(joinedload("role"))
+            .filter_by(id=verified_token_response["user_id"])
+            .execution_options(show_all=True)
+            .first()
+        )
 
-        # save otp secret
-        self._otp_secret = token.decode("utf-8")
+        # if user is not found
+        if not user:
+            return {"status": "Fail", "message": "User not found."}
+        return {"status": "Success", "user": user}
 
-        # generate one time password [expires in 1 hour]
-        one_time_password = pyotp.TOTP(otp_secret, interval=3600).now()
+    def save_password_reset_token(self, password_reset_token):
+        PasswordResetToken.save(token=password_reset_token, user_id=self.id)
 
-        return one_time_password
+    def consume_password_reset_token(self, password_reset_token):
+        """
+        :param password_reset_token: password reset token issued to the user.
+        :return: boolean if the token was outstanding, it can not be consumed again.
+        """
+        return PasswordResetToken.consume(token=password_reset_token, user_id=self.id)
 
-    def get_otp_secret(self):
-        return fernet_decrypt(self._otp_secret.encode("utf-8"))
+    def remove_all_password_reset_tokens(self):
+        PasswordResetToken.revoke_all(user_id=self.id)
 
-    def verify_otp(self, one_time_password, expiry_interval):
-        # get secret used to create one time password
-        otp_secret = self.get_otp_secret()
+    def issue_one_time_password(self):
+        """
+        :return: one time password replacing any outstanding one the user has.
+        """
+        # the user's id keys their one time password
+        if self.id is None:
+            db.session.flush()
+        return OneTimePassword.issue(user_id=self.id)
 
-        # verify one time password validity
-        is_valid = pyotp.TOTP(otp_secret, interval=expiry_interval).verify(
-            one_time_password
+    def verify_otp(self, one_time_password):
+        """
+        :param one_time_password: one time password sent to the user.
+        :return: boolean if the one time password is valid, a valid one time password can not be used again.
+        """
+        return OneTimePassword.verify(
+            user_id=self.id, one_time_password=one_time_password
         )
 
-        return is_valid
-
     def bind_user_to_organization(self, organization: Organization):
         if not self.parent_organization:
             self.parent_organization = organization
@@ -303,8 +322,10 @@ class User(BaseModel):
         # check that role is supported in system constants
         if role not in SUPPORTED_ROLES:
             raise RoleNotFoundException("The provided role is not supported")
-        user_role = Role.query.filter_by(name=role).first()
-        self.role_id = user_role.id
+        role_id = get_role_id(role)
+        if role_id is None:
+            raise RoleNotFoundException("The provided role has not been seeded")
+        self.role_id = role_id
 
     def __repr__(self):
         return "User %r" % self.phone
@@ -3,7 +3,6 @@ otp_verification_json_schema = {
     "properties": {
         "phone": {"type": "string"},
         "otp": {"type": "string"},
-        "otp_expiry_interval": {"type": "number"},
     },
-    "required": ["phone", "otp", "otp_expiry_interval"],
+    "required": ["phone", "otp"],
 }
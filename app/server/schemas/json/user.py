@@ -6,7 +6,7 @@ user_json_schema = {
         "email": {"type": "string"},
         "phone": {"type": "string"},
         "address": {"type": "string"},
-        "date_of_birth": {"type": "date"},
+        "date_of_birth": {"type": "string", "format": "date"},
         "id_type": {"type": "string"},
         "id_value": {"type": "string"},
         "password": {"type": "string"},
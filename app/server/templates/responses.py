@@ -55,3 +55,59 @@ def mailer_not_configured():
 def otp_resent_successfully():
     response = {"message": "Pin resent successfully.", "status": "Success"}
     return response, 200
+
+
+def invalid_pagination_cursor():
+    response = {
+        "error": {
+            "message": "Please provide a valid pagination cursor.",
+            "status": "Fail",
+        }
+    }
+    return response, 400
+
+
+def invalid_import_format(mimetype: str):
+    response = {
+        "error": {
+            "message": "Unsupported import content type: {}. Please use text/csv or application/x-ndjson.".format(
+                mimetype
+            ),
+            "status": "Fail",
+        }
+    }
+    return response, 400
+
+
+def import_file_too_large(max_upload_size: int):
+    response = {
+        "error": {
+            "message": "Import file is too large. Please upload files of at most {} bytes.".format(
+                max_upload_size
+            ),
+            "status": "Fail",
+        }
+    }
+    return response, 413
+
+
+def import_job_not_found(job_id: str):
+    response = {
+        "error": {
+            "message": "Import job with id {} not found.".format(job_id),
+            "status": "Fail",
+        }
+    }
+    return response, 404
+
+
+def invalid_export_format(export_format: str):
+    response = {
+        "error": {
+            "message": "Unsupported export format: {}. Please use ndjson or csv.".format(
+                export_format
+            ),
+            "status": "Fail",
+        }
+    }
+    return response, 400
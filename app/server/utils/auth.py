@@ -1,19 +1,86 @@
+from flask import g
 from flask import jsonify
 from flask import make_response
 from flask import request
 from functools import partial
 from functools import wraps
+from sqlalchemy.orm import joinedload
 from typing import List
 from typing import Optional
 
+from app.config import get_settings
 from app.server.models.user import User
-
-
-def requires_auth(function=None, authenticated_roles: Optional[List] = None):
+from app.server.utils.token_version import cache_token_version
+from app.server.utils.token_version import get_cached_token_version
+
+
+def _load_user(user_id: int) -> Optional[User]:
+    # load user and role in a single query
+    return (
+        User.query.options(joinedload(User.role))
+        .filter_by(id=user_id)
+        .execution_options(show_all=True)
+        .first()
+    )
+
+
+def _has_current_token_version(decoded_user_data: dict) -> bool:
+    """
+    :param decoded_user_data: authentication token payload.
+    :return: True if the token carries its user's current token version, according to the token version cache.
+    """
+    cached_token_version = get_cached_token_version(decoded_user_data.get("id"))
+    return cached_token_version is not None and cached_token_version == (
+        decoded_user_data.get("token_version", 0)
+    )
+
+
+def get_active_user() -> Optional[User]:
+    """
+    Users authorised from trusted token claims are only loaded on first access.
+    :return: the user authenticated by requires_auth for the current request.
+    """
+    if "active_user" not in g:
+        auth_token_payload = g.get("auth_token_payload", None)
+        if auth_token_payload is None:
+            return None
+        g.active_user = _load_user(auth_token_payload.get("id"))
+    return g.active_user
+
+
+def get_active_user_role() -> Optional[str]:
+    """
+    :return: the role of the user authenticated by requires_auth for the current request.
+    """
+    active_user = g.get("active_user", None)
+    if active_user:
+        return active_user.role.name if active_user.role else None
+
+    auth_token_payload = g.get("auth_token_payload", None)
+    if auth_token_payload:
+        return auth_token_payload.get("role", None)
+    return None
+
+
+def requires_auth(
+    function=None,
+    authenticated_roles: Optional[List] = None,
+    trusted_claims: bool = False,
+):
+    """
+    :param function: view function to guard.
+    :param authenticated_roles: roles allowed to access the view.
+    :param trusted_claims: authorise from the token's claims without loading the user when trusted claims are
+    enabled and the token carries its user's current token version. Meant for read only views.
+    """
     # returns a partial function that could take more arguments
     # implemented like this to keep this extensible but closed for modification.
     if function is None:
-        return partial(requires_auth, authenticated_roles=authenticated_roles)
+        return partial(
+            requires_auth,
+            authenticated_roles=authenticated_roles,
+            trusted_claims=trusted_claims,
+        )
 
     @wraps(function)
     def wrapper(*args, **kwargs):
@@ -35,27 +102,51 @@ def requires_auth(function=None, authenticated_roles: Optional[List] = None):
 
             if not isinstance(decoded_user_data, str):
 
-                user = (
-                    User.query.filter_by(id=decoded_user_data.get("id"))
-                    .execution_options(show_all=True)
-                    .first()
-                )
+                trust_claims = trusted_claims and get_settings().AUTH_TRUSTED_CLAIMS
 
-                if not user:
-                    response = {
-                        "error": {"message": "User not found.", "status": "Fail"}
-                    }
-                    return make_response(jsonify(response), 401)
+                if trust_claims and _has_current_token_version(decoded_user_data):
+                    # drop any user resolved earlier in this app context so that
+                    # get_active_user lazy loads the user this token belongs to
+                    g.pop("active_user", None)
+                    g.auth_token_payload = decoded_user_data
+
+                    is_activated = decoded_user_data.get("is_activated", False)
+                    user_role = decoded_user_data.get("role", None)
 
-                if not user.is_activated:
+                else:
+                    user = _load_user(decoded_user_data.get("id"))
+
+                    if not user:
+                        response = {
+                            "error": {"message": "User not found.", "status": "Fail"}
+                        }
+                        return make_response(jsonify(response), 401)
+
+                    # check that the token has not been revoked
+                    if decoded_user_data.get("token_version", 0) != user.token_version:
+                        response = {
+                            "error": {
+                                "message": "Token has been revoked. Please log in again.",
+                                "status": "Fail",
+                            }
+                        }
+                        return make_response(jsonify(response), 401)
+
+                    if trust_claims:
+                        cache_token_version(user.id, user.token_version)
+
+                    # resolve authenticated user once per request
+                    g.active_user = user
+
+                    is_activated = user.is_activated
+                    user_role = user.role.name if user.role else None
+
+                if not is_activated:
                     response = {
                         "error": {"message": "User not activated.", "status": "Fail"}
                     }
                     return make_response(jsonify(response), 401)
 
-                # get user role
-                user_role = decoded_user_data.get("role", None)
-
                 if len(authenticated_roles) > 0:
                     # check if user's role matches any of the required roles
                     if user_role not in authenticated_roles:
@@ -67,6 +158,8 @@ def requires_auth(function=None, authenticated_roles: Optional[List] = None):
                         }
                         return make_response(jsonify(response), 401)
 
+                g.auth_token_payload = decoded_user_data
+
                 return function(*args, **kwargs)
 
             # if returned decoded data is a message.
@@ -0,0 +1,124 @@
+"""
+This module is responsible for caching blacklisted authentication token lookups.
+
+Lookups resolve in the following order:
+ - the process-wide LRU cache, which holds blacklisted tokens until they expire.
+ - redis, which holds blacklisted tokens until they expire and is shared by all application processes.
+ - the process-wide LRU cache for tokens recently found not to be blacklisted.
+ - the blacklisted_tokens table.
+"""
+import hashlib
+import math
+import time
+from functools import lru_cache
+from typing import Optional
+
+import jwt
+from redis.exceptions import RedisError
+
+from app.config import get_settings
+from app.server import app_logger
+from app.server import get_redis_client
+from app.server.utils.cache import LRUCache
+
+BLACKLISTED_TOKEN_KEY_PREFIX = "blacklisted_token:"
+
+
+@lru_cache(maxsize=None)
+def get_blacklist_cache() -> LRUCache:
+    """
+    :return: process-wide cache of blacklisted token lookups.
+    """
+    return LRUCache(max_size=get_settings().BLACKLIST_CACHE_MAX_SIZE)
+
+
+def get_token_digest(token) -> str:
+    """
+    :param token: authentication token.
+    :return: hex encoded sha256 digest of the token.
+    """
+    return hashlib.sha256(str(token).encode("utf-8")).hexdigest()
+
+
+def get_token_expiry(token) -> Optional[int]:
+    """
+    Reads the expiry claim of an authentication token without verifying it.
+    :param token: authentication token.
+    :return: expiry as a unix timestamp.
+    """
+    try:
+        payload = jwt.decode(
+            token,
+            algorithms=["HS256"],
+            options={"verify_signature": False, "verify_exp": False},
+        )
+        return payload.get("exp")
+    except jwt.InvalidTokenError:
+        return None
+
+
+def _get_seconds_to_expiry(expires_at: Optional[int]) -> Optional[int]:
+    if expires_at is None:
+        return None
+    return math.ceil(expires_at - time.time())
+
+
+def cache_blacklisted_token(token_digest: str, expires_at: Optional[int] = None):
+    """
+    Writes a blacklisted token through to the process cache and redis until the token expires.
+    :param token_digest: digest of the authentication token.
+    :param expires_at: token expiry as a unix timestamp.
+    """
+    seconds_to_expiry = _get_seconds_to_expiry(expires_at)
+
+    # expired tokens are rejected before the blacklist is checked
+    if seconds_to_expiry is not None and seconds_to_expiry <= 0:
+        return
+
+    get_blacklist_cache().set(token_digest, True, ttl=seconds_to_expiry)
+
+    try:
+        get_redis_client().set(
+            BLACKLISTED_TOKEN_KEY_PREFIX + token_digest, 1, ex=seconds_to_expiry
+        )
+    except RedisError as exception:
+        app_logger.warning(f"Failed to cache blacklisted token in redis: {exception}")
+
+
+def cache_non_blacklisted_token(token_digest: str):
+    """
+    Caches a token found not to be blacklisted in the process cache for a short period.
+    :param token_digest: digest of the authentication token.
+    """
+    get_blacklist_cache().set(
+        token_digest, False, ttl=get_settings().BLACKLIST_CACHE_NEGATIVE_TTL
+    )
+
+
+def get_cached_blacklist_status(token_digest: str) -> Optional[bool]:
+    """
+    :param token_digest: digest of the authentication token.
+    :return: True if blacklisted, False if recently found not to be blacklisted, None if unknown.
+    """
+    is_blacklisted = get_blacklist_cache().get(token_digest)
+
+    if is_blacklisted:
+        return True
+
+    # tokens blacklisted by other processes are only visible in redis
+    try:
+        key = BLACKLISTED_TOKEN_KEY_PREFIX + token_digest
+        seconds_to_expiry = get_redis_client().ttl(key)
+
+        # redis returns -2 for missing keys and -1 for keys without an expiry
+        if seconds_to_expiry != -2:
+            get_blacklist_cache().set(
+                token_digest,
+                True,
+                ttl=seconds_to_expiry if seconds_to_expiry > 0 else None,
+            )
+            return True
+    except RedisError as exception:
+        app_logger.warning(f"Failed to read blacklisted token from redis: {exception}")
+
+    return is_blacklisted
@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    A thread safe, size bounded least recently used cache whose entries can expire after a time to live.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        """
+        :param max_size: maximum number of entries held before the least recently used entry is evicted.
+        :param ttl: default time to live in seconds for entries, None means entries do not expire.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        :param key: cache key.
+        :param default: value returned if the key is absent or expired.
+        :return: cached value.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        """
+        :param key: cache key.
+        :param value: value to cache.
+        :param ttl: time to live in seconds for this entry, defaults to the cache's ttl.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+
+            # evict least recently used entries
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,109 @@
+"""
+This module is responsible for streaming query results as ndjson or csv exports.
+
+Rows are read from a server side cursor in batches, serialized one at a time and detached from the session once
+written, so memory use stays flat however many rows are exported.
+"""
+
+import csv
+import io
+import json
+import re
+
+from flask import Response
+from flask import stream_with_context
+
+# rows fetched from the server side cursor at a time
+EXPORT_BATCH_SIZE = 1000
+
+# bytes buffered before a chunk is written to the response
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# leading characters spreadsheet applications evaluate a cell as a formula for
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@")
+
+# phone numbers and signed numbers start with a formula prefix but evaluate to themselves
+CSV_LITERAL_PATTERN = re.compile(r"[+-]?\d[\d\s().-]*")
+
+
+def _iterate_rows(query, batch_size: int):
+    for row in query.yield_per(batch_size):
+        yield row
+        query.session.expunge(row)
+
+
+def _format_csv_value(value):
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    # quote cells that would otherwise be evaluated as formulas when opened in a spreadsheet
+    if (
+        isinstance(value, str)
+        and value.startswith(CSV_FORMULA_PREFIXES)
+        and not CSV_LITERAL_PATTERN.fullmatch(value)
+    ):
+        return f"'{value}"
+    return value
+
+
+def generate_ndjson(query, schema, batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    :param query: query whose rows to export.
+    :param schema: marshmallow schema serializing a single row.
+    :param batch_size: rows fetched from the server side cursor at a time.
+    :return: generator of ndjson chunks.
+    """
+    buffer = io.StringIO()
+    for row in _iterate_rows(query, batch_size):
+        buffer.write(json.dumps(schema.dump(row).data))
+        buffer.write("\n")
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def generate_csv(query, schema, batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    :param query: query whose rows to export.
+    :param schema: marshmallow schema serializing a single row.
+    :param batch_size: rows fetched from the server side cursor at a time.
+    :return: generator of csv chunks, with a header row taken from the schema's fields.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=sorted(schema.fields))
+    writer.writeheader()
+    for row in _iterate_rows(query, batch_size):
+        row_data = schema.dump(row).data
+        writer.writerow(
+            {field: _format_csv_value(value) for field, value in row_data.items()}
+        )
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_export(query, schema, export_format: str, filename: str) -> Response:
+    """
+    :param query: query whose rows to export.
+    :param schema: marshmallow schema serializing a single row.
+    :param export_format: one of ndjson or csv.
+    :param filename: name of the downloaded file, without an extension.
+    :return: streaming response.
+    """
+    if export_format == "csv":
+        chunks = generate_csv(query, schema)
+    else:
+        chunks = generate_ndjson(query, schema)
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}.{export_format}"
+        },
+    )
@@ -0,0 +1,61 @@
+"""
+This module is responsible for queueing emails for the worker, which sends them in batches over a shared mail server
+connection.
+"""
+
+import json
+from typing import List
+from typing import Optional
+
+from app.config import get_settings
+from app.server import get_redis_client
+
+EMAIL_QUEUE_KEY = "email_queue"
+
+# emails sent per connection when MAILER_MAX_EMAILS is not configured
+DEFAULT_MAX_EMAILS_PER_CONNECTION = 100
+
+
+def get_max_emails_per_connection() -> int:
+    return int(get_settings().MAILER_MAX_EMAILS or DEFAULT_MAX_EMAILS_PER_CONNECTION)
+
+
+def enqueue_email(
+    mail_sender: str,
+    email_recipients: list,
+    subject: str,
+    text_body: Optional[str] = None,
+    html_body: Optional[str] = None,
+):
+    """
+    :param mail_sender: the email that the organization uses to send out emails.
+    :param email_recipients: a list of email address that will receive an email.
+    :param subject: email subject.
+    :param text_body: text version constituting email body.
+    :param html_body: html version constituting email body.
+    """
+    get_redis_client().rpush(
+        EMAIL_QUEUE_KEY,
+        json.dumps(
+            {
+                "mail_sender": mail_sender,
+                "email_recipients": email_recipients,
+                "subject": subject,
+                "text_body": text_body,
+                "html_body": html_body,
+            }
+        ),
+    )
+
+
+def dequeue_emails(max_emails: int) -> List[dict]:
+    """
+    Atomically removes emails from the front of the email queue.
+    :param max_emails: maximum number of emails to remove.
+    :return: removed emails.
+    """
+    pipeline = get_redis_client().pipeline()
+    pipeline.lrange(EMAIL_QUEUE_KEY, 0, max_emails - 1)
+    pipeline.ltrim(EMAIL_QUEUE_KEY, max_emails, -1)
+    queued_emails, _ = pipeline.execute()
+    return [json.loads(queued_email) for queued_email in queued_emails]
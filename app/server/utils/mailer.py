@@ -1,31 +1,48 @@
-import jinja2
-import os
-
 from datetime import datetime
+from functools import lru_cache
+from typing import Tuple
+
 from flask import current_app
 
-from app.server import config
+from app.config import get_settings
 from app.server import app_logger
 from app.server import ContextEnvironment
+from app.server import template_engine
 from app.server.models.organization import Organization
+from app.server.utils.mail_queue import enqueue_email
 from app.server.templates.mail_messages import MailMessage
+from app.server.utils.cache import LRUCache
 from worker import tasks
 
 
+@lru_cache(maxsize=None)
+def get_organization_mailer_cache() -> LRUCache:
+    """
+    Organization details are refreshed in worker mailers after ORGANIZATION_MAILER_CACHE_TTL seconds.
+    :return: process-wide cache of organization mailers.
+    """
+    settings = get_settings()
+    return LRUCache(
+        max_size=settings.ORGANIZATION_MAILER_CACHE_MAX_SIZE,
+        ttl=settings.ORGANIZATION_MAILER_CACHE_TTL,
+    )
+
+
 def check_mailer_configured(organization: Organization):
     settings = organization
     # check that mailing sender is configured
     mailer_setting_missing = True
     if settings:
         # get mailer settings
+        app_settings = get_settings()
         mailer_settings = [
-            config.MAILER_SERVER,
-            config.MAILER_PORT,
-            config.MAILER_USERNAME,
-            config.MAILER_PASSWORD,
-            config.MAILER_DEFAULT_SENDER,
-            config.MAILER_USE_SSL,
-            config.MAILER_USE_TSL,
+            app_settings.MAILER_SERVER,
+            app_settings.MAILER_PORT,
+            app_settings.MAILER_USERNAME,
+            app_settings.MAILER_PASSWORD,
+            app_settings.MAILER_DEFAULT_SENDER,
+            app_settings.MAILER_USE_SSL,
+            app_settings.MAILER_USE_TSL,
         ]
         # check if any is None
         mailer_setting_missing = any(setting is None for setting in mailer_settings)
@@ -42,12 +59,7 @@ def _get_email_template(template_file):
     :param template_file: name of the template file.
     :return: email template file.
     """
-    search_path = os.path.join(current_app.config["BASEDIR"], "templates")
-
-    template_loader = jinja2.FileSystemLoader(searchpath=search_path)
-    template_environment = jinja2.Environment(loader=template_loader)
-
-    return template_environment.get_template(template_file)
+    return template_engine.get_template(template_file)
 
 
 def _get_mail_body(
@@ -96,7 +108,7 @@ def mail_handler(
     email_recipients: list, mail_sender: str, subject: str, text_body, html_body=None
 ):
     context_env = ContextEnvironment(current_app)
-    if context_env.is_development or context_env.is_testing:
+    if context_env.is_development() or context_env.is_testing():
         recipients_logging_format = ", ".join(email_recipients)
         app_logger.info(
             "IS NOT PRODUCTION NOT ACTUALLY SENDING:\n"
@@ -107,21 +119,36 @@ def mail_handler(
         )
 
     else:
-        tasks.send_email.delay(mail_sender, email_recipients, subject, html_body)
+        # queue email for the worker to send over a shared mail server connection
+        enqueue_email(
+            mail_sender=mail_sender,
+            email_recipients=email_recipients,
+            subject=subject,
+            text_body=text_body,
+            html_body=html_body,
+        )
+        tasks.send_queued_emails.delay()
 
 
 class Mailer:
     def __init__(self, organization: Organization):
         self.organization = organization
+        self.organization_id = organization.id
         self.organization_name = organization.name
         self.mail_message = MailMessage(self.organization_name)
-        self.mail_sender = config.MAILER_DEFAULT_SENDER
+        self.mail_sender = get_settings().MAILER_DEFAULT_SENDER
         self.organization_address = organization.address
-        self.organization_domain = config.APP_DOMAIN
-
-    def send_template_email(
-        self, mail_type: str, email: str, given_names: str, token: str
-    ):
+        self.organization_domain = get_settings().APP_DOMAIN
+
+    def render_template_email(
+        self, mail_type: str, given_names: str, token: str
+    ) -> Tuple[str, str, str]:
+        """
+        :param mail_type: type of email to render, eg: user_activation.
+        :param given_names: The recipient's given names for mail personalization.
+        :param token: token embedded in the email's action url.
+        :return: email subject, text body and html body.
+        """
         if mail_type == "user_activation":
             action_url = self.organization_domain + f"/login?activation_token={token}"
             action_tag, mail_message = self.mail_message.activate_user_mail_message()
@@ -161,10 +188,45 @@ class Mailer:
             organization_name=self.organization_name,
         )
 
+        return action_tag, text_body, html_body
+
+    def send_template_email(
+        self, mail_type: str, email: str, given_names: str, token: str
+    ):
+        if get_settings().MAILER_RENDER_IN_WORKER:
+            # only enqueue a descriptor, the worker renders and sends the email
+            tasks.send_template_email.delay(
+                mail_type=mail_type,
+                email=email,
+                given_names=given_names,
+                organization_id=self.organization_id,
+                token=token,
+            )
+            return
+
+        subject, text_body, html_body = self.render_template_email(
+            mail_type=mail_type, given_names=given_names, token=token
+        )
+
         mail_handler(
             email_recipients=[email],
             html_body=html_body,
             mail_sender=self.mail_sender,
-            subject=action_tag,
+            subject=subject,
             text_body=text_body,
         )
+
+
+def get_organization_mailer(organization_id: int) -> Mailer:
+    """
+    :param organization_id: id of the organization sending emails.
+    :return: mailer for the organization, cached for ORGANIZATION_MAILER_CACHE_TTL seconds.
+    """
+    mailer = get_organization_mailer_cache().get(organization_id)
+    if mailer is None:
+        organization = Organization.query.get(organization_id)
+        if organization is None:
+            raise ValueError(f"Organization with id {organization_id} not found.")
+        mailer = Mailer(organization)
+        get_organization_mailer_cache().set(organization_id, mailer)
+    return mailer
@@ -1,27 +1,28 @@
 from flask import current_app
 
+from app.config import get_settings
 from app.server import app_logger
 from app.server import ContextEnvironment
-from app.server import sms
 from app.server.models.user import User
+from app.server.utils.sms import enqueue_sms
+from worker import tasks
 
 
 def send_sms(message: str, phone_number: str):
     context_env = ContextEnvironment(current_app)
-    if context_env.is_development or context_env.is_testing:
+    if context_env.is_development() or context_env.is_testing():
         app_logger.info(
             "IS NOT PRODUCTION NOT ACTUALLY SENDING:\n"
             f"Recipient: {phone_number}\n"
             f"Message: {message}"
         )
     else:
-        # TODO: [Philip] Make SMS asynchronous
-        response = sms.send(message=message, recipients=[phone_number])
-
-        return response
+        # queue message for the worker to coalesce with other queued messages and send
+        enqueue_sms(message=message, phone_number=phone_number)
+        tasks.send_queued_sms.apply_async(countdown=get_settings().SMS_BATCH_DELAY)
 
 
 def send_one_time_pin(user: User):
-    otp = user.set_otp_secret()
+    otp = user.issue_one_time_password()
     message = f"Hello {user.given_names}, your activation code is: {otp}"
     send_sms(message=message, phone_number=user.phone)
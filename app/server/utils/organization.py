@@ -1,13 +1,86 @@
+from functools import lru_cache
 from jsonschema import ValidationError
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from typing import Optional
 
+from app.config import get_settings
 from app.server import db
 from app.server.models.organization import Organization
 from app.server.schemas.organization import organization_schema
 from app.server.schemas.json.organization import organization_json_schema
 from app.server.templates.responses import invalid_request_on_validation
+from app.server.utils.cache import LRUCache
 from app.server.utils.validation import validate_request
 
 
+@lru_cache(maxsize=None)
+def get_organization_cache() -> LRUCache:
+    """
+    Organizations are cached as column snapshots, since orm objects are bound to the session that loaded them.
+    :return: process-wide cache of organization snapshots.
+    """
+    settings = get_settings()
+    return LRUCache(
+        max_size=settings.ORGANIZATION_CACHE_MAX_SIZE,
+        ttl=settings.ORGANIZATION_CACHE_TTL,
+    )
+
+
+def _get_organization_cache_keys(organization: Organization):
+    cache_keys = [
+        ("id", organization.id),
+        ("public_identifier", organization.public_identifier),
+    ]
+    if organization.is_master:
+        cache_keys.append(("is_master", True))
+    return cache_keys
+
+
+def cache_organization(organization: Organization):
+    """
+    :param organization: organization loaded from the db.
+    """
+    snapshot = {
+        attribute.key: getattr(organization, attribute.key)
+        for attribute in inspect(Organization).column_attrs
+    }
+    for cache_key in _get_organization_cache_keys(organization):
+        get_organization_cache().set(cache_key, snapshot)
+
+
+def invalidate_organization_cache(organization: Organization):
+    """
+    :param organization: organization whose cached snapshots to remove.
+    """
+    for cache_key in _get_organization_cache_keys(organization):
+        get_organization_cache().delete(cache_key)
+
+
+def get_cached_organization(attribute: str, value) -> Optional[Organization]:
+    """
+    Read-through lookup of an organization by id, public identifier or master status. Cached organizations are merged
+    into the current session without querying the db.
+    :param attribute: one of id, public_identifier or is_master.
+    :param value: value of the attribute to look up.
+    :return: organization attached to the current session, or None if no organization matches.
+    """
+    snapshot = get_organization_cache().get((attribute, value))
+    if snapshot is None:
+        organization = Organization.query.filter_by(**{attribute: value}).first()
+        if organization is not None:
+            cache_organization(organization)
+        return organization
+
+    organization = Organization(**snapshot)
+    make_transient_to_detached(organization)
+    return db.session.merge(organization, load=False)
+
+
+def get_master_organization() -> Optional[Organization]:
+    return get_cached_organization("is_master", True)
+
+
 def create_organization(address=None, is_master=False, name=None) -> Organization:
     """
     This function creates an organization with attributes  provided.
@@ -27,7 +100,7 @@ def update_organization(
     organization: Organization, address=None, name=None
 ) -> Organization:
     """
-    This functions updates an organization's attributes.
+    This functions updates an organization's attributes. Callers invalidate its cached snapshots once committed.
     :param address:
     :param organization: The organization object to modify
     :param name: The organizations name.
@@ -0,0 +1,263 @@
+"""
+This module is responsible for hashing and checking user passwords.
+
+Password hashes are stored in a versioned format which records the algorithm and cost parameters used:
+
+    v1$<algorithm>$<parameters>$<hash encrypted with the system password pepper>
+
+Hashes stored before the versioned format was introduced are peppered bcrypt hashes without a header. Hashes whose
+algorithm or parameters differ from the configured ones are upgraded when the user next logs in.
+
+bcrypt and argon2 release the GIL while hashing, so checks can optionally run on a bounded thread pool. This caps how
+many CPU bound checks run at once. The calling thread still waits for its check, so the pool limits concurrency but
+does not reduce the latency of a check.
+"""
+
+from abc import ABC
+from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from threading import Lock
+from typing import Optional
+from typing import Tuple
+from typing import TYPE_CHECKING
+
+import argon2
+import bcrypt
+
+from app.config import get_settings
+from app.server.exceptions import InvalidPasswordHashException
+
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
+
+PASSWORD_HASH_FORMAT_VERSION = "v1"
+
+_password_check_executor = None
+_password_check_executor_lock = Lock()
+
+
+class PasswordHasher(ABC):
+    """
+    Base class for password hashing algorithms.
+    """
+
+    algorithm = None
+
+    def __init__(self, **parameters):
+        self.parameters = parameters
+
+    @abstractmethod
+    def hash(self, password: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def verify(self, password: bytes, password_hash: bytes) -> bool:
+        pass
+
+    def encode_parameters(self) -> str:
+        return ",".join(
+            f"{name}={value}" for name, value in sorted(self.parameters.items())
+        )
+
+    @classmethod
+    def from_encoded_parameters(cls, encoded_parameters: str) -> "PasswordHasher":
+        parameters = dict(
+            parameter.split("=") for parameter in encoded_parameters.split(",")
+        )
+        return cls(**{name: int(value) for name, value in parameters.items()})
+
+
+def _checkpw(password: bytes, password_hash: bytes) -> bool:
+    try:
+        return bcrypt.checkpw(password, password_hash)
+    except ValueError:
+        raise InvalidPasswordHashException("Invalid bcrypt password hash.")
+
+
+class BcryptPasswordHasher(PasswordHasher):
+    algorithm = "bcrypt"
+
+    def __init__(self, rounds: int):
+        super().__init__(rounds=rounds)
+
+    def hash(self, password: bytes) -> bytes:
+        salt = bcrypt.gensalt(rounds=self.parameters["rounds"])
+        return bcrypt.hashpw(password, salt)
+
+    def verify(self, password: bytes, password_hash: bytes) -> bool:
+        return _checkpw(password, password_hash)
+
+
+class Argon2idPasswordHasher(PasswordHasher):
+    algorithm = "argon2id"
+
+    def __init__(self, time_cost: int, memory_cost: int, parallelism: int):
+        super().__init__(
+            time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+        )
+        self._hasher = argon2.PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            type=argon2.Type.ID,
+        )
+
+    def hash(self, password: bytes) -> bytes:
+        return self._hasher.hash(password).encode()
+
+    def verify(self, password: bytes, password_hash: bytes) -> bool:
+        try:
+            return self._hasher.verify(password_hash, password)
+        except argon2.exceptions.VerificationError:
+            return False
+        except argon2.exceptions.InvalidHash:
+            raise InvalidPasswordHashException("Invalid argon2 password hash.")
+
+
+PASSWORD_HASHERS = {
+    BcryptPasswordHasher.algorithm: BcryptPasswordHasher,
+    Argon2idPasswordHasher.algorithm: Argon2idPasswordHasher,
+}
+
+
+@lru_cache(maxsize=None)
+def get_pepper_cipher() -> "Fernet":
+    """
+    :return: process-wide cipher for the system password pepper, built on first use.
+    """
+    # cryptography is slow to import, so it is only loaded by processes that hash or check passwords
+    from cryptography.fernet import Fernet
+
+    return Fernet(get_settings().PASSWORD_PEPPER)
+
+
+@lru_cache(maxsize=None)
+def get_default_password_hasher() -> PasswordHasher:
+    """
+    :return: password hasher for the configured algorithm and parameters.
+    """
+    settings = get_settings()
+    if settings.PASSWORD_HASH_ALGORITHM == Argon2idPasswordHasher.algorithm:
+        return Argon2idPasswordHasher(
+            time_cost=settings.ARGON2_TIME_COST,
+            memory_cost=settings.ARGON2_MEMORY_COST,
+            parallelism=settings.ARGON2_PARALLELISM,
+        )
+    if settings.PASSWORD_HASH_ALGORITHM == BcryptPasswordHasher.algorithm:
+        return BcryptPasswordHasher(rounds=settings.BCRYPT_ROUNDS)
+    raise ValueError(
+        f"Unsupported password hash algorithm: {settings.PASSWORD_HASH_ALGORITHM}"
+    )
+
+
+def get_password_check_executor() -> ThreadPoolExecutor:
+    """
+    :return: process-wide thread pool for password checks.
+    """
+    global _password_check_executor
+    if _password_check_executor is None:
+        with _password_check_executor_lock:
+            if _password_check_executor is None:
+                _password_check_executor = ThreadPoolExecutor(
+                    max_workers=get_settings().PASSWORD_CHECK_POOL_SIZE,
+                    thread_name_prefix="password-check",
+                )
+    return _password_check_executor
+
+
+@lru_cache(maxsize=32)
+def _get_password_hasher(algorithm: str, encoded_parameters: str) -> PasswordHasher:
+    password_hasher = PASSWORD_HASHERS.get(algorithm)
+    if password_hasher is None:
+        raise InvalidPasswordHashException(
+            f"Unsupported password hash algorithm: {algorithm}"
+        )
+
+    try:
+        return password_hasher.from_encoded_parameters(encoded_parameters)
+    except (TypeError, ValueError):
+        raise InvalidPasswordHashException(
+            f"Invalid password hash parameters: {encoded_parameters}"
+        )
+
+
+def parse_password_hash(password_hash: str) -> Tuple[Optional[PasswordHasher], str]:
+    """
+    :param password_hash: password hash stored in db.
+    :return: the hasher that produced the hash, None for unversioned hashes, and the peppered hash.
+    """
+    if not password_hash.startswith(PASSWORD_HASH_FORMAT_VERSION + "$"):
+        return None, password_hash
+
+    try:
+        _, algorithm, encoded_parameters, peppered_hash = password_hash.split("$", 3)
+    except ValueError:
+        raise InvalidPasswordHashException("Malformed password hash.")
+    return _get_password_hasher(algorithm, encoded_parameters), peppered_hash
+
+
+def hash_password(password: str, hasher: Optional[PasswordHasher] = None) -> str:
+    """
+    :param password: user password.
+    :param hasher: password hasher to use, defaults to the configured algorithm and parameters.
+    :return: versioned password hash.
+    """
+    hasher = hasher or get_default_password_hasher()
+    peppered_hash = get_pepper_cipher().encrypt(hasher.hash(password.encode()))
+    return "$".join(
+        [
+            PASSWORD_HASH_FORMAT_VERSION,
+            hasher.algorithm,
+            hasher.encode_parameters(),
+            peppered_hash.decode(),
+        ]
+    )
+
+
+def _check_password(password: str, password_hash: str) -> bool:
+    # cryptography is slow to import, so it is only loaded by processes that hash or check passwords
+    from cryptography.fernet import InvalidToken
+
+    hasher, peppered_hash = parse_password_hash(password_hash)
+    try:
+        decrypted_password_hash = get_pepper_cipher().decrypt(peppered_hash.encode())
+    except InvalidToken:
+        raise InvalidPasswordHashException("Invalid password pepper encryption.")
+
+    # unversioned hashes are bcrypt hashes
+    if hasher is None:
+        return _checkpw(password.encode(), decrypted_password_hash)
+    return hasher.verify(password.encode(), decrypted_password_hash)
+
+
+def check_password(password: str, password_hash: str) -> bool:
+    """
+    Checks a password on the password check thread pool if one is configured.
+    :param password: provided user password.
+    :param password_hash: password hash stored in db.
+    :return: boolean if password matches.
+    """
+    try:
+        if get_settings().PASSWORD_CHECK_POOL_SIZE > 0:
+            executor = get_password_check_executor()
+            return executor.submit(_check_password, password, password_hash).result()
+        return _check_password(password, password_hash)
+
+    # a hash that can not be parsed can not be matched
+    except InvalidPasswordHashException:
+        return False
+
+
+def password_hash_needs_upgrade(password_hash: str) -> bool:
+    """
+    :param password_hash: password hash stored in db.
+    :return: True if the hash was not produced with the configured algorithm and parameters.
+    """
+    hasher, _ = parse_password_hash(password_hash)
+    default_hasher = get_default_password_hasher()
+    return (
+        hasher is None
+        or hasher.algorithm != default_hasher.algorithm
+        or hasher.parameters != default_hasher.parameters
+    )
@@ -1,6 +1,25 @@
+from functools import lru_cache
+from typing import List
+from typing import Optional
+from typing import Tuple
+
 import phonenumbers
 
-from flask import current_app
+from phonenumbers import NumberParseException
+
+from app.config import get_settings
+
+# normalised phone numbers kept per process, parsing is pure so entries never go stale
+PHONE_NUMBER_CACHE_SIZE = 10000
+
+
+@lru_cache(maxsize=PHONE_NUMBER_CACHE_SIZE)
+def _normalise_phone_number(phone_number: str, region: str) -> str:
+    # failed parses raise, so invalid phone numbers are never cached
+    phone_number_object = phonenumbers.parse(phone_number, region)
+    return phonenumbers.format_number(
+        phone_number_object, phonenumbers.PhoneNumberFormat.E164
+    )
 
 
 def process_phone_number(phone_number, region=None, ignore_region=False):
@@ -18,7 +37,7 @@ def process_phone_number(phone_number, region=None, ignore_region=False):
         return phone_number
 
     if region is None:
-        region = current_app.config["DEFAULT_COUNTRY"]
+        region = get_settings().DEFAULT_COUNTRY
 
     if not isinstance(phone_number, str):
         try:
@@ -27,10 +46,36 @@ def process_phone_number(phone_number, region=None, ignore_region=False):
         except ValueError:
             pass
 
-    phone_number_object = phonenumbers.parse(phone_number, region)
+    return _normalise_phone_number(phone_number, region)
 
-    parsed_phone_number = phonenumbers.format_number(
-        phone_number_object, phonenumbers.PhoneNumberFormat.E164
-    )
 
-    return parsed_phone_number
+def process_phone_numbers(
+    phone_numbers: list, region: Optional[str] = None
+) -> List[Tuple[Optional[str], Optional[NumberParseException]]]:
+    """
+    Parse a batch of phone numbers, parsing each distinct phone number once.
+    :param phone_numbers: phone numbers to parse, empty values are returned as None.
+    :param region: ISO 3166-1 alpha-2 codes
+    :return: (parsed phone number, parse error) for each given phone number, in order.
+    """
+    if region is None:
+        region = get_settings().DEFAULT_COUNTRY
+
+    parsed_phone_numbers = {}
+    results = []
+    for phone_number in phone_numbers:
+        if phone_number in (None, ""):
+            results.append((None, None))
+            continue
+
+        if phone_number not in parsed_phone_numbers:
+            try:
+                parsed_phone_numbers[phone_number] = (
+                    process_phone_number(phone_number, region),
+                    None,
+                )
+            except NumberParseException as exception:
+                parsed_phone_numbers[phone_number] = (None, exception)
+        results.append(parsed_phone_numbers[phone_number])
+
+    return results
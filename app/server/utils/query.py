@@ -1,47 +1,198 @@
+import base64
+import json
+import math
+from functools import lru_cache
+
 from dateutil import parser
 from flask import request
+from sqlalchemy import text
+from sqlalchemy import tuple_
+
+from app.config import get_settings
+from app.server.exceptions import InvalidPaginationCursorException
+from app.server.utils.cache import LRUCache
+
+COUNT_STRATEGIES = ["exact", "cached", "estimate"]
+
+
+@lru_cache(maxsize=None)
+def get_count_cache() -> LRUCache:
+    """
+    :return: process-wide cache of query counts.
+    """
+    return LRUCache(max_size=1024, ttl=get_settings().PAGINATION_COUNT_CACHE_TTL)
+
+
+def encode_pagination_cursor(item) -> str:
+    """
+    :param item: last item on a page.
+    :return: opaque cursor pointing after the item in (created_at, id) order.
+    """
+    cursor = json.dumps([item.created_at.isoformat(), item.id]).encode()
+    return base64.urlsafe_b64encode(cursor).decode().rstrip("=")
+
+
+def decode_pagination_cursor(cursor: str):
+    """
+    :param cursor: cursor returned by encode_pagination_cursor.
+    :return: tuple of the created_at and id the cursor points after.
+    """
+    try:
+        padded_cursor = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded_cursor))
+        return parser.isoparse(created_at), int(item_id)
+    except (TypeError, ValueError) as exception:
+        raise InvalidPaginationCursorException(
+            f"Invalid pagination cursor: {cursor}"
+        ) from exception
+
+
+def get_per_page(per_page=None) -> int:
+    """
+    :param per_page: requested page size.
+    :return: page size, defaulting to and capped by the configured page size limits.
+    """
+    if per_page is None:
+        return get_settings().PAGINATION_DEFAULT_PER_PAGE
+    return max(1, min(int(per_page), get_settings().PAGINATION_MAX_PER_PAGE))
+
+
+def apply_loader_profile(query, queried_object, profile: str):
+    """
+    Eager loads the relationships a serializer reads, so serializing a page of items runs a fixed number of queries.
+    :param query: base query
+    :param queried_object: underlying object being queried, defining its loader profiles.
+    :param profile: name of the loader profile, eg: list or detail.
+    :return: query with the profile's loader options applied.
+    """
+    return query.options(*queried_object.loader_profiles[profile])
+
+
+def get_cached_count(query) -> int:
+    """
+    :param query: query to count.
+    :return: number of rows the query returns, cached for PAGINATION_COUNT_CACHE_TTL seconds per statement.
+    """
+    compiled_statement = query.statement.compile()
+    cache_key = (
+        str(compiled_statement),
+        tuple(sorted(compiled_statement.params.items())),
+    )
+
+    total_items = get_count_cache().get(cache_key)
+    if total_items is None:
+        total_items = query.count()
+        get_count_cache().set(cache_key, total_items)
+    return total_items
+
+
+def get_estimated_count(query, queried_object=None) -> int:
+    """
+    Estimates the number of rows in an unfiltered query from the planner statistics postgres keeps in pg_class.
+    Filtered queries and tables estimated to hold fewer than PAGINATION_COUNT_ESTIMATE_THRESHOLD rows, whose
+    statistics are least reliable and which are cheap to count, fall back to cached counts.
+
+    :param query: query to count.
+    :param queried_object: underlying object being queried.
+    :return: estimated number of rows the query returns.
+    """
+    if queried_object is None or query.whereclause is not None:
+        return get_cached_count(query)
+
+    estimated_count = query.session.execute(
+        text(
+            "SELECT reltuples::bigint FROM pg_class "
+            "WHERE relname = :table_name AND relkind = 'r'"
+        ),
+        {"table_name": queried_object.__tablename__},
+    ).scalar()
+
+    if (
+        estimated_count is None
+        or estimated_count < get_settings().PAGINATION_COUNT_ESTIMATE_THRESHOLD
+    ):
+        return get_cached_count(query)
+    return estimated_count
+
+
+def count_query(query, queried_object=None, count_strategy: str = "exact") -> int:
+    """
+    :param query: query to count.
+    :param queried_object: underlying object being queried.
+    :param count_strategy: one of exact, cached or estimate.
+    :return: number of rows the query returns.
+    """
+    query = query.order_by(None)
+    if count_strategy == "cached":
+        return get_cached_count(query)
+    if count_strategy == "estimate":
+        return get_estimated_count(query, queried_object)
+    return query.count()
 
 
 def paginate_query(query, queried_object=None, order_override=None):
     """
     Paginates an sqlalchemy query, gracefully managing missing queries.
     Default ordering is to show most recently created first.
-    Unlike raw paginate, defaults to showing all results if args aren't supplied
+    Pages default to PAGINATION_DEFAULT_PER_PAGE items and are capped at PAGINATION_MAX_PER_PAGE items.
+
+    Passing a cursor argument (empty for the first page) switches to keyset pagination on (created_at, id), which
+    reads the same number of rows however deep the page is. Cursor pagination requires a queried object and ignores
+    the order override.
+
+    Passing include_count=false skips counting the total number of items. Passing count=exact, cached or estimate
+    overrides the configured PAGINATION_COUNT_STRATEGY for counting them.
 
     :param query: base query
     :param queried_object: underlying object being queried. Required to sort most recent
     :param order_override: override option for the sort parameter.
-    :returns: tuple of (item list, total number of items, total number of pages)
+    :returns: tuple of (item list, total number of items, total number of pages, cursor for the next page)
     """
 
     updated_after = request.args.get("updated_after")
     page = request.args.get("page")
-    per_page = request.args.get("per_page")
+    per_page = get_per_page(request.args.get("per_page"))
+    cursor = request.args.get("cursor")
+    include_count = request.args.get("include_count", "true").lower() != "false"
+    count_strategy = request.args.get("count")
+    if count_strategy not in COUNT_STRATEGIES:
+        count_strategy = get_settings().PAGINATION_COUNT_STRATEGY
 
     if updated_after:
         parsed_time = parser.isoparse(updated_after)
         query = query.filter(queried_object.updated_at > parsed_time)
 
-    if order_override:
-        query = query.order_by(order_override)
-    elif queried_object:
-        query = query.order_by(queried_object.created_at.desc())
+    total_items = total_pages = None
+    if include_count:
+        total_items = count_query(query, queried_object, count_strategy)
+        total_pages = math.ceil(total_items / per_page)
 
-    if per_page is None:
+    if cursor is not None and queried_object:
+        query = query.order_by(
+            queried_object.created_at.desc(), queried_object.id.desc()
+        )
+        if cursor:
+            created_at, item_id = decode_pagination_cursor(cursor)
+            query = query.filter(
+                tuple_(queried_object.created_at, queried_object.id)
+                < tuple_(created_at, item_id)
+            )
 
-        items = query.all()
+        # fetch an extra item to tell whether there is a next page
+        items = query.limit(per_page + 1).all()
+        next_cursor = None
+        if len(items) > per_page:
+            items = items[:per_page]
+            next_cursor = encode_pagination_cursor(items[-1])
 
-        return items, len(items), 1
+        return items, total_items, total_pages, next_cursor
 
-    if page is None:
-        per_page = int(per_page)
-        paginated = query.paginate(0, per_page, error_out=False)
-
-        return paginated.items, paginated.total, paginated.pages
-
-    per_page = int(per_page)
-    page = int(page)
+    if order_override:
+        query = query.order_by(order_override)
+    elif queried_object:
+        query = query.order_by(queried_object.created_at.desc())
 
-    paginated = query.paginate(page, per_page, error_out=False)
+    page = max(1, int(page or 1))
+    items = query.limit(per_page).offset((page - 1) * per_page).all()
 
-    return paginated.items, paginated.total, paginated.pages
+    return items, total_items, total_pages, None
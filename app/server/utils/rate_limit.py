@@ -0,0 +1,196 @@
+"""
+This module is responsible for rate limiting requests with sliding window counters.
+
+Each key holds a counter per fixed window. A request is allowed while the current window's count plus the previous
+window's count, weighted by how much of the previous window still overlaps the sliding window, is within the limit.
+"""
+
+import math
+import time
+from functools import lru_cache
+from functools import partial
+from functools import wraps
+from threading import Lock
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from flask import jsonify
+from flask import make_response
+from flask import request
+from redis.exceptions import RedisError
+
+from app.config import get_settings
+from app.server import app_logger
+from app.server import get_redis_client
+from app.server.utils.cache import LRUCache
+
+RATE_LIMIT_KEY_PREFIX = "rate_limit:"
+
+
+class InMemoryRateLimitStore:
+    """
+    Holds window counters in a process-wide cache. Counters are not shared between processes.
+    """
+
+    def __init__(self, max_size: int = 100000):
+        self._counters = LRUCache(max_size=max_size)
+        self._lock = Lock()
+
+    def increment(self, key: str, window: int, period: int) -> Tuple[int, int]:
+        """
+        :param key: rate limited key.
+        :param window: index of the current window.
+        :param period: window length in seconds.
+        :return: count for the current window after incrementing it, count for the previous window.
+        """
+        with self._lock:
+            current_count = self._counters.get((key, window), 0) + 1
+            self._counters.set((key, window), current_count, ttl=period * 2)
+            previous_count = self._counters.get((key, window - 1), 0)
+        return current_count, previous_count
+
+
+class RedisRateLimitStore:
+    """
+    Holds window counters in redis, shared by all application processes.
+    """
+
+    def increment(self, key: str, window: int, period: int) -> Tuple[int, int]:
+        """
+        :param key: rate limited key.
+        :param window: index of the current window.
+        :param period: window length in seconds.
+        :return: count for the current window after incrementing it, count for the previous window.
+        """
+        current_key = f"{RATE_LIMIT_KEY_PREFIX}{key}:{window}"
+        previous_key = f"{RATE_LIMIT_KEY_PREFIX}{key}:{window - 1}"
+
+        pipeline = get_redis_client().pipeline()
+        pipeline.incr(current_key)
+        pipeline.expire(current_key, period * 2)
+        pipeline.get(previous_key)
+        current_count, _, previous_count = pipeline.execute()
+
+        return current_count, int(previous_count or 0)
+
+
+class SlidingWindowRateLimiter:
+    def __init__(self, store, limit: int, period: int):
+        """
+        :param store: window counter store.
+        :param limit: maximum number of hits allowed per sliding window.
+        :param period: sliding window length in seconds.
+        """
+        self.store = store
+        self.limit = limit
+        self.period = period
+
+    def hit(self, key: str) -> Tuple[bool, int]:
+        """
+        Records a hit against a key.
+        :param key: rate limited key.
+        :return: boolean if the hit is within the limit, seconds until the current window ends.
+        """
+        now = time.time()
+        window = int(now // self.period)
+        elapsed_in_window = now - window * self.period
+
+        try:
+            current_count, previous_count = self.store.increment(
+                key, window, self.period
+            )
+        except RedisError as exception:
+            # fail open rather than lock every user out
+            app_logger.warning(f"Failed to rate limit {key}: {exception}")
+            return True, 0
+
+        previous_window_overlap = (self.period - elapsed_in_window) / self.period
+        estimated_count = previous_count * previous_window_overlap + current_count
+
+        retry_after = math.ceil(self.period - elapsed_in_window)
+        return estimated_count <= self.limit, retry_after
+
+
+@lru_cache(maxsize=None)
+def get_rate_limit_store():
+    """
+    :return: process-wide window counter store for the configured backend.
+    """
+    rate_limit_backend = get_settings().RATE_LIMIT_BACKEND
+    if rate_limit_backend == "redis":
+        return RedisRateLimitStore()
+    if rate_limit_backend == "memory":
+        return InMemoryRateLimitStore()
+    raise ValueError(f"Unsupported rate limit backend: {rate_limit_backend}")
+
+
+@lru_cache(maxsize=None)
+def get_identifier_rate_limiter() -> SlidingWindowRateLimiter:
+    """
+    :return: process-wide rate limiter for hits against an account identifier.
+    """
+    settings = get_settings()
+    return SlidingWindowRateLimiter(
+        get_rate_limit_store(),
+        limit=settings.RATE_LIMIT_IDENTIFIER_LIMIT,
+        period=settings.RATE_LIMIT_PERIOD,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_ip_rate_limiter() -> SlidingWindowRateLimiter:
+    """
+    :return: process-wide rate limiter for hits from an ip address.
+    """
+    settings = get_settings()
+    return SlidingWindowRateLimiter(
+        get_rate_limit_store(),
+        limit=settings.RATE_LIMIT_IP_LIMIT,
+        period=settings.RATE_LIMIT_PERIOD,
+    )
+
+
+def rate_limit(
+    function=None, scope: Optional[str] = None, identifier_fields: Optional[List] = None
+):
+    """
+    Rejects requests exceeding the per ip or per identifier limits before the view runs.
+    :param function: view function to guard.
+    :param scope: name separating this view's counters from other views.
+    :param identifier_fields: request json fields identifying the account being accessed, eg: email or phone.
+    """
+    if function is None:
+        return partial(rate_limit, scope=scope, identifier_fields=identifier_fields)
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        request_data = request.get_json(silent=True) or {}
+
+        hits = [(get_ip_rate_limiter(), f"{scope}:ip:{request.remote_addr}")]
+        for field in identifier_fields or []:
+            identifier = request_data.get(field)
+            if identifier:
+                hits.append(
+                    (
+                        get_identifier_rate_limiter(),
+                        f"{scope}:{field}:{str(identifier).strip().lower()}",
+                    )
+                )
+
+        for rate_limiter, key in hits:
+            is_allowed, retry_after = rate_limiter.hit(key)
+            if not is_allowed:
+                response = {
+                    "error": {
+                        "message": "Too many attempts. Please try again later.",
+                        "status": "Fail",
+                    }
+                }
+                response = make_response(jsonify(response), 429)
+                response.headers["Retry-After"] = str(retry_after)
+                return response
+
+        return function(*args, **kwargs)
+
+    return wrapper
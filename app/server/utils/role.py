@@ -0,0 +1,44 @@
+"""
+This module is responsible for caching role reference data.
+
+Roles are seeded by seed_system_data and rarely change, so each process loads them once and resolves role names to
+ids without querying the db. The cache is reloaded when a role is missing from it or after ROLE_CACHE_TTL seconds.
+Seeding only clears the cache of the process that ran it, so running application and worker processes keep serving
+role ids changed by a seed or migration for up to ROLE_CACHE_TTL seconds.
+"""
+
+from typing import Dict
+from typing import Optional
+
+from app.server.models.role import Role
+from app.server.utils.cache import LRUCache
+
+ROLE_CACHE_TTL = 300
+
+ROLE_IDS_KEY = "role_ids"
+
+role_cache = LRUCache(max_size=1, ttl=ROLE_CACHE_TTL)
+
+
+def load_role_ids() -> Dict[str, int]:
+    """
+    :return: role ids by role name, as stored in the db.
+    """
+    roles = Role.query.execution_options(show_all=True).all()
+    return {role.name: role.id for role in roles}
+
+
+def get_role_id(name: str) -> Optional[int]:
+    """
+    :param name: role name, eg: ADMIN.
+    :return: id of the role, or None if the role has not been seeded.
+    """
+    role_ids = role_cache.get(ROLE_IDS_KEY)
+    if role_ids is None or name not in role_ids:
+        role_ids = load_role_ids()
+        role_cache.set(ROLE_IDS_KEY, role_ids)
+    return role_ids.get(name)
+
+
+def invalidate_role_cache():
+    role_cache.clear()
@@ -0,0 +1,92 @@
+"""
+This module is responsible for signing and verifying compact, expiring tokens.
+
+A token is the base64url encoded compact json of its expiry and payload, followed by a base64url encoded HMAC-SHA256
+signature of it. Signers derive their key from the application secret and a salt once, so signing and verifying a
+token is a single HMAC with no per call setup, and tokens signed for one purpose can not be verified by another
+purpose's signer.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from datetime import timedelta
+from functools import lru_cache
+
+from app.config import get_settings
+from app.server.constants import SINGLE_USE_TOKEN_LIFETIME
+from app.server.exceptions import ExpiredSignedTokenException
+from app.server.exceptions import InvalidSignedTokenException
+
+
+def _base64_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _base64_decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class TokenSigner:
+    def __init__(self, secret_key: str, salt: str, max_age: timedelta):
+        """
+        :param secret_key: application secret key.
+        :param salt: purpose of the tokens, signers with different salts can not verify each other's tokens.
+        :param max_age: time after which signed tokens expire.
+        """
+        self.max_age = int(max_age.total_seconds())
+        self._key = hashlib.sha256(
+            salt.encode("utf-8") + b"." + secret_key.encode("utf-8")
+        ).digest()
+
+    def _get_signature(self, body: bytes) -> bytes:
+        return _base64_encode(hmac.new(self._key, body, hashlib.sha256).digest())
+
+    def sign(self, payload: dict) -> str:
+        """
+        :param payload: json serializable data to sign.
+        :return: signed token.
+        """
+        expires_at = int(time.time()) + self.max_age
+        body = _base64_encode(
+            json.dumps([expires_at, payload], separators=(",", ":")).encode("utf-8")
+        )
+        return (body + b"." + self._get_signature(body)).decode("utf-8")
+
+    def verify(self, token: str) -> dict:
+        """
+        :param token: signed token.
+        :return: the signed payload.
+        """
+        try:
+            body, signature = token.encode("utf-8").split(b".")
+        except (AttributeError, UnicodeEncodeError, ValueError):
+            raise InvalidSignedTokenException("Token is malformed.")
+
+        if not hmac.compare_digest(signature, self._get_signature(body)):
+            raise InvalidSignedTokenException("Token signature not valid.")
+
+        try:
+            expires_at, payload = json.loads(_base64_decode(body))
+        except (binascii.Error, TypeError, ValueError):
+            raise InvalidSignedTokenException("Token is malformed.")
+
+        if expires_at < time.time():
+            raise ExpiredSignedTokenException("Token has expired.")
+
+        return payload
+
+
+@lru_cache(maxsize=None)
+def get_single_use_token_signer() -> TokenSigner:
+    """
+    :return: process-wide signer for single use tokens.
+    """
+    return TokenSigner(
+        secret_key=get_settings().SECRET_KEY,
+        salt="single_use_token",
+        max_age=SINGLE_USE_TOKEN_LIFETIME,
+    )
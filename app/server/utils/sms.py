@@ -0,0 +1,109 @@
+"""
+This module is responsible for queueing and delivering sms messages.
+
+Messages are queued in redis and delivered by the worker, which coalesces queued messages with the same text into
+multi recipient sends.
+"""
+
+import json
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List
+from typing import Tuple
+
+from app.config import get_settings
+from app.server import get_redis_client
+
+SMS_QUEUE_KEY = "sms_queue"
+
+
+class AfricasTalkingSmsProvider:
+    def __init__(self):
+        # imported here so only processes sending sms pay for the africa's talking client
+        import africastalking
+
+        settings = get_settings()
+        africastalking.initialize(
+            username=settings.AFRICASTALKING_USERNAME,
+            api_key=settings.AFRICASTALKING_API_KEY,
+        )
+        self.sms = africastalking.SMS
+
+    def send(self, message: str, recipients: List[str]):
+        return self.sms.send(message=message, recipients=recipients)
+
+
+class FakeSmsProvider:
+    """
+    Records messages instead of sending them, so the sms pipeline can run offline.
+    """
+
+    def __init__(self):
+        self.sent_messages = []
+
+    def send(self, message: str, recipients: List[str]):
+        self.sent_messages.append({"message": message, "recipients": recipients})
+        return {
+            "SMSMessageData": {
+                "Recipients": [
+                    {"number": recipient, "status": "Success"}
+                    for recipient in recipients
+                ]
+            }
+        }
+
+
+SMS_PROVIDERS = {"africastalking": AfricasTalkingSmsProvider, "fake": FakeSmsProvider}
+
+
+@lru_cache(maxsize=None)
+def get_sms_provider():
+    """
+    :return: process-wide client for the configured sms provider.
+    """
+    return SMS_PROVIDERS[get_settings().SMS_PROVIDER]()
+
+
+def enqueue_sms(message: str, phone_number: str):
+    """
+    :param message: sms text.
+    :param phone_number: recipient phone number.
+    """
+    get_redis_client().rpush(
+        SMS_QUEUE_KEY, json.dumps({"message": message, "phone_number": phone_number})
+    )
+
+
+def dequeue_sms(max_messages: int) -> List[dict]:
+    """
+    Atomically removes messages from the front of the sms queue.
+    :param max_messages: maximum number of messages to remove.
+    :return: removed messages.
+    """
+    pipeline = get_redis_client().pipeline()
+    pipeline.lrange(SMS_QUEUE_KEY, 0, max_messages - 1)
+    pipeline.ltrim(SMS_QUEUE_KEY, max_messages, -1)
+    queued_messages, _ = pipeline.execute()
+    return [json.loads(queued_message) for queued_message in queued_messages]
+
+
+def coalesce_sms(
+    queued_messages: List[dict], max_recipients: int
+) -> List[Tuple[str, List[str]]]:
+    """
+    Groups queued messages with the same text into batches of unique recipients.
+    :param queued_messages: messages as queued by enqueue_sms.
+    :param max_recipients: maximum number of recipients per batch.
+    :return: list of (message, recipients) batches.
+    """
+    recipients_by_message = OrderedDict()
+    for queued_message in queued_messages:
+        recipients = recipients_by_message.setdefault(queued_message["message"], [])
+        if queued_message["phone_number"] not in recipients:
+            recipients.append(queued_message["phone_number"])
+
+    batches = []
+    for message, recipients in recipients_by_message.items():
+        for index in range(0, len(recipients), max_recipients):
+            batches.append((message, recipients[index : index + max_recipients]))
+    return batches
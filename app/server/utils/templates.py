@@ -0,0 +1,42 @@
+"""
+This module is responsible for loading and caching email templates.
+
+The jinja environment is built once per process. Compiled templates are kept in memory, and their bytecode is cached on
+disk so new worker and application processes skip parsing templates again.
+"""
+
+import os
+
+import jinja2
+
+# templates compiled when the application starts
+PRECOMPILED_TEMPLATES = ["action_email.html", "action_email.txt"]
+
+
+class TemplateEngine:
+    def __init__(self, app=None):
+        self.environment = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        search_path = os.path.join(app.config["BASEDIR"], "templates")
+
+        self.environment = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(searchpath=search_path),
+            bytecode_cache=jinja2.FileSystemBytecodeCache(),
+            # only check templates for changes on disk during development
+            auto_reload=app.config["DEPLOYMENT_NAME"] == "development",
+        )
+
+        for template_file in PRECOMPILED_TEMPLATES:
+            self.environment.get_template(template_file)
+
+    def get_template(self, template_file: str) -> jinja2.Template:
+        """
+        :param template_file: name of the template file.
+        :return: compiled template.
+        """
+        if self.environment is None:
+            raise RuntimeError("Template engine has not been initialized.")
+        return self.environment.get_template(template_file)
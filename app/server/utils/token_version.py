@@ -0,0 +1,104 @@
+"""
+This module is responsible for caching each user's current authentication token version.
+
+Every authentication token carries the token version its user had when it was issued. Bumping a user's token
+version revokes all tokens issued before it. Versions are held in redis so that all application processes see a bump
+immediately, and briefly in a process-wide LRU cache.
+
+Cached versions only ever increase. A request that loaded its user before a bump was committed can not write the
+older version back, so a revocation is never undone, and other processes see a bump within TOKEN_VERSION_CACHE_TTL.
+"""
+
+from functools import lru_cache
+from threading import Lock
+from typing import Optional
+
+from redis.client import Script
+from redis.exceptions import RedisError
+
+from app.config import get_settings
+from app.server import app_logger
+from app.server import get_redis_client
+from app.server.constants import AUTHENTICATION_TOKEN_LIFETIME
+from app.server.utils.cache import LRUCache
+
+TOKEN_VERSION_KEY_PREFIX = "token_version:"
+
+# sets the token version only if it is greater than the cached one, refreshing the ttl of an equal version
+SET_GREATER_TOKEN_VERSION_SCRIPT = """
+    local cached_version = tonumber(redis.call("GET", KEYS[1]))
+    local token_version = tonumber(ARGV[1])
+    if cached_version == nil or token_version > cached_version then
+        redis.call("SET", KEYS[1], token_version, "EX", ARGV[2])
+        return 1
+    end
+    if token_version == cached_version then
+        redis.call("EXPIRE", KEYS[1], ARGV[2])
+    end
+    return 0
+    """
+
+_token_version_cache_lock = Lock()
+
+
+@lru_cache(maxsize=None)
+def get_token_version_cache() -> LRUCache:
+    """
+    :return: process-wide cache of token versions.
+    """
+    settings = get_settings()
+    return LRUCache(
+        max_size=settings.TOKEN_VERSION_CACHE_MAX_SIZE,
+        ttl=settings.TOKEN_VERSION_CACHE_TTL,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_set_greater_token_version_script() -> Script:
+    """
+    :return: SET_GREATER_TOKEN_VERSION_SCRIPT registered with the process-wide redis client.
+    """
+    return get_redis_client().register_script(SET_GREATER_TOKEN_VERSION_SCRIPT)
+
+
+def cache_token_version(user_id: int, token_version: int):
+    """
+    :param user_id: id of the user the token version belongs to.
+    :param token_version: the user's current token version, ignored if a greater version is cached.
+    """
+    token_version_cache = get_token_version_cache()
+    with _token_version_cache_lock:
+        cached_token_version = token_version_cache.get(user_id)
+        if cached_token_version is None or token_version >= cached_token_version:
+            token_version_cache.set(user_id, token_version)
+
+    try:
+        get_set_greater_token_version_script()(
+            keys=[TOKEN_VERSION_KEY_PREFIX + str(user_id)],
+            args=[token_version, int(AUTHENTICATION_TOKEN_LIFETIME.total_seconds())],
+        )
+    except RedisError as exception:
+        app_logger.warning(f"Failed to cache token version in redis: {exception}")
+
+
+def get_cached_token_version(user_id: int) -> Optional[int]:
+    """
+    :param user_id: id of the user the token version belongs to.
+    :return: the user's current token version, None if it is not cached.
+    """
+    token_version = get_token_version_cache().get(user_id)
+    if token_version is not None:
+        return token_version
+
+    try:
+        token_version = get_redis_client().get(TOKEN_VERSION_KEY_PREFIX + str(user_id))
+    except RedisError as exception:
+        app_logger.warning(f"Failed to read token version from redis: {exception}")
+        return None
+
+    if token_version is None:
+        return None
+
+    token_version = int(token_version)
+    get_token_version_cache().set(user_id, token_version)
+    return token_version
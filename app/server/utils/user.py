@@ -1,8 +1,11 @@
+from datetime import datetime
+
 from jsonschema.exceptions import ValidationError
 from phonenumbers import NumberParseException
 from typing import Optional
 
 from app.server import db
+from app.server.constants import IDENTIFICATION_TYPES
 from app.server.constants import SUPPORTED_ROLES
 from app.server.models.organization import Organization
 from app.server.models.user import SignupMethod
@@ -15,15 +18,19 @@ from app.server.templates.responses import (
 )
 from app.server.utils.mailer import Mailer, check_mailer_configured
 from app.server.utils.messaging import send_one_time_pin
+from app.server.utils.organization import get_cached_organization
+from app.server.utils.organization import get_master_organization
 from app.server.utils.phone import process_phone_number
 from app.server.utils.validation import validate_request
 
+SIGNUP_METHODS = {"MOBILE": SignupMethod.MOBILE_SIGNUP, "WEB": SignupMethod.WEB_SIGNUP}
+
+PHONE_NUMBER_MAX_LENGTH = User.__table__.c.phone.type.length
+
 
 def get_organization(public_identifier: str):
     if public_identifier:
-        organization = Organization.query.filter_by(
-            public_identifier=public_identifier
-        ).first()
+        organization = get_cached_organization("public_identifier", public_identifier)
         return organization
     raise ValueError("No organization matching public identifier was found.")
 
@@ -45,22 +52,6 @@ def get_user_from_unique_attribute(
     return user
 
 
-def get_user_role_from_auth_token(token: str):
-    decoded_user_data = User.decode_auth_token(token)
-    if not isinstance(decoded_user_data, str):
-        user = (
-            User.query.filter_by(id=decoded_user_data.get("id"))
-            .execution_options(show_all=True)
-            .first()
-        )
-        if not user:
-            raise Exception("No user found.")
-        else:
-            return user.role.name
-    else:
-        raise Exception(decoded_user_data)
-
-
 def create_user(
     given_names=None,
     surname=None,
@@ -114,7 +105,7 @@ def create_user(
 
     # unless special organization defined, default to master organization
     if not organization:
-        organization = Organization.master_organisation()
+        organization = get_master_organization()
 
     # bind user to organization
     user.bind_user_to_organization(organization)
@@ -156,34 +147,28 @@ def update_user(user, given_names=None, surname=None, address=None, date_of_birt
     return user
 
 
-def process_create_or_update_user_request(user_attributes, user_update_allowed=False):
+def validate_user_attributes(user_attributes: dict):
     """
-    :param user_update_allowed:
-    :param user_attributes:
-    :return:
+    Applies the checks run on every user registration and coerces the attributes to the user's column values.
+    :param user_attributes: user attributes as sent in a registration request.
+    :return: tuple of (validated attributes, error response, status code), the error response is None when the
+    attributes are valid.
     """
-    # get user data
-    given_names = user_attributes.get("given_names")
-    surname = user_attributes.get("surname")
-    email = user_attributes.get("email")
+    # verify request
+    try:
+        validate_request(instance=user_attributes, schema=user_json_schema)
+
+    except ValidationError as error:
+        response, status_code = invalid_request_on_validation(error.message)
+        return None, response, status_code
+
     phone = user_attributes.get("phone")
-    address = user_attributes.get("address")
     date_of_birth = user_attributes.get("date_of_birth")
     id_type = user_attributes.get("id_type")
     id_value = user_attributes.get("id_value")
     password = user_attributes.get("password")
-    signup_method = user_attributes.get("signup_method")
     public_identifier = user_attributes.get("public_identifier")
     role = user_attributes.get("role")
-    user_id = user_attributes.get("user_id")
-
-    # verify request
-    try:
-        validate_request(instance=user_attributes, schema=user_json_schema)
-
-    except ValidationError as error:
-        response, status_code = invalid_request_on_validation(error.message)
-        return response, status_code
 
     # get organization to tie user to
     organization = get_organization(public_identifier)
@@ -197,15 +182,18 @@ def process_create_or_update_user_request(user_attributes, user_update_allowed=F
             }
         }
 
-        return response, 403
+        return None, response, 403
 
     # process sign up methods
-    if signup_method:
-        if signup_method == "MOBILE":
-            signup_method = SignupMethod.MOBILE_SIGNUP
-
-        if signup_method == "WEB":
-            signup_method = SignupMethod.WEB_SIGNUP
+    signup_method = SIGNUP_METHODS.get(user_attributes.get("signup_method"))
+    if signup_method is None:
+        response = {
+            "error": {
+                "message": "Unsupported signup method provided.",
+                "status": "Fail",
+            }
+        }
+        return None, response, 422
 
     if password and len(password) < 8:
         response = {
@@ -214,121 +202,189 @@ def process_create_or_update_user_request(user_attributes, user_update_allowed=F
                 "status": "Fail",
             }
         }
-        return response, 422
+        return None, response, 422
 
     if role and role not in SUPPORTED_ROLES:
         response = {
             "error": {"message": "Unsupported role provided.", "status": "Fail"}
         }
-        return response, 422
+        return None, response, 422
 
     # validate phone
     if not phone and signup_method == SignupMethod.MOBILE_SIGNUP:
         response = {
             "error": {"message": "Phone number cannot be empty.", "status": "Fail"}
         }
-        return response, 422
-    else:
-        # check that id values are present
-        if not (id_type, id_value):
-            response = {
-                "error": {"message": "ID data cannot be empty.", "status": "Fail"}
+        return None, response, 422
+
+    # check that id values are of a known id type
+    if id_value and id_type not in IDENTIFICATION_TYPES:
+        response = {
+            "error": {
+                "message": f"Identification type {id_type} not valid",
+                "status": "Fail",
             }
-            return response, 422
+        }
+        return None, response, 422
 
-        # process phone number and ensure phone number validity
-        try:
-            phone = process_phone_number(phone)
-        except NumberParseException as exception:
-            response = {
-                "error": {
-                    "message": f"Invalid phone number. ERROR: {exception}",
-                    "status": "Fail",
-                }
+    # process phone number and ensure phone number validity
+    try:
+        phone = process_phone_number(phone)
+    except NumberParseException as exception:
+        response = {
+            "error": {
+                "message": f"Invalid phone number. ERROR: {exception}",
+                "status": "Fail",
             }
-            return response, 422
+        }
+        return None, response, 422
 
-        # check if user is already existent
-        existing_user = get_user_from_unique_attribute(
-            email=email, user_id=user_id, phone=phone
-        )
+    if phone and len(phone) > PHONE_NUMBER_MAX_LENGTH:
+        response = {
+            "error": {
+                "message": f"Invalid phone number. ERROR: {phone} is longer than {PHONE_NUMBER_MAX_LENGTH} characters.",
+                "status": "Fail",
+            }
+        }
+        return None, response, 422
 
-        # check if request is an update request
-        if existing_user and not user_update_allowed:
+    if date_of_birth:
+        try:
+            date_of_birth = datetime.strptime(date_of_birth, "%Y-%m-%d").date()
+        except ValueError:
             response = {
                 "error": {
-                    "message": "User already exists. Please Log in.",
+                    "message": f"Invalid date of birth: {date_of_birth}. Please use YYYY-MM-DD.",
                     "status": "Fail",
                 }
             }
-            return response, 403
-
-        # process update request
-        if existing_user and user_update_allowed:
-            try:
-                user = update_user(
-                    user_attributes,
-                    given_names=given_names,
-                    surname=surname,
-                    address=address,
-                    date_of_birth=date_of_birth,
-                )
-
-                response = {
-                    "data": {"user": user_schema.dump(user).data},
-                    "message": "User successfully updated.",
-                    "status": "Success",
-                }
+            return None, response, 422
+
+    validated_attributes = {
+        "given_names": user_attributes.get("given_names"),
+        "surname": user_attributes.get("surname"),
+        "email": user_attributes.get("email"),
+        "phone": phone,
+        "address": user_attributes.get("address"),
+        "date_of_birth": date_of_birth,
+        "id_type": id_type,
+        "id_value": id_value,
+        "password": password,
+        "role": role,
+        "signup_method": signup_method,
+        "organization": organization,
+    }
+    return validated_attributes, None, None
 
-                return response, 200
-
-            except Exception as exception:
-                response = {"error": {"message": f"{exception}", "status": "Fail"}}
-                return response, 400
-
-        # create user
-        user = create_user(
-            given_names=given_names,
-            surname=surname,
-            email=email,
-            phone=phone,
-            address=address,
-            date_of_birth=date_of_birth,
-            password=password,
-            id_type=id_type,
-            id_value=id_value,
-            role=role,
-            signup_method=signup_method,
-        )
-        db.session.flush()
 
-        # send user OTP to validate user's phone number
-        if signup_method == SignupMethod.MOBILE_SIGNUP:
-            send_one_time_pin(user=user)
-            response = {
-                "message": "User created. Please verify phone number.",
-                "status": "Success",
+def process_create_or_update_user_request(user_attributes, user_update_allowed=False):
+    """
+    :param user_update_allowed:
+    :param user_attributes:
+    :return:
+    """
+    validated_attributes, response, status_code = validate_user_attributes(
+        user_attributes
+    )
+    if response is not None:
+        return response, status_code
+
+    # get user data
+    given_names = validated_attributes["given_names"]
+    surname = validated_attributes["surname"]
+    email = validated_attributes["email"]
+    phone = validated_attributes["phone"]
+    address = validated_attributes["address"]
+    date_of_birth = validated_attributes["date_of_birth"]
+    id_type = validated_attributes["id_type"]
+    id_value = validated_attributes["id_value"]
+    password = validated_attributes["password"]
+    signup_method = validated_attributes["signup_method"]
+    organization = validated_attributes["organization"]
+    role = validated_attributes["role"]
+    user_id = user_attributes.get("user_id")
+
+    # check if user is already existent
+    existing_user = get_user_from_unique_attribute(
+        email=email, user_id=user_id, phone=phone
+    )
+
+    # check if request is an update request
+    if existing_user and not user_update_allowed:
+        response = {
+            "error": {
+                "message": "User already exists. Please Log in.",
+                "status": "Fail",
             }
-            return response, 200
+        }
+        return response, 403
 
-        # send email for user to validate their email as admin
-        if user.role.name == "ADMIN" and signup_method == SignupMethod.WEB_SIGNUP:
-            mailer_is_configured = check_mailer_configured(organization)
-            if not mailer_is_configured:
-                response, status_code = mailer_not_configured()
-                return response, status_code
-
-            mailer = Mailer(organization)
-            activation_token = user.encode_single_use_jws(token_type="user_activation")
-            mailer.send_template_email(
-                mail_type="user_activation",
-                token=activation_token,
-                email=user.email,
-                given_names=user.given_names,
+    # process update request
+    if existing_user and user_update_allowed:
+        try:
+            user = update_user(
+                user_attributes,
+                given_names=given_names,
+                surname=surname,
+                address=address,
+                date_of_birth=date_of_birth,
             )
 
             response = {
-                "message": "User created. Please check your email to verify your account.",
+                "data": {"user": user_schema.dump(user).data},
+                "message": "User successfully updated.",
                 "status": "Success",
             }
+
             return response, 200
+
+        except Exception as exception:
+            response = {"error": {"message": f"{exception}", "status": "Fail"}}
+            return response, 400
+
+    # create user
+    user = create_user(
+        given_names=given_names,
+        surname=surname,
+        email=email,
+        phone=phone,
+        address=address,
+        date_of_birth=date_of_birth,
+        password=password,
+        id_type=id_type,
+        id_value=id_value,
+        role=role,
+        signup_method=signup_method,
+    )
+    db.session.flush()
+
+    # send user OTP to validate user's phone number
+    if signup_method == SignupMethod.MOBILE_SIGNUP:
+        send_one_time_pin(user=user)
+        response = {
+            "message": "User created. Please verify phone number.",
+            "status": "Success",
+        }
+        return response, 200
+
+    # send email for user to validate their email as admin
+    if user.role.name == "ADMIN" and signup_method == SignupMethod.WEB_SIGNUP:
+        mailer_is_configured = check_mailer_configured(organization)
+        if not mailer_is_configured:
+            response, status_code = mailer_not_configured()
+            return response, status_code
+
+        mailer = Mailer(organization)
+        activation_token = user.encode_single_use_jws(token_type="user_activation")
+        mailer.send_template_email(
+            mail_type="user_activation",
+            token=activation_token,
+            email=user.email,
+            given_names=user.given_names,
+        )
+
+        response = {
+            "message": "User created. Please check your email to verify your account.",
+            "status": "Success",
+        }
+        return response, 200
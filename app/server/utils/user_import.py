@@ -0,0 +1,432 @@
+"""
+This module is responsible for bulk importing users from csv or ndjson files.
+
+Imports run in the worker as jobs, whose status and results are kept in redis for clients to poll. Uploaded files are
+held in redis under their job's id until the worker reads them, so task messages only carry the job id. Rows are validated
+in chunks with the checks run on single registrations, with a single query per chunk to find users that already exist.
+Passwords are hashed on a process-wide thread pool, and each chunk is inserted with a single COPY or executemany
+statement and committed. A chunk that fails to insert is retried a row at a time, so a bad row only fails itself. Rows
+that fail validation or insertion are reported by row number, counting data rows from 1, without failing the import.
+OTP and activation notifications for imported users are sent by the worker.
+"""
+
+import csv
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from enum import Enum
+from itertools import islice
+from threading import Lock
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from uuid import uuid4
+
+import psycopg2
+from flask import current_app
+from sqlalchemy import or_
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import get_settings
+from app.server import ContextEnvironment
+from app.server import db
+from app.server import get_redis_client
+from app.server.models.user import SignupMethod
+from app.server.models.user import User
+from app.server.utils.password import hash_password
+from app.server.utils.role import get_role_id
+from app.server.utils.user import validate_user_attributes
+from worker import tasks
+
+IMPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+IMPORT_JOB_KEY_PREFIX = "user_import_job:"
+
+IMPORT_UPLOAD_KEY_PREFIX = "user_import_upload:"
+
+_password_hash_executor = None
+_password_hash_executor_lock = Lock()
+
+
+class UserImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.errors = []
+
+    def add_error(self, row_number: int, message: str):
+        self.errors.append({"row": row_number, "message": message})
+
+    def to_dict(self) -> dict:
+        return {"imported": self.imported, "errors": self.errors}
+
+
+def read_csv_rows(stream) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    :param stream: text stream of a csv file with a header row.
+    :return: generator of (row number, row, parse error) tuples.
+    """
+    for row_number, row in enumerate(csv.DictReader(stream), start=1):
+        yield row_number, row, None
+
+
+def read_ndjson_rows(stream) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    :param stream: text stream of an ndjson file.
+    :return: generator of (row number, row, parse error) tuples.
+    """
+    row_number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as exception:
+            yield row_number, None, f"Invalid JSON: {exception}"
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, "Invalid JSON: each line must be an object."
+            continue
+        yield row_number, row, None
+
+
+def _validate_row(row: dict, default_public_identifier: Optional[str] = None):
+    """
+    Applies the checks run when registering a single user.
+    :param row: user attributes.
+    :param default_public_identifier: organization for rows without a public identifier.
+    :return: tuple of (user column values, password, error message).
+    """
+    # csv files have empty cells rather than missing values
+    row = {key: value for key, value in row.items() if value not in ("", None)}
+    if default_public_identifier:
+        row.setdefault("public_identifier", default_public_identifier)
+    row.setdefault("role", "CLIENT")
+
+    user_attributes, response, _ = validate_user_attributes(row)
+    if response is not None:
+        return None, None, response["error"]["message"]
+
+    role_id = get_role_id(user_attributes["role"])
+    if role_id is None:
+        return None, None, "The provided role has not been seeded."
+
+    identification = {}
+    if user_attributes["id_value"]:
+        identification[user_attributes["id_type"]] = user_attributes["id_value"]
+
+    now = datetime.utcnow()
+    return (
+        {
+            "given_names": user_attributes["given_names"],
+            "surname": user_attributes["surname"],
+            "_identification": identification,
+            "email": user_attributes["email"],
+            "phone": user_attributes["phone"],
+            "address": user_attributes["address"],
+            "date_of_birth": user_attributes["date_of_birth"],
+            "is_activated": False,
+            "token_version": 0,
+            "signup_method": user_attributes["signup_method"],
+            "parent_organization_id": user_attributes["organization"].id,
+            "role_id": role_id,
+            "created_at": now,
+            "updated_at": now,
+        },
+        user_attributes["password"],
+        None,
+    )
+
+
+def _get_existing_users(emails: List[str], phones: List[str]):
+    """
+    :return: sets of the given emails and phone numbers already used by users.
+    """
+    if not (emails or phones):
+        return set(), set()
+
+    existing_users = (
+        User.query.execution_options(show_all=True)
+        .with_entities(User.email, User.phone)
+        .filter(or_(User.email.in_(emails), User.phone.in_(phones)))
+        .all()
+    )
+    return (
+        {email for email, _ in existing_users if email},
+        {phone for _, phone in existing_users if phone},
+    )
+
+
+def _format_copy_value(value):
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+def copy_rows(table, rows: List[dict]):
+    """
+    Inserts rows with a single postgres COPY statement in the current transaction.
+    :param table: table to insert into.
+    :param rows: column values by column name, with the same columns in every row.
+    """
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    # quoting strings leaves None as an unquoted empty value, which COPY reads as NULL
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for row in rows:
+        writer.writerow([_format_copy_value(row[column]) for column in columns])
+    buffer.seek(0)
+
+    column_names = ", ".join(f'"{column}"' for column in columns)
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f'COPY "{table.name}" ({column_names}) FROM STDIN WITH (FORMAT csv)', buffer
+        )
+    finally:
+        cursor.close()
+
+
+def insert_rows(table, rows: List[dict]):
+    """
+    :param table: table to insert into.
+    :param rows: column values by column name, with the same columns in every row.
+    """
+    if get_settings().IMPORT_INSERT_METHOD == "copy":
+        copy_rows(table, rows)
+    else:
+        db.session.execute(table.insert(), rows)
+
+
+def get_password_hash_executor() -> ThreadPoolExecutor:
+    """
+    :return: process-wide thread pool for hashing imported users' passwords.
+    """
+    global _password_hash_executor
+    if _password_hash_executor is None:
+        with _password_hash_executor_lock:
+            if _password_hash_executor is None:
+                _password_hash_executor = ThreadPoolExecutor(
+                    max_workers=get_settings().IMPORT_HASH_POOL_SIZE,
+                    thread_name_prefix="import-password-hash",
+                )
+    return _password_hash_executor
+
+
+def _hash_passwords(passwords: List[str]) -> List[str]:
+    # bcrypt and argon2 release the GIL while hashing, so hashes are computed in parallel across the pool's threads
+    if get_settings().IMPORT_HASH_POOL_SIZE > 0:
+        return list(get_password_hash_executor().map(hash_password, passwords))
+    return [hash_password(password) for password in passwords]
+
+
+def _insert_user_rows(
+    row_numbers: List[int], user_rows: List[dict], result: UserImportResult
+) -> List[dict]:
+    """
+    Inserts a chunk of users in one statement, falling back to one statement per user if the chunk fails.
+    :return: column values of the inserted users.
+    """
+    try:
+        insert_rows(User.__table__, user_rows)
+        db.session.commit()
+        return user_rows
+    except (SQLAlchemyError, psycopg2.Error):
+        db.session.rollback()
+
+    # a single bad row fails the whole statement, so retry the chunk a row at a time
+    inserted_rows = []
+    for row_number, user_row in zip(row_numbers, user_rows):
+        try:
+            db.session.execute(User.__table__.insert(), user_row)
+            db.session.commit()
+        except SQLAlchemyError as exception:
+            db.session.rollback()
+            error = getattr(exception, "orig", exception)
+            result.add_error(row_number, f"Failed to import user: {error}")
+            continue
+        inserted_rows.append(user_row)
+    return inserted_rows
+
+
+def _notify_imported_users(user_rows: List[dict]):
+    """
+    Defers OTP and activation notifications for imported users to the worker.
+    :param user_rows: column values of the imported users.
+    """
+    phones = [
+        user_row["phone"]
+        for user_row in user_rows
+        if user_row["signup_method"] == SignupMethod.MOBILE_SIGNUP
+    ]
+    admin_role_id = get_role_id("ADMIN")
+    emails = [
+        user_row["email"]
+        for user_row in user_rows
+        if user_row["signup_method"] == SignupMethod.WEB_SIGNUP
+        and user_row["role_id"] == admin_role_id
+        and user_row["email"]
+    ]
+    if not (phones or emails):
+        return
+
+    imported_users = (
+        User.query.execution_options(show_all=True)
+        .with_entities(User.id)
+        .filter(or_(User.phone.in_(phones), User.email.in_(emails)))
+        .all()
+    )
+    user_ids = [imported_user.id for imported_user in imported_users]
+
+    context_env = ContextEnvironment(current_app)
+    if context_env.is_development() or context_env.is_testing():
+        tasks.send_user_import_notifications(user_ids)
+    else:
+        tasks.send_user_import_notifications.delay(user_ids)
+
+
+def _import_chunk(
+    chunk: list,
+    result: UserImportResult,
+    default_public_identifier: Optional[str] = None,
+):
+    validated_rows = []
+    for row_number, row, error in chunk:
+        if error is None:
+            user_row, password, error = _validate_row(row, default_public_identifier)
+        if error is not None:
+            result.add_error(row_number, error)
+            continue
+        validated_rows.append((row_number, user_row, password))
+
+    # users imported by earlier chunks are committed, so the db covers them too
+    existing_emails, existing_phones = _get_existing_users(
+        [user_row["email"] for _, user_row, _ in validated_rows if user_row["email"]],
+        [user_row["phone"] for _, user_row, _ in validated_rows if user_row["phone"]],
+    )
+
+    row_numbers = []
+    user_rows = []
+    passwords = []
+    for row_number, user_row, password in validated_rows:
+        email, phone = user_row["email"], user_row["phone"]
+        if (email and email in existing_emails) or (phone and phone in existing_phones):
+            result.add_error(row_number, "User already exists.")
+            continue
+        if email:
+            existing_emails.add(email)
+        if phone:
+            existing_phones.add(phone)
+        row_numbers.append(row_number)
+        user_rows.append(user_row)
+        passwords.append(password)
+
+    if not user_rows:
+        return
+
+    for user_row, password_hash in zip(user_rows, _hash_passwords(passwords)):
+        user_row["password_hash"] = password_hash
+
+    inserted_rows = _insert_user_rows(row_numbers, user_rows, result)
+    result.imported += len(inserted_rows)
+    if inserted_rows:
+        _notify_imported_users(inserted_rows)
+
+
+def import_users(
+    stream, import_format: str, default_public_identifier: Optional[str] = None
+) -> UserImportResult:
+    """
+    :param stream: text stream of the file to import.
+    :param import_format: one of csv or ndjson.
+    :param default_public_identifier: organization for rows without a public identifier.
+    :return: number of imported users and per row errors.
+    """
+    if import_format == "csv":
+        rows = read_csv_rows(stream)
+    else:
+        rows = read_ndjson_rows(stream)
+
+    result = UserImportResult()
+    while True:
+        chunk = list(islice(rows, get_settings().IMPORT_CHUNK_SIZE))
+        if not chunk:
+            break
+        _import_chunk(chunk, result, default_public_identifier)
+
+    return result
+
+
+def set_import_job(job_id: str, job: dict):
+    """
+    :param job_id: id of the import job.
+    :param job: status of the import job, and its results once complete.
+    """
+    get_redis_client().set(
+        IMPORT_JOB_KEY_PREFIX + job_id,
+        json.dumps(job),
+        ex=get_settings().IMPORT_JOB_TTL,
+    )
+
+
+def get_import_job(job_id: str) -> Optional[dict]:
+    """
+    :param job_id: id of the import job.
+    :return: status of the import job, and its results once complete, or None for unknown or expired jobs.
+    """
+    job = get_redis_client().get(IMPORT_JOB_KEY_PREFIX + job_id)
+    if job is None:
+        return None
+    return json.loads(job)
+
+
+def set_import_upload(job_id: str, contents: bytes):
+    """
+    :param job_id: id of the import job.
+    :param contents: contents of the file to import, held until the job reads them or IMPORT_JOB_TTL seconds.
+    """
+    get_redis_client().set(
+        IMPORT_UPLOAD_KEY_PREFIX + job_id,
+        contents,
+        ex=get_settings().IMPORT_JOB_TTL,
+    )
+
+
+def pop_import_upload(job_id: str) -> Optional[str]:
+    """
+    :param job_id: id of the import job.
+    :return: contents of the file to import, or None for unknown, expired or already read uploads.
+    """
+    pipeline = get_redis_client().pipeline()
+    pipeline.get(IMPORT_UPLOAD_KEY_PREFIX + job_id)
+    pipeline.delete(IMPORT_UPLOAD_KEY_PREFIX + job_id)
+    contents, _ = pipeline.execute()
+    if contents is None:
+        return None
+    return contents.decode("utf-8", "replace")
+
+
+def queue_import_users(
+    contents: bytes, import_format: str, default_public_identifier: Optional[str] = None
+) -> str:
+    """
+    Queues an import of users to run in the worker.
+    :param contents: contents of the file to import.
+    :param import_format: one of csv or ndjson.
+    :param default_public_identifier: organization for rows without a public identifier.
+    :return: id of the import job.
+    """
+    job_id = uuid4().hex
+    set_import_upload(job_id, contents)
+    set_import_job(job_id, {"id": job_id, "status": "QUEUED"})
+
+    context_env = ContextEnvironment(current_app)
+    if context_env.is_development() or context_env.is_testing():
+        tasks.import_users_file(job_id, import_format, default_public_identifier)
+    else:
+        tasks.import_users_file.delay(job_id, import_format, default_public_identifier)
+    return job_id
@@ -1,6 +1,83 @@
+"""
+This module is responsible for validating request data against the json schemas in app/server/schemas/json.
+
+Every schema is checked and compiled once, when this module is imported. Validation runs through code generated by
+fastjsonschema, and only falls back to jsonschema's validator to report errors for invalid data, so error messages
+keep jsonschema's format.
+"""
+
+import importlib
+import os
+import pkgutil
+from typing import Dict
+
+import fastjsonschema
 from jsonschema import Draft7Validator
 
+JSON_SCHEMAS_PACKAGE = "app.server.schemas.json"
+JSON_SCHEMAS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "schemas", "json"
+)
+
+
+class CompiledValidator:
+    def __init__(self, schema: dict):
+        Draft7Validator.check_schema(schema)
+        self.schema = schema
+        self.validator = Draft7Validator(schema=schema)
+        self.compiled_validate = fastjsonschema.compile(schema)
+
+    def validate(self, instance):
+        """
+        :param instance: data to validate.
+        :raises jsonschema.exceptions.ValidationError: if the data does not match the schema.
+        """
+        try:
+            self.compiled_validate(instance)
+        except fastjsonschema.JsonSchemaException:
+            self.validator.validate(instance)
+
+
+class ValidatorRegistry:
+    def __init__(self):
+        self._validators = {}
+
+    def register(self, schema: dict) -> CompiledValidator:
+        validator = CompiledValidator(schema)
+        self._validators[id(schema)] = validator
+        return validator
+
+    def get_validator(self, schema: dict):
+        """
+        :param schema: json schema.
+        :return: the compiled validator for registered schemas, a new jsonschema validator otherwise.
+        """
+        validator = self._validators.get(id(schema))
+        if validator is None or validator.schema is not schema:
+            return Draft7Validator(schema=schema)
+        return validator
+
+    def __len__(self):
+        return len(self._validators)
+
+
+def load_json_schemas() -> Dict[str, dict]:
+    """
+    :return: json schemas defined in app/server/schemas/json, by name.
+    """
+    json_schemas = {}
+    for module_info in pkgutil.iter_modules([JSON_SCHEMAS_PATH]):
+        module = importlib.import_module(f"{JSON_SCHEMAS_PACKAGE}.{module_info.name}")
+        for name, value in vars(module).items():
+            if name.endswith("_json_schema") and isinstance(value, dict):
+                json_schemas[name] = value
+    return json_schemas
+
+
+validator_registry = ValidatorRegistry()
+for json_schema in load_json_schemas().values():
+    validator_registry.register(json_schema)
+
 
 def validate_request(instance: dict, schema: dict):
-    validator = Draft7Validator(schema=schema)
-    return validator.validate(instance)
+    return validator_registry.get_validator(schema).validate(instance)
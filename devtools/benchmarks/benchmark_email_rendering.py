@@ -0,0 +1,82 @@
+"""
+Benchmarks email body rendering in renders per second.
+
+Compares the previous implementation, which built a jinja environment and compiled the template from disk on every
+render, with the application template engine.
+
+usage: python devtools/benchmarks/benchmark_email_rendering.py [--renders 1000]
+"""
+
+import argparse
+import os
+import time
+
+import jinja2
+
+from app.server import boilerplate_app
+from app.server import template_engine
+
+TEMPLATE_CONTEXT = {
+    "action": "Reset your password",
+    "action_tag": "Sample Organization: Reset your password",
+    "action_url": "http://localhost:9000/reset-password?token=token",
+    "copyright_year": 2020,
+    "given_names": "Jane",
+    "mail_message": "Follow the link below to reset your password.",
+    "organization_address": "P.O. Box 00000-00100",
+    "organization_name": "Sample Organization",
+}
+
+
+def previous_get_email_template(search_path: str, template_file: str):
+    template_loader = jinja2.FileSystemLoader(searchpath=search_path)
+    template_environment = jinja2.Environment(loader=template_loader)
+    return template_environment.get_template(template_file)
+
+
+def measure_renders_per_second(get_template, template_file: str, renders: int):
+    """
+    :param get_template: function returning a compiled template for a template file.
+    :param template_file: name of the template file.
+    :param renders: number of renders to run.
+    :return: renders per second.
+    """
+    start = time.perf_counter()
+    for _ in range(renders):
+        get_template(template_file).render(**TEMPLATE_CONTEXT)
+    elapsed = time.perf_counter() - start
+    return renders / elapsed
+
+
+def run(renders: int):
+    app = boilerplate_app()
+    search_path = os.path.join(app.config["BASEDIR"], "templates")
+
+    benchmarks = []
+    for template_file in ["action_email.html", "action_email.txt"]:
+        benchmarks.append(
+            (
+                f"previous, {template_file}",
+                lambda name: previous_get_email_template(search_path, name),
+                template_file,
+            )
+        )
+        benchmarks.append(
+            (
+                f"template engine, {template_file}",
+                template_engine.get_template,
+                template_file,
+            )
+        )
+
+    print(f"{'benchmark':<45}renders/s")
+    for name, get_template, template_file in benchmarks:
+        rate = measure_renders_per_second(get_template, template_file, renders)
+        print(f"{name:<45}{rate:.2f}")
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--renders", type=int, default=1000)
+    arguments = argument_parser.parse_args()
+    run(arguments.renders)
@@ -0,0 +1,89 @@
+"""
+Benchmarks import time of the application's entry point modules against a budget.
+
+Each module is imported in a fresh interpreter with python -X importtime, and the cumulative import time of the module
+is read from the report. The best of several runs is compared with the module's budget, and the slowest imports it
+pulls in are listed. The script exits with a non zero status if a module is over its budget.
+
+usage: python devtools/benchmarks/benchmark_import_time.py [--runs 5] [--top 10] [--module app.server]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# budgets in milliseconds for the cumulative import time of each module, set about 15% above the slowest result of ten
+# runs of `DEPLOYMENT_NAME=TESTING python devtools/benchmarks/benchmark_import_time.py --runs 15 --top 0` on a single
+# core machine with python 3.8. Results vary between machines and runs, so re-measure before tightening them.
+IMPORT_TIME_BUDGETS = {"app.config": 35, "app.server": 520, "worker": 615}
+
+ROOT_DIRECTORY = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+def measure_import_time(module: str):
+    """
+    :param module: module to import.
+    :return: cumulative import time of the module in milliseconds, and self and cumulative times in milliseconds of
+    every module it imported, by module name.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIRECTORY,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to import {module}:\n{result.stderr}")
+
+    # report lines read "import time: <self us> | <cumulative us> | <indented module name>"
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative_time, name = line[len("import time:") :].split("|")
+        import_times[name.strip()] = (
+            int(self_time) / 1000,
+            int(cumulative_time) / 1000,
+        )
+    return import_times[module][1], import_times
+
+
+def run(modules: list, runs: int, top: int) -> bool:
+    within_budget = True
+    print(f"{'module':<20}{'import ms':<15}{'budget ms':<15}status")
+    for module in modules:
+        measurements = [measure_import_time(module) for _ in range(runs)]
+        import_time, import_times = min(
+            measurements, key=lambda measurement: measurement[0]
+        )
+        budget = IMPORT_TIME_BUDGETS.get(module)
+        is_within_budget = budget is None or import_time <= budget
+        within_budget = within_budget and is_within_budget
+        status = "ok" if is_within_budget else "over budget"
+        print(f"{module:<20}{import_time:<15.1f}{str(budget):<15}{status}")
+
+        slowest_imports = sorted(
+            import_times.items(), key=lambda item: item[1][0], reverse=True
+        )[:top]
+        for name, (self_time, cumulative_time) in slowest_imports:
+            print(
+                f"    {name:<40}self {self_time:.1f} ms, cumulative {cumulative_time:.1f} ms"
+            )
+
+    return within_budget
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--runs", type=int, default=5)
+    argument_parser.add_argument("--top", type=int, default=10)
+    argument_parser.add_argument(
+        "--module", action="append", dest="modules", choices=sorted(IMPORT_TIME_BUDGETS)
+    )
+    arguments = argument_parser.parse_args()
+    modules = arguments.modules or list(IMPORT_TIME_BUDGETS)
+    sys.exit(0 if run(modules, arguments.runs, arguments.top) else 1)
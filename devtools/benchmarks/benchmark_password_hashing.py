@@ -0,0 +1,108 @@
+"""
+Benchmarks login password checks in logins per second per core.
+
+Compares the previous implementation, which built a pepper cipher on every call, with the password hashing service,
+both on a single thread and with one thread per core. Both hash at the same bcrypt cost, so the comparison measures
+the implementation rather than a change of work factor.
+
+The service's password check pool only caps how many checks run at once. Callers still wait for their check, so the
+pool does not reduce the latency of a login.
+
+usage: python devtools/benchmarks/benchmark_password_hashing.py [--logins 50] [--rounds 12]
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from cryptography.fernet import Fernet
+
+from app.config import get_settings
+from app.server.utils import password as password_service
+
+PASSWORD = "password-123"
+
+
+def previous_hash_password(password: str, rounds: int) -> str:
+    fernet_key = Fernet(get_settings().PASSWORD_PEPPER)
+    return fernet_key.encrypt(
+        bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds))
+    ).decode()
+
+
+def previous_check_password(password: str, hashed_password: str) -> bool:
+    fernet_key = Fernet(get_settings().PASSWORD_PEPPER)
+    hashed_password = fernet_key.decrypt(hashed_password.encode())
+    return bcrypt.checkpw(password.encode(), hashed_password)
+
+
+def measure_logins_per_second_per_core(check, password_hash, logins, threads):
+    """
+    :param check: password check function.
+    :param password_hash: hash to check the password against.
+    :param logins: number of password checks to run.
+    :param threads: number of threads running password checks concurrently.
+    :return: password checks per second, divided by the number of cores used.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(
+            executor.map(lambda _: check(PASSWORD, password_hash), range(logins))
+        )
+    elapsed = time.perf_counter() - start
+
+    assert all(results)
+    return logins / elapsed / threads
+
+
+def run(logins: int, rounds: int):
+    cores = os.cpu_count() or 1
+    previous_password_hash = previous_hash_password(PASSWORD, rounds)
+    password_hash = password_service.hash_password(
+        PASSWORD, hasher=password_service.BcryptPasswordHasher(rounds=rounds)
+    )
+
+    benchmarks = [
+        (
+            f"previous (rounds={rounds}), 1 thread",
+            previous_check_password,
+            previous_password_hash,
+            1,
+        ),
+        (
+            f"previous (rounds={rounds}), {cores} threads",
+            previous_check_password,
+            previous_password_hash,
+            cores,
+        ),
+        (
+            f"service (rounds={rounds}), 1 thread",
+            password_service.check_password,
+            password_hash,
+            1,
+        ),
+        (
+            f"service (rounds={rounds}), {cores} threads",
+            password_service.check_password,
+            password_hash,
+            cores,
+        ),
+    ]
+
+    print(f"{'benchmark':<45}logins/s/core")
+    for name, check, benchmark_password_hash, threads in benchmarks:
+        rate = measure_logins_per_second_per_core(
+            check, benchmark_password_hash, logins, threads
+        )
+        print(f"{name:<45}{rate:.2f}")
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--logins", type=int, default=50)
+    # bcrypt's default cost, which the previous implementation hashed at
+    argument_parser.add_argument("--rounds", type=int, default=12)
+    arguments = argument_parser.parse_args()
+    run(arguments.logins, arguments.rounds)
@@ -0,0 +1,75 @@
+"""
+Benchmarks phone number normalisation in numbers per second.
+
+Compares the previous implementation, which parsed and formatted every phone number and read the default country from
+the app config, with the memoised normaliser and the batch normaliser, over phone numbers drawn from a pool of
+distinct numbers as users registering and logging in repeat theirs.
+
+usage: python devtools/benchmarks/benchmark_phone_normalisation.py [--numbers 100000] [--distinct 1000]
+"""
+
+import argparse
+import random
+import time
+
+import phonenumbers
+from flask import current_app
+
+from app.server import boilerplate_app
+from app.server.utils.phone import _normalise_phone_number
+from app.server.utils.phone import process_phone_number
+from app.server.utils.phone import process_phone_numbers
+
+
+def previous_process_phone_number(phone_number, region=None):
+    if region is None:
+        region = current_app.config["DEFAULT_COUNTRY"]
+    phone_number_object = phonenumbers.parse(phone_number, region)
+    return phonenumbers.format_number(
+        phone_number_object, phonenumbers.PhoneNumberFormat.E164
+    )
+
+
+def measure_numbers_per_second(normalise, phone_numbers: list):
+    """
+    :param normalise: function normalising the list of phone numbers.
+    :param phone_numbers: phone numbers to normalise.
+    :return: numbers per second.
+    """
+    _normalise_phone_number.cache_clear()
+    start = time.perf_counter()
+    normalise(phone_numbers)
+    elapsed = time.perf_counter() - start
+    return len(phone_numbers) / elapsed
+
+
+def run(numbers: int, distinct: int):
+    app = boilerplate_app()
+    distinct_phone_numbers = [f"07{index:08d}" for index in range(distinct)]
+    phone_numbers = random.choices(distinct_phone_numbers, k=numbers)
+
+    benchmarks = [
+        (
+            "previous",
+            lambda batch: [previous_process_phone_number(phone) for phone in batch],
+        ),
+        (
+            "memoised",
+            lambda batch: [process_phone_number(phone) for phone in batch],
+        ),
+        ("batch", process_phone_numbers),
+    ]
+
+    with app.app_context():
+        print(f"{'benchmark':<20}numbers/s")
+        for name, normalise in benchmarks:
+            rate = measure_numbers_per_second(normalise, phone_numbers)
+            print(f"{name:<20}{rate:.2f}")
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--numbers", type=int, default=100000)
+    argument_parser.add_argument("--distinct", type=int, default=1000)
+    arguments = argument_parser.parse_args()
+    run(arguments.numbers, arguments.distinct)
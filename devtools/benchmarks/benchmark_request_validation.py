@@ -0,0 +1,74 @@
+"""
+Benchmarks user request validation in validations per second.
+
+Compares the previous implementation, which built a jsonschema validator on every call, with the validator registry,
+for both a valid and an invalid user payload.
+
+usage: python devtools/benchmarks/benchmark_request_validation.py [--validations 10000]
+"""
+
+import argparse
+import time
+
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import ValidationError
+
+from app.server.schemas.json.user import user_json_schema
+from app.server.utils.validation import validate_request
+
+VALID_USER_PAYLOAD = {
+    "given_names": "Jane",
+    "surname": "Doe",
+    "email": "jane@localhost.com",
+    "phone": "+254712345678",
+    "address": "P.O. Box 00000-00100",
+    "password": "password-123",
+    "signup_method": "email",
+    "public_identifier": "master-organization",
+    "role": "admin",
+}
+
+INVALID_USER_PAYLOAD = {"given_names": "Jane", "surname": "Doe"}
+
+
+def previous_validate_request(instance: dict, schema: dict):
+    validator = Draft7Validator(schema=schema)
+    return validator.validate(instance)
+
+
+def measure_validations_per_second(validate, payload: dict, validations: int):
+    """
+    :param validate: request validation function.
+    :param payload: user payload to validate.
+    :param validations: number of validations to run.
+    :return: validations per second.
+    """
+    start = time.perf_counter()
+    for _ in range(validations):
+        try:
+            validate(instance=payload, schema=user_json_schema)
+        except ValidationError:
+            pass
+    elapsed = time.perf_counter() - start
+    return validations / elapsed
+
+
+def run(validations: int):
+    benchmarks = [
+        ("previous, valid payload", previous_validate_request, VALID_USER_PAYLOAD),
+        ("registry, valid payload", validate_request, VALID_USER_PAYLOAD),
+        ("previous, invalid payload", previous_validate_request, INVALID_USER_PAYLOAD),
+        ("registry, invalid payload", validate_request, INVALID_USER_PAYLOAD),
+    ]
+
+    print(f"{'benchmark':<45}validations/s")
+    for name, validate, payload in benchmarks:
+        rate = measure_validations_per_second(validate, payload, validations)
+        print(f"{name:<45}{rate:.2f}")
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--validations", type=int, default=10000)
+    arguments = argument_parser.parse_args()
+    run(arguments.validations)
@@ -0,0 +1,68 @@
+"""
+Benchmarks single use token signing and verification in tokens per second, and token length.
+
+Compares the previous implementation, which built an itsdangerous TimedJSONWebSignatureSerializer on every sign and
+verify, with the module-level single use token signer.
+
+usage: python devtools/benchmarks/benchmark_signed_tokens.py [--tokens 10000]
+"""
+
+import argparse
+import time
+
+from itsdangerous import TimedJSONWebSignatureSerializer
+
+from app.config import get_settings
+from app.server.constants import SINGLE_USE_TOKEN_LIFETIME
+from app.server.utils.signed_token import get_single_use_token_signer
+
+PAYLOAD = {"id": 123456, "type": "reset_password"}
+
+
+def previous_sign(payload: dict) -> str:
+    signature = TimedJSONWebSignatureSerializer(
+        get_settings().SECRET_KEY,
+        expires_in=int(SINGLE_USE_TOKEN_LIFETIME.total_seconds()),
+    )
+    return signature.dumps(payload).decode("utf-8")
+
+
+def previous_verify(token: str) -> dict:
+    signature = TimedJSONWebSignatureSerializer(get_settings().SECRET_KEY)
+    return signature.loads(token.encode("utf-8"))
+
+
+def measure_tokens_per_second(function, argument, tokens: int):
+    """
+    :param function: sign or verify function.
+    :param argument: payload to sign or token to verify.
+    :param tokens: number of tokens to sign or verify.
+    :return: tokens per second.
+    """
+    start = time.perf_counter()
+    for _ in range(tokens):
+        function(argument)
+    elapsed = time.perf_counter() - start
+    return tokens / elapsed
+
+
+def run(tokens: int):
+    single_use_token_signer = get_single_use_token_signer()
+    benchmarks = [
+        ("previous", previous_sign, previous_verify),
+        ("token signer", single_use_token_signer.sign, single_use_token_signer.verify),
+    ]
+
+    print(f"{'benchmark':<20}{'sign/s':<15}{'verify/s':<15}token length")
+    for name, sign, verify in benchmarks:
+        token = sign(PAYLOAD)
+        sign_rate = measure_tokens_per_second(sign, PAYLOAD, tokens)
+        verify_rate = measure_tokens_per_second(verify, token, tokens)
+        print(f"{name:<20}{sign_rate:<15.2f}{verify_rate:<15.2f}{len(token)}")
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--tokens", type=int, default=10000)
+    arguments = argument_parser.parse_args()
+    run(arguments.tokens)
@@ -9,7 +9,7 @@ def drop_and_rebuild_sql():
     context.push()
 
     # define working database
-    working_database = config.DATABASE_NAME
+    working_database = config.get_settings().DATABASE_NAME
 
     # drop working database
     print(f"Dropping database: {working_database}")
@@ -43,6 +43,30 @@ def mock_mailing_client(mocker):
     return mails
 
 
+@pytest.fixture(scope="function")
+def count_queries(test_client):
+    """
+    Returns a context manager collecting the sql statements executed inside it.
+    """
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def query_counter():
+        statements = []
+
+        def before_cursor_execute(connection, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+    return query_counter
+
+
 @pytest.fixture(scope="function")
 def requires_auth(test_client):
     from app.server.utils.auth import requires_auth
@@ -64,8 +88,26 @@ def test_client():
 
 @pytest.fixture(scope="module")
 def initialize_database():
+    from app.server import get_redis_client
+    from app.server.utils.blacklist import BLACKLISTED_TOKEN_KEY_PREFIX
+    from app.server.utils.blacklist import get_blacklist_cache
+    from app.server.utils.organization import get_organization_cache
+    from app.server.utils.token_version import TOKEN_VERSION_KEY_PREFIX
+    from app.server.utils.token_version import get_token_version_cache
+
+    redis_client = get_redis_client()
     with current_app.app_context():
         db.create_all()
+        # cached organizations refer to rows in previously created databases
+        get_organization_cache().clear()
+        # cached token versions only increase, so versions of previous databases' users must be cleared
+        get_token_version_cache().clear()
+        for key in redis_client.scan_iter(f"{TOKEN_VERSION_KEY_PREFIX}*"):
+            redis_client.delete(key)
+        # tokens blacklisted in previous databases match tokens encoded for their users' ids within the same second
+        get_blacklist_cache().clear()
+        for key in redis_client.scan_iter(f"{BLACKLISTED_TOKEN_KEY_PREFIX}*"):
+            redis_client.delete(key)
     yield db
     with current_app.app_context():
         try:
@@ -156,11 +198,16 @@ def activated_client_user(test_client, initialize_database, create_client_user):
 
 
 @pytest.fixture(scope="function")
-def create_blacklisted_token(activated_admin_user):
+def blacklisted_auth_token(activated_admin_user):
+    return activated_admin_user.encode_auth_token().decode()
+
+
+@pytest.fixture(scope="function")
+def create_blacklisted_token(blacklisted_auth_token):
     from app.server.models.blacklisted_token import BlacklistedToken
 
-    auth_token = activated_admin_user.encode_auth_token().decode()
-    blacklisted_token = BlacklistedToken(token=auth_token)
+    blacklisted_token = BlacklistedToken(token=blacklisted_auth_token)
     db.session.add(blacklisted_token)
     db.session.commit()
+    blacklisted_token.cache()
     return blacklisted_token
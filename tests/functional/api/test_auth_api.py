@@ -1,6 +1,7 @@
 import pytest
-import pyotp
 from tests.helpers.factories import UserFactory
+from app.server import db
+from app.server.models.password_reset_token import PasswordResetToken
 from app.server.models.user import SignupMethod
 from app.server.utils.messaging import send_one_time_pin
 
@@ -88,12 +89,8 @@ def test_valid_user_activation(test_client, create_admin_user):
     assert create_admin_user.is_activated
 
 
-otp_json_with_missing_value = {"phone": "+254712345678", "otp": "654871"}
-malformed_otp_json = {
-    "phone": "+254712345678",
-    "otp": 654871,
-    "otp_expiry_interval": 3600,
-}
+otp_json_with_missing_value = {"phone": "+254712345678"}
+malformed_otp_json = {"phone": "+254712345678", "otp": 654871}
 
 
 @pytest.mark.parametrize(
@@ -123,11 +120,11 @@ def test_valid_verify_otp(test_client, create_client_user):
     THEN check that that the response is valid.
     """
     assert not create_client_user.is_activated
-    otp = create_client_user.set_otp_secret()
+    otp = create_client_user.issue_one_time_password()
     response = test_client.post(
         "/api/v1/auth/verify_otp/",
         headers={"Accept": "application/json"},
-        json={"phone": "+254712345678", "otp": otp, "otp_expiry_interval": 3600},
+        json={"phone": "+254712345678", "otp": otp},
         content_type="application/json",
     )
     assert response.status_code == 200
@@ -142,7 +139,7 @@ def test_resend_otp(
     """
     GIVEN a flask application
     WHEN a POST request is sent to '/api/v1/auth/resend_otp/'
-    THEN send back current OTP.
+    THEN send a new OTP that replaces the previous one.
     """
     user = UserFactory(
         given_names="Arya Faceless",
@@ -163,15 +160,12 @@ def test_resend_otp(
         content_type="application/json",
     )
     assert response.status_code == 200
-    otp_secret = user.get_otp_secret()
-    otp = pyotp.TOTP(otp_secret, interval=3600).now()
-    assert len(messages) == 1
-    assert messages == [
-        {
-            "phone": f"{user.phone}",
-            "message": f"Hello {user.given_names}, your activation code is: {otp}",
-        }
-    ]
+    assert len(messages) == 2
+    assert messages[-1]["phone"] == user.phone
+    message_prefix = f"Hello {user.given_names}, your activation code is: "
+    assert messages[-1]["message"].startswith(message_prefix)
+    otp = messages[-1]["message"][len(message_prefix) :]
+    assert user.verify_otp(one_time_password=otp)
 
 
 def test_login(test_client, activated_admin_user, activated_client_user):
@@ -236,30 +230,70 @@ def test_request_password_reset_email(test_client, activated_admin_user):
         content_type="application/json",
     )
     assert response.status_code == 200
-    assert len(activated_admin_user.password_reset_tokens) == 1
+    assert (
+        PasswordResetToken.query.filter_by(user_id=activated_admin_user.id).count()
+        == 1
+    )
 
 
 def test_password_reset(test_client, activated_admin_user):
     """
     GIVEN a flask application
     WHEN a post request with a valid password reset token and new password is sent to '/api/v1/auth/reset_password/'.
-    THEN check that new password is set and valid.
+    THEN check that new password is set and valid, and the token can not be used again.
     """
     password_reset_token = activated_admin_user.encode_single_use_jws(
         token_type="reset_password"
     )
+    activated_admin_user.save_password_reset_token(password_reset_token)
+    db.session.commit()
+
     authentication_token = activated_admin_user.encode_auth_token().decode()
+    request_data = {
+        "new_password": "new-password-123",
+        "password_reset_token": password_reset_token,
+    }
     response = test_client.post(
         "/api/v1/auth/reset_password/",
         headers={
             "Authorization": f"Bearer {authentication_token}",
             "Accept": "application/json",
         },
-        json={
-            "new_password": "new-password-123",
-            "password_reset_token": password_reset_token,
-        },
+        json=request_data,
         content_type="application/json",
     )
     assert response.status_code == 200
     assert activated_admin_user.verify_password("new-password-123")
+    assert (
+        PasswordResetToken.query.filter_by(user_id=activated_admin_user.id).count()
+        == 0
+    )
+
+    response = test_client.post(
+        "/api/v1/auth/reset_password/",
+        headers={"Accept": "application/json"},
+        json=request_data,
+        content_type="application/json",
+    )
+    assert response.status_code == 401
+
+
+def test_logout_all(test_client, activated_client_user):
+    """
+    GIVEN a flask application
+    WHEN a POST request is sent to '/api/v1/auth/logout/' with a valid authentication token and a logout_all action.
+    THEN check response is 200 and all tokens issued to the user are revoked.
+    """
+    authentication_token = activated_client_user.encode_auth_token().decode()
+    token_version = activated_client_user.token_version
+    response = test_client.post(
+        "/api/v1/auth/logout/",
+        headers={
+            "Authorization": f"Bearer {authentication_token}",
+            "Accept": "application/json",
+        },
+        json={"action": "logout_all"},
+        content_type="application/json",
+    )
+    assert response.status_code == 200
+    assert activated_client_user.token_version == token_version + 1
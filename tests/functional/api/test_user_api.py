@@ -1,3 +1,4 @@
+from app.server import db
 from app.server.models.user import User
 
 
@@ -21,6 +22,71 @@ def test_get_all_users(test_client, activated_admin_user):
         assert len(response.json["data"]["users"]) == len(User.query.all())
 
 
+def test_get_all_users_query_count(
+    test_client, activated_admin_user, activated_client_user, count_queries
+):
+    """
+    GIVEN a flask application
+    WHEN GET requests are sent to '/api/v1/user/' for pages of different sizes
+    THEN check the number of queries run does not depend on the number of users serialized.
+    """
+    authentication_token = activated_admin_user.encode_auth_token().decode()
+    headers = {
+        "Authorization": f"Bearer {authentication_token}",
+        "Accept": "application/json",
+    }
+
+    # warm authentication caches
+    test_client.get("/api/v1/user/?per_page=1", headers=headers)
+
+    statement_counts = []
+    for per_page in [1, User.query.count()]:
+        # drop loaded rows so relationships cannot be served from the identity map
+        db.session.expunge_all()
+        with count_queries() as statements:
+            response = test_client.get(
+                f"/api/v1/user/?per_page={per_page}", headers=headers
+            )
+        assert response.status_code == 200
+        statement_counts.append(len(statements))
+
+    assert statement_counts[0] == statement_counts[1]
+
+
+def test_get_users_by_cursor(test_client, activated_admin_user, activated_client_user):
+    """
+    GIVEN a flask application
+    WHEN GET requests are sent to '/api/v1/user/' with a pagination cursor and no total count
+    THEN check following next_cursor returns every user once, most recent first, without counting them.
+    """
+    authentication_token = activated_admin_user.encode_auth_token().decode()
+    headers = {
+        "Authorization": f"Bearer {authentication_token}",
+        "Accept": "application/json",
+    }
+
+    user_ids = []
+    cursor = ""
+    while cursor is not None:
+        response = test_client.get(
+            f"/api/v1/user/?per_page=1&include_count=false&cursor={cursor}",
+            headers=headers,
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        assert response.json["items"] is None
+        user_ids.extend(user["id"] for user in response.json["data"]["users"])
+        cursor = response.json["next_cursor"]
+
+    users = User.query.order_by(User.created_at.desc(), User.id.desc()).all()
+    assert user_ids == [user.id for user in users]
+
+    response = test_client.get(
+        "/api/v1/user/?cursor=invalid", headers=headers, content_type="application/json"
+    )
+    assert response.status_code == 400
+
+
 def test_get_single_user(test_client, activated_admin_user, activated_client_user):
     """
     GIVEN a flask application
@@ -42,6 +108,125 @@ def test_get_single_user(test_client, activated_admin_user, activated_client_use
             assert response.json["data"]["user"]["given_names"] == user.given_names
 
 
+def test_export_users(test_client, activated_admin_user, activated_client_user):
+    """
+    GIVEN a flask application
+    WHEN GET requests are sent to '/api/v1/user/export/' for ndjson and csv exports
+    THEN check every user is streamed once in the requested format.
+    """
+    import csv
+    import io
+    import json
+
+    authentication_token = activated_admin_user.encode_auth_token().decode()
+    headers = {"Authorization": f"Bearer {authentication_token}"}
+    user_ids = [user.id for user in User.query.order_by(User.id).all()]
+
+    response = test_client.get("/api/v1/user/export/?format=ndjson", headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    users = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [user["id"] for user in users] == user_ids
+    exported_admin_user = next(
+        user for user in users if user["id"] == activated_admin_user.id
+    )
+    assert exported_admin_user["role"] == activated_admin_user.role.name
+
+    response = test_client.get("/api/v1/user/export/?format=csv", headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    users = list(csv.DictReader(io.StringIO(response.data.decode())))
+    assert [int(user["id"]) for user in users] == user_ids
+
+    response = test_client.get("/api/v1/user/export/?format=xml", headers=headers)
+    assert response.status_code == 400
+
+
+def test_import_users(
+    test_client, activated_admin_user, create_master_organization, mock_sms_client
+):
+    """
+    GIVEN a flask application
+    WHEN a csv file of users is POSTED to '/api/v1/user/import/'
+    THEN check an import job is queued, valid rows are imported, invalid, duplicate and rejected rows are reported by
+    row number and OTPs are sent.
+    """
+    from app.server import get_redis_client
+    from app.server.utils.user_import import IMPORT_UPLOAD_KEY_PREFIX
+
+    authentication_token = activated_admin_user.encode_auth_token().decode()
+    headers = {"Authorization": f"Bearer {authentication_token}"}
+    public_identifier = create_master_organization.public_identifier
+    users_csv = (
+        "given_names,surname,phone,email,password,signup_method,role,date_of_birth\n"
+        "Arya,Stark,+254733445566,,password-123,MOBILE,CLIENT,\n"
+        "Sansa,Stark,not-a-phone,,password-123,MOBILE,CLIENT,\n"
+        "Ned,Stark,,admin@localhost.com,password-123,WEB,ADMIN,\n"
+        "Bran,Stark,+254733445567,,password-123,MOBILE,CLIENT,31-12-1990\n"
+        "Rickon,Stark,+254733445566778,,password-123,MOBILE,CLIENT,\n"
+        f"{'Jon' * 20},Snow,+254733445568,,password-123,MOBILE,CLIENT,\n"
+        "Robb,Stark,+254733445569,,password-123,MOBILE,CLIENT,1990-12-31\n"
+    )
+
+    response = test_client.post(
+        f"/api/v1/user/import/?public_identifier={public_identifier}",
+        headers={**headers, "Content-Type": "text/csv"},
+        data=users_csv,
+    )
+    assert response.status_code == 202
+    job_id = response.json["data"]["job_id"]
+
+    response = test_client.get(f"/api/v1/user/import/{job_id}/", headers=headers)
+    assert response.status_code == 200
+    job = response.json["data"]["job"]
+    assert job["status"] == "COMPLETE"
+    assert job["imported"] == 2
+    # the uploaded file is dropped from redis once the worker reads it
+    assert get_redis_client().get(IMPORT_UPLOAD_KEY_PREFIX + job_id) is None
+    assert sorted(error["row"] for error in job["errors"]) == [2, 3, 4, 5, 6]
+
+    imported_user = User.query.filter_by(phone="+254733445566").first()
+    assert imported_user is not None
+    assert imported_user.verify_password("password-123")
+    assert imported_user.parent_organization_id == create_master_organization.id
+    # the row rejected by the db does not fail the rest of its chunk
+    imported_user = User.query.filter_by(phone="+254733445569").first()
+    assert str(imported_user.date_of_birth) == "1990-12-31"
+    sms_phones = [sms["phone"] for sms in mock_sms_client]
+    assert "+254733445566" in sms_phones
+    assert "+254733445569" in sms_phones
+
+    response = test_client.get("/api/v1/user/import/unknown/", headers=headers)
+    assert response.status_code == 404
+
+    response = test_client.post(
+        "/api/v1/user/import/", headers=headers, json={"users": users_csv}
+    )
+    assert response.status_code == 400
+
+
+def test_import_users_file_too_large(test_client, activated_admin_user, mocker):
+    """
+    GIVEN a flask application with a maximum import file size
+    WHEN a csv file larger than the maximum is POSTED to '/api/v1/user/import/'
+    THEN check the file is rejected with a 413 and no import job is queued
+    """
+    from app.config import get_settings
+
+    authentication_token = activated_admin_user.encode_auth_token().decode()
+    headers = {"Authorization": f"Bearer {authentication_token}"}
+    mocker.patch.object(get_settings(), "IMPORT_MAX_UPLOAD_SIZE", 16)
+    queue_import_users = mocker.patch("app.server.api.user.queue_import_users")
+
+    response = test_client.post(
+        "/api/v1/user/import/",
+        headers={**headers, "Content-Type": "text/csv"},
+        data="given_names,surname,phone\nArya,Stark,+254733445566\n",
+    )
+    assert response.status_code == 413
+    assert not queue_import_users.called
+
+
 # TODO: [Philip] Refactor code to accommodate user edits
 
 
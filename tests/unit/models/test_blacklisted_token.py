@@ -1,18 +1,77 @@
-def test_create_blacklisted_token(create_blacklisted_token, activated_admin_user):
+def test_create_blacklisted_token(
+    create_blacklisted_token, blacklisted_auth_token, activated_admin_user
+):
     """
     GIVEN a BlacklistToken Model
     WHEN a new blacklisted token is created
-    THEN check blacklisted_on and check_blacklist
+    THEN check blacklisted_on, expires_at and check_blacklist
     """
     import datetime
 
     assert isinstance(create_blacklisted_token.id, int)
     assert isinstance(create_blacklisted_token.created_at, object)
-    assert datetime.datetime.now() - create_blacklisted_token.blacklisted_on <= datetime.timedelta(
-        seconds=5
+    assert (
+        datetime.datetime.now() - create_blacklisted_token.blacklisted_on
+        <= datetime.timedelta(seconds=5)
     )
+    assert len(create_blacklisted_token.token_digest) == 64
+    assert create_blacklisted_token.expires_at > datetime.datetime.utcnow()
 
-    assert create_blacklisted_token.check_if_blacklisted(create_blacklisted_token.token)
+    assert create_blacklisted_token.check_if_blacklisted(blacklisted_auth_token)
     assert not create_blacklisted_token.check_if_blacklisted(
         activated_admin_user.encode_auth_token()
     )
+
+
+def test_blacklisted_token_cache(test_client, initialize_database):
+    """
+    GIVEN a BlacklistToken Model
+    WHEN a blacklisted token is written through to the blacklist cache
+    THEN check the token is blacklisted without querying the db
+    """
+    import time
+    from app.server.models.blacklisted_token import BlacklistedToken
+    from app.server.utils.blacklist import get_blacklist_cache
+    from app.server.utils.blacklist import get_cached_blacklist_status
+
+    # tokens encoded for the same user within a second are identical, so use a token of its own
+    blacklisted_token = BlacklistedToken(
+        token="cached-token", expires_at=time.time() + 60
+    )
+    blacklisted_token.cache()
+
+    token_digest = blacklisted_token.token_digest
+    assert get_cached_blacklist_status(token_digest) is True
+
+    # redis backs the process cache
+    get_blacklist_cache().delete(token_digest)
+    assert get_cached_blacklist_status(token_digest) is True
+
+
+def test_prune_expired_blacklisted_tokens(test_client, initialize_database):
+    """
+    GIVEN blacklisted tokens
+    WHEN the prune task runs
+    THEN check only expired blacklisted tokens are deleted
+    """
+    import time
+    from app.server import db
+    from app.server.models.blacklisted_token import BlacklistedToken
+    from worker.tasks import prune_expired_blacklisted_tokens
+
+    expired_tokens = [
+        BlacklistedToken(token=f"expired-token-{index}", expires_at=time.time() - 60)
+        for index in range(3)
+    ]
+    live_token = BlacklistedToken(token="live-token", expires_at=time.time() + 60)
+    db.session.add_all(expired_tokens + [live_token])
+    db.session.commit()
+
+    assert prune_expired_blacklisted_tokens(batch_size=2) == 3
+    remaining_expired_tokens = BlacklistedToken.query.filter(
+        BlacklistedToken.token_digest.in_(
+            [token.token_digest for token in expired_tokens]
+        )
+    ).count()
+    assert remaining_expired_tokens == 0
+    assert BlacklistedToken.query.get(live_token.id) is not None
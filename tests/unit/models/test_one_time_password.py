@@ -0,0 +1,62 @@
+def test_one_time_password(test_client, create_client_user, count_queries):
+    """
+    GIVEN a OneTimePassword model
+    WHEN one time passwords are issued to a user and verified
+    THEN check codes are stored as digests, verified with a single query, consumed once and locked after too many
+    failed attempts
+    """
+    from app.config import get_settings
+    from app.server import db
+    from app.server.models.one_time_password import OneTimePassword
+
+    user = create_client_user
+    one_time_password = user.issue_one_time_password()
+    db.session.commit()
+    stored_one_time_password = OneTimePassword.query.filter_by(user_id=user.id).one()
+    assert len(one_time_password) == get_settings().OTP_LENGTH
+    assert one_time_password.isdigit()
+    assert stored_one_time_password.code_digest != one_time_password
+    user_id = user.id
+
+    wrong_one_time_password = str(
+        (int(one_time_password) + 1) % 10 ** get_settings().OTP_LENGTH
+    )
+    wrong_one_time_password = wrong_one_time_password.zfill(get_settings().OTP_LENGTH)
+    with count_queries() as statements:
+        assert not OneTimePassword.verify(user_id, wrong_one_time_password)
+    assert len(statements) == 1
+
+    assert OneTimePassword.verify(user_id, one_time_password)
+    assert not OneTimePassword.verify(user_id, one_time_password)
+
+    one_time_password = user.issue_one_time_password()
+    for _ in range(get_settings().OTP_MAX_ATTEMPTS):
+        assert not OneTimePassword.verify(user_id, wrong_one_time_password)
+    assert not OneTimePassword.verify(user_id, one_time_password)
+    db.session.commit()
+
+
+def test_prune_expired_one_time_passwords(test_client, create_client_user):
+    """
+    GIVEN one time passwords
+    WHEN the prune task runs
+    THEN check only expired one time passwords are deleted
+    """
+    from datetime import datetime
+    from datetime import timedelta
+    from app.server import db
+    from app.server.models.one_time_password import OneTimePassword
+    from worker.tasks import prune_expired_one_time_passwords
+
+    user_id = create_client_user.id
+    create_client_user.issue_one_time_password()
+    db.session.commit()
+    assert prune_expired_one_time_passwords() == 0
+    assert OneTimePassword.query.filter_by(user_id=user_id).count() == 1
+
+    OneTimePassword.query.filter_by(user_id=user_id).update(
+        {"expires_at": datetime.utcnow() - timedelta(seconds=60)}
+    )
+    db.session.commit()
+    assert prune_expired_one_time_passwords() == 1
+    assert OneTimePassword.query.filter_by(user_id=user_id).count() == 0
@@ -70,6 +70,40 @@ def test_valid_activation_token(create_admin_user):
     assert validity_check.get("status") == "Success"
 
 
+def test_verify_single_use_token_without_loading_user(
+    create_admin_user, count_queries
+):
+    """
+    GIVEN a User model
+    WHEN a single use token is verified and then decoded
+    THEN check verification does not query the db and decoding loads the user with their role in one query
+    """
+    from app.server import db
+
+    db.session.commit()
+    activation_token = create_admin_user.encode_single_use_jws(
+        token_type="user_activation"
+    )
+
+    with count_queries() as statements:
+        verified_token = create_admin_user.verify_single_use_jws(
+            token=activation_token, required_token_type="user_activation"
+        )
+        wrong_type_token = create_admin_user.verify_single_use_jws(
+            token=activation_token, required_token_type="reset_password"
+        )
+    assert len(statements) == 0
+    assert verified_token == {"status": "Success", "user_id": create_admin_user.id}
+    assert wrong_type_token["status"] == "Fail"
+
+    with count_queries() as statements:
+        decoded_token = create_admin_user.decode_single_use_jws(
+            token=activation_token, required_token_type="user_activation"
+        )
+        assert decoded_token["user"].role.name == "ADMIN"
+    assert len(statements) == 1
+
+
 def test_valid_authentication_token(activated_admin_user):
     """
     GIVEN A User Model
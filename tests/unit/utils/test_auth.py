@@ -0,0 +1,74 @@
+def test_requires_auth_resolves_active_user(
+    test_client, requires_auth, activated_admin_user
+):
+    """
+    GIVEN a view decorated with requires_auth
+    WHEN it is called with a valid authentication token
+    THEN check the authenticated user is resolved once and exposed to the view
+    """
+    from app.server.utils.auth import get_active_user
+
+    @requires_auth(authenticated_roles=["ADMIN"])
+    def view():
+        return get_active_user()
+
+    authentication_token = activated_admin_user.encode_auth_token().decode()
+    with test_client.application.test_request_context(
+        headers={"Authorization": f"Bearer {authentication_token}"}
+    ):
+        active_user = view()
+        assert active_user.id == activated_admin_user.id
+        assert "role" in active_user.__dict__
+
+
+def test_requires_auth_trusted_claims(test_client, requires_auth, activated_admin_user):
+    """
+    GIVEN a view decorated with requires_auth with trusted claims
+    WHEN it is called with a token carrying its user's current token version
+    THEN check the user is authorised without being loaded and revoked tokens are rejected
+    """
+    from flask import g
+    from app.server import db
+    from app.server.utils.auth import get_active_user_role
+    from app.server.utils.token_version import cache_token_version
+
+    @requires_auth(authenticated_roles=["ADMIN"], trusted_claims=True)
+    def view():
+        return "active_user" in g, get_active_user_role()
+
+    cache_token_version(activated_admin_user.id, activated_admin_user.token_version)
+    authentication_token = activated_admin_user.encode_auth_token().decode()
+    with test_client.application.test_request_context(
+        headers={"Authorization": f"Bearer {authentication_token}"}
+    ):
+        assert view() == (False, "ADMIN")
+
+    # revoke all tokens issued to the user
+    activated_admin_user.bump_token_version()
+    db.session.commit()
+    activated_admin_user.cache_token_version()
+    with test_client.application.test_request_context(
+        headers={"Authorization": f"Bearer {authentication_token}"}
+    ):
+        assert view().status_code == 401
+
+
+def test_cached_token_version_only_increases(test_client, activated_admin_user):
+    """
+    GIVEN a user's cached token version
+    WHEN an older token version is cached, as by a request that loaded the user before a bump was committed
+    THEN check the cached token version is not lowered in the process cache or in redis
+    """
+    from app.server.utils.token_version import cache_token_version
+    from app.server.utils.token_version import get_cached_token_version
+    from app.server.utils.token_version import get_token_version_cache
+
+    user_id = activated_admin_user.id
+    token_version = activated_admin_user.token_version
+    cache_token_version(user_id, token_version + 1)
+    cache_token_version(user_id, token_version)
+    assert get_cached_token_version(user_id) == token_version + 1
+
+    # redis backs the process cache
+    get_token_version_cache().delete(user_id)
+    assert get_cached_token_version(user_id) == token_version + 1
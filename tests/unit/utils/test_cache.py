@@ -0,0 +1,38 @@
+import time
+
+from app.server.utils.cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """
+    GIVEN an LRUCache with a max size
+    WHEN more entries than the max size are set
+    THEN check the least recently used entry is evicted
+    """
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # mark 'a' as recently used
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_expires_entries():
+    """
+    GIVEN an LRUCache
+    WHEN an entry's time to live passes
+    THEN check the entry is no longer returned
+    """
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("short_lived", True, ttl=0.01)
+    cache.set("long_lived", False)
+    time.sleep(0.02)
+
+    assert cache.get("short_lived") is None
+    assert cache.get("long_lived") is False
@@ -0,0 +1,29 @@
+import pytest
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ('=HYPERLINK("http://example.com")', '\'=HYPERLINK("http://example.com")'),
+        ("+254712345678", "+254712345678"),
+        ("+254 (712) 345-678", "+254 (712) 345-678"),
+        ("-12.5", "-12.5"),
+        ("=cmd|' /C calc'!A0", "'=cmd|' /C calc'!A0"),
+        ("+cmd|' /C calc'!A0", "'+cmd|' /C calc'!A0"),
+        ("-1+1", "'-1+1"),
+        ("@SUM(A1:A2)", "'@SUM(A1:A2)"),
+        ("Jane", "Jane"),
+        (1, 1),
+        (None, None),
+        (["=1+1"], '["=1+1"]'),
+    ],
+)
+def test_format_csv_value(value, expected):
+    """
+    GIVEN a value serialized for a csv export
+    WHEN it is formatted as a csv cell
+    THEN check cells spreadsheet applications would evaluate as formulas are quoted and phone numbers are unchanged
+    """
+    from app.server.utils.export import _format_csv_value
+
+    assert _format_csv_value(value) == expected
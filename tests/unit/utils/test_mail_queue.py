@@ -0,0 +1,56 @@
+def test_send_queued_emails(test_client, mocker):
+    """
+    GIVEN queued emails
+    WHEN the worker sends queued emails
+    THEN check emails share mail server connections up to MAILER_MAX_EMAILS and each email's outcome is reported
+    """
+    from app.config import get_settings
+    from app.server import mailer
+    from app.server import get_redis_client
+    from app.server.utils.mail_queue import EMAIL_QUEUE_KEY
+    from app.server.utils.mail_queue import enqueue_email
+    from worker.tasks import send_queued_emails
+
+    class MockConnection:
+        def __init__(self):
+            self.messages = []
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+        def send(self, message):
+            if message.recipients == ["bounce@localhost.com"]:
+                raise Exception("Recipient refused.")
+            self.messages.append(message)
+
+    connections = []
+
+    def mock_connect():
+        connections.append(MockConnection())
+        return connections[-1]
+
+    mocker.patch.object(mailer, "connect", mock_connect)
+    mocker.patch.object(get_settings(), "MAILER_MAX_EMAILS", "2")
+
+    get_redis_client().delete(EMAIL_QUEUE_KEY)
+    for recipient in [
+        "admin@localhost.com",
+        "bounce@localhost.com",
+        "client@localhost.com",
+    ]:
+        enqueue_email(
+            mail_sender="no-reply@localhost.com",
+            email_recipients=[recipient],
+            subject="Reset your password",
+            text_body="Reset your password",
+        )
+
+    results = send_queued_emails()
+
+    assert get_redis_client().llen(EMAIL_QUEUE_KEY) == 0
+    assert [len(connection.messages) for connection in connections] == [1, 1]
+    assert [result["sent"] for result in results] == [True, False, True]
+    assert results[1]["error"] == "Recipient refused."
@@ -40,3 +40,42 @@ def test_send_template_email(
     mails = mock_mailing_client
     assert len(mails) == 1
     assert mails[0].get("subject") == mail_subject
+
+
+def test_send_template_email_rendered_in_worker(
+    test_client,
+    initialize_database,
+    mock_mailing_client,
+    create_master_organization,
+    create_admin_user,
+    mocker,
+):
+    """
+    GIVEN a mailer configured to render emails in the worker
+    WHEN a template email is sent
+    THEN check the request only enqueues a descriptor and the worker renders the email and hands it to the mail handler
+    """
+    from app.config import get_settings
+    from app.server.utils.mailer import Mailer
+    from worker import tasks
+
+    mocker.patch.object(get_settings(), "MAILER_RENDER_IN_WORKER", True)
+    mock_delay = mocker.patch.object(tasks.send_template_email, "delay")
+
+    Mailer(organization=create_master_organization).send_template_email(
+        mail_type="reset_password",
+        token="token",
+        email=create_admin_user.email,
+        given_names=create_admin_user.given_names,
+    )
+
+    assert mock_mailing_client == []
+    descriptor = mock_delay.call_args[1]
+    assert descriptor["organization_id"] == create_master_organization.id
+
+    tasks.send_template_email(**descriptor)
+    mails = mock_mailing_client
+    assert len(mails) == 1
+    assert mails[0]["recipients"] == [create_admin_user.email]
+    assert mails[0]["subject"] == "Test Master Organization: Reset my password."
+    assert "/reset-password?token=token" in mails[0]["text_body"]
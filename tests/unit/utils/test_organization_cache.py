@@ -0,0 +1,35 @@
+def test_organization_cache(
+    test_client, initialize_database, create_master_organization, count_queries
+):
+    """
+    GIVEN a master organization
+    WHEN it is looked up by public identifier and as the master organization
+    THEN check repeat lookups are served from the cache until the organization is updated
+    """
+    from app.server import db
+    from app.server.utils.organization import get_cached_organization
+    from app.server.utils.organization import get_master_organization
+    from app.server.utils.organization import get_organization_cache
+    from app.server.utils.organization import invalidate_organization_cache
+    from app.server.utils.organization import update_organization
+
+    organization = create_master_organization
+    get_organization_cache().clear()
+
+    assert get_master_organization().id == organization.id
+    with count_queries() as statements:
+        assert get_master_organization().id == organization.id
+        assert (
+            get_cached_organization("public_identifier", organization.public_identifier)
+            is get_master_organization()
+        )
+        assert get_cached_organization("id", organization.id).name == organization.name
+    assert len(statements) == 0
+
+    update_organization(organization, name="Test Renamed Master Organization")
+    db.session.commit()
+    invalidate_organization_cache(organization)
+
+    with count_queries() as statements:
+        assert get_master_organization().name == "Test Renamed Master Organization"
+    assert len(statements) == 1
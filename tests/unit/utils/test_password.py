@@ -0,0 +1,105 @@
+import pytest
+
+
+def test_hash_and_check_password(test_client):
+    """
+    GIVEN the password hashing service
+    WHEN a password is hashed at a given bcrypt cost
+    THEN check the hash records its algorithm and cost, is peppered and only matches the original password
+    """
+    from app.server.utils.password import BcryptPasswordHasher
+    from app.server.utils.password import check_password
+    from app.server.utils.password import get_pepper_cipher
+    from app.server.utils.password import hash_password
+    from app.server.utils.password import parse_password_hash
+
+    password_hash = hash_password("password-123", BcryptPasswordHasher(rounds=5))
+    hasher, peppered_hash = parse_password_hash(password_hash)
+
+    assert password_hash.startswith("v1$bcrypt$rounds=5$")
+    assert hasher.parameters == {"rounds": 5}
+    assert get_pepper_cipher() is get_pepper_cipher()
+    assert get_pepper_cipher().decrypt(peppered_hash.encode()).startswith(b"$2b$05$")
+    assert check_password("password-123", password_hash)
+    assert not check_password("password-321", password_hash)
+
+
+def test_check_invalid_password_hash(test_client):
+    """
+    GIVEN stored password hashes with an unsupported algorithm or malformed parameters
+    WHEN a password is checked against them
+    THEN check the check fails instead of raising
+    """
+    from app.server.utils.password import BcryptPasswordHasher
+    from app.server.utils.password import check_password
+    from app.server.utils.password import hash_password
+
+    password_hash = hash_password("password-123", BcryptPasswordHasher(rounds=4))
+    _, _, _, peppered_hash = password_hash.split("$", 3)
+
+    for invalid_password_hash in [
+        f"v1$md5$rounds=4${peppered_hash}",
+        f"v1$bcrypt$rounds${peppered_hash}",
+        "v1$bcrypt",
+    ]:
+        assert not check_password("password-123", invalid_password_hash)
+
+
+def test_upgrade_password_hash(test_client, initialize_database, create_admin_user):
+    """
+    GIVEN a user with an unversioned password hash
+    WHEN the user's password is verified and their password hash upgraded
+    THEN check the password hash uses the configured algorithm and the password still matches
+    """
+    import bcrypt
+    from app.server.utils.password import get_pepper_cipher
+    from app.server.utils.password import password_hash_needs_upgrade
+
+    user = create_admin_user
+    user.password_hash = (
+        get_pepper_cipher()
+        .encrypt(bcrypt.hashpw(b"password-123", bcrypt.gensalt(rounds=4)))
+        .decode()
+    )
+    assert user.verify_password("password-123")
+    assert password_hash_needs_upgrade(user.password_hash)
+
+    assert user.upgrade_password_hash("password-123")
+    assert not password_hash_needs_upgrade(user.password_hash)
+    assert not user.upgrade_password_hash("password-123")
+    assert user.verify_password("password-123")
+
+
+@pytest.mark.parametrize("algorithm", ["bcrypt", "argon2id", None])
+def test_check_corrupt_password_hash(test_client, algorithm):
+    """
+    GIVEN stored password hashes whose hash or pepper encryption is corrupt
+    WHEN a password is checked against them
+    THEN check the check fails instead of raising
+    """
+    from app.server.utils.password import Argon2idPasswordHasher
+    from app.server.utils.password import BcryptPasswordHasher
+    from app.server.utils.password import check_password
+    from app.server.utils.password import get_pepper_cipher
+    from app.server.utils.password import hash_password
+
+    hashers = {
+        "bcrypt": BcryptPasswordHasher(rounds=4),
+        "argon2id": Argon2idPasswordHasher(time_cost=1, memory_cost=8, parallelism=1),
+    }
+    corrupt_hash = get_pepper_cipher().encrypt(b"not-a-password-hash").decode()
+    if algorithm is None:
+        # unversioned hashes are peppered bcrypt hashes
+        corrupt_password_hash = corrupt_hash
+        corrupt_pepper_hash = hash_password("password-123", hashers["bcrypt"]).split(
+            "$", 3
+        )[3][:-4]
+    else:
+        hasher = hashers[algorithm]
+        corrupt_password_hash = "$".join(
+            ["v1", hasher.algorithm, hasher.encode_parameters(), corrupt_hash]
+        )
+        corrupt_pepper_hash = hash_password("password-123", hasher)[:-4]
+
+    assert not check_password("password-123", corrupt_password_hash)
+    assert not check_password("password-123", corrupt_pepper_hash)
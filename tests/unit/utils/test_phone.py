@@ -19,3 +19,33 @@ def test_process_phone_number(
     THEN check that default country code is added if required
     """
     assert process_phone_number(phone, region) == expected
+
+
+def test_process_phone_numbers(test_client, initialize_database):
+    """
+    GIVEN process_phone_numbers function
+    WHEN called with a batch of valid, duplicate, empty and invalid phone numbers
+    THEN check each phone number is parsed in order and repeated phone numbers are served from the cache
+    """
+    from phonenumbers import NumberParseException
+
+    from app.server.utils.phone import _normalise_phone_number
+    from app.server.utils.phone import process_phone_numbers
+
+    _normalise_phone_number.cache_clear()
+    results = process_phone_numbers(
+        ["0712345678", "0712345678", "", None, "not-a-phone"], region="KE"
+    )
+
+    assert [phone for phone, _ in results] == [
+        "+254712345678",
+        "+254712345678",
+        None,
+        None,
+        None,
+    ]
+    assert isinstance(results[-1][1], NumberParseException)
+    assert _normalise_phone_number.cache_info().misses == 2
+
+    assert process_phone_number("0712345678", "KE") == "+254712345678"
+    assert _normalise_phone_number.cache_info().hits == 1
@@ -0,0 +1,27 @@
+def test_count_strategies(test_client, initialize_database, create_master_organization):
+    """
+    GIVEN the organizations table
+    WHEN it is counted with each count strategy
+    THEN check cached counts are reused until they expire and small tables are counted rather than estimated
+    """
+    from app.server import db
+    from app.server.models.organization import Organization
+    from app.server.utils.query import get_count_cache
+    from app.server.utils.query import count_query
+
+    get_count_cache().clear()
+    query = Organization.query.execution_options(show_all=True)
+    total_organizations = query.count()
+
+    assert count_query(query, Organization, "exact") == total_organizations
+    assert count_query(query, Organization, "cached") == total_organizations
+
+    db.session.add(Organization(name="Test Count Organization"))
+    db.session.commit()
+
+    assert count_query(query, Organization, "exact") == total_organizations + 1
+    assert count_query(query, Organization, "cached") == total_organizations
+    assert count_query(query, Organization, "estimate") == total_organizations
+
+    get_count_cache().clear()
+    assert count_query(query, Organization, "estimate") == total_organizations + 1
@@ -0,0 +1,44 @@
+def test_sliding_window_rate_limiter(test_client):
+    """
+    GIVEN a sliding window rate limiter with an in memory store
+    WHEN a key is hit more times than the limit
+    THEN check hits beyond the limit are rejected and other keys are unaffected
+    """
+    from app.server.utils.rate_limit import InMemoryRateLimitStore
+    from app.server.utils.rate_limit import SlidingWindowRateLimiter
+
+    rate_limiter = SlidingWindowRateLimiter(
+        InMemoryRateLimitStore(), limit=3, period=60
+    )
+
+    results = [rate_limiter.hit("login:email:admin@localhost.com") for _ in range(4)]
+    assert [is_allowed for is_allowed, _ in results] == [True, True, True, False]
+    assert 0 < results[-1][1] <= 60
+    assert rate_limiter.hit("login:email:client@localhost.com")[0]
+
+
+def test_rate_limit_rejects_before_view(test_client):
+    """
+    GIVEN a view decorated with rate_limit
+    WHEN an identifier exceeds its limit
+    THEN check the request is rejected with a 429 without running the view
+    """
+    from app.config import get_settings
+    from app.server.utils.rate_limit import rate_limit
+
+    calls = []
+
+    @rate_limit(scope="test_rate_limit", identifier_fields=["email"])
+    def view():
+        calls.append(True)
+        return "OK"
+
+    for _ in range(get_settings().RATE_LIMIT_IDENTIFIER_LIMIT + 1):
+        with test_client.application.test_request_context(
+            method="POST", json={"email": "admin@localhost.com"}
+        ):
+            response = view()
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert len(calls) == get_settings().RATE_LIMIT_IDENTIFIER_LIMIT
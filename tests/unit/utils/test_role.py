@@ -0,0 +1,28 @@
+def test_role_cache(test_client, seed_system_data, create_admin_user, count_queries):
+    """
+    GIVEN seeded roles
+    WHEN user roles are set
+    THEN check roles are loaded once per process and the cache is reloaded after being invalidated
+    """
+    from app.server import db
+    from app.server.models.role import Role
+    from app.server.utils.role import get_role_id
+    from app.server.utils.role import invalidate_role_cache
+
+    user = create_admin_user
+    admin_role_id = Role.query.filter_by(name="ADMIN").first().id
+    client_role_id = Role.query.filter_by(name="CLIENT").first().id
+
+    invalidate_role_cache()
+    with count_queries() as statements:
+        user.set_role("CLIENT")
+        user.set_role("ADMIN")
+    assert len(statements) == 1
+    assert user.role_id == admin_role_id
+    assert get_role_id("CLIENT") == client_role_id
+    db.session.commit()
+
+    invalidate_role_cache()
+    with count_queries() as statements:
+        assert get_role_id("ADMIN") == admin_role_id
+    assert len(statements) == 1
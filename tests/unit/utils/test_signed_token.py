@@ -0,0 +1,40 @@
+import pytest
+
+
+def test_token_signer(test_client):
+    """
+    GIVEN a token signer
+    WHEN tokens are signed, tampered with, verified by another signer or expire
+    THEN check only untampered, unexpired tokens signed with the same salt are verified
+    """
+    from datetime import timedelta
+
+    from app.config import get_settings
+    from app.server.exceptions import ExpiredSignedTokenException
+    from app.server.exceptions import InvalidSignedTokenException
+    from app.server.utils.signed_token import TokenSigner
+    from app.server.utils.signed_token import get_single_use_token_signer
+
+    payload = {"id": 1, "type": "reset_password"}
+    token = get_single_use_token_signer().sign(payload)
+    assert get_single_use_token_signer().verify(token) == payload
+
+    body, signature = token.split(".")
+    tampered_body = body[:-1] + ("A" if body[-1] != "A" else "B")
+    for invalid_token in [f"{tampered_body}.{signature}", body, "", "a.b.c"]:
+        with pytest.raises(InvalidSignedTokenException):
+            get_single_use_token_signer().verify(invalid_token)
+
+    other_signer = TokenSigner(
+        secret_key=get_settings().SECRET_KEY, salt="other", max_age=timedelta(days=1)
+    )
+    with pytest.raises(InvalidSignedTokenException):
+        other_signer.verify(token)
+
+    expired_signer = TokenSigner(
+        secret_key=get_settings().SECRET_KEY,
+        salt="single_use_token",
+        max_age=timedelta(seconds=-1),
+    )
+    with pytest.raises(ExpiredSignedTokenException):
+        get_single_use_token_signer().verify(expired_signer.sign(payload))
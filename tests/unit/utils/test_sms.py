@@ -0,0 +1,49 @@
+def test_coalesce_sms(test_client):
+    """
+    GIVEN queued sms messages
+    WHEN they are coalesced
+    THEN check messages with the same text are grouped into batches of unique recipients
+    """
+    from app.server.utils.sms import coalesce_sms
+
+    queued_messages = [
+        {"message": "Hello", "phone_number": "+254712345678"},
+        {"message": "Your code is 1234", "phone_number": "+254712345679"},
+        {"message": "Hello", "phone_number": "+254712345670"},
+        {"message": "Hello", "phone_number": "+254712345678"},
+        {"message": "Hello", "phone_number": "+254712345671"},
+    ]
+
+    assert coalesce_sms(queued_messages, max_recipients=2) == [
+        ("Hello", ["+254712345678", "+254712345670"]),
+        ("Hello", ["+254712345671"]),
+        ("Your code is 1234", ["+254712345679"]),
+    ]
+
+
+def test_send_queued_sms(test_client):
+    """
+    GIVEN queued sms messages and the fake sms provider
+    WHEN the worker sends queued sms messages
+    THEN check the queue is drained and messages with the same text are sent in one provider call
+    """
+    from app.server import get_redis_client
+    from app.server.utils.sms import enqueue_sms
+    from app.server.utils.sms import get_sms_provider
+    from app.server.utils.sms import SMS_QUEUE_KEY
+    from worker.tasks import send_queued_sms
+
+    get_redis_client().delete(SMS_QUEUE_KEY)
+    sms_provider = get_sms_provider()
+    sms_provider.sent_messages.clear()
+
+    enqueue_sms(message="Hello", phone_number="+254712345678")
+    enqueue_sms(message="Hello", phone_number="+254712345679")
+    enqueue_sms(message="Your code is 1234", phone_number="+254712345670")
+
+    assert send_queued_sms() == 3
+    assert get_redis_client().llen(SMS_QUEUE_KEY) == 0
+    assert sms_provider.sent_messages == [
+        {"message": "Hello", "recipients": ["+254712345678", "+254712345679"]},
+        {"message": "Your code is 1234", "recipients": ["+254712345670"]},
+    ]
@@ -0,0 +1,14 @@
+def test_template_engine_caches_templates(test_client):
+    """
+    GIVEN the application template engine
+    WHEN email templates are requested
+    THEN check compiled templates are reused across calls
+    """
+    from app.server import template_engine
+    from app.server.utils.templates import PRECOMPILED_TEMPLATES
+
+    assert template_engine.environment.bytecode_cache is not None
+    for template_file in PRECOMPILED_TEMPLATES:
+        assert template_engine.get_template(
+            template_file
+        ) is template_engine.get_template(template_file)
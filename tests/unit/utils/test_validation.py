@@ -0,0 +1,26 @@
+def test_validator_registry(test_client):
+    """
+    GIVEN the json schemas in app/server/schemas/json
+    WHEN request data is validated against them
+    THEN check each schema was compiled once and invalid data raises jsonschema validation errors
+    """
+    import pytest
+    from jsonschema.exceptions import ValidationError
+    from app.server.schemas.json.organization import organization_json_schema
+    from app.server.schemas.json.user import user_json_schema
+    from app.server.utils.validation import CompiledValidator
+    from app.server.utils.validation import load_json_schemas
+    from app.server.utils.validation import validate_request
+    from app.server.utils.validation import validator_registry
+
+    assert len(validator_registry) == len(load_json_schemas()) == 4
+    validator = validator_registry.get_validator(user_json_schema)
+    assert isinstance(validator, CompiledValidator)
+    assert validator is validator_registry.get_validator(user_json_schema)
+
+    validate_request(
+        instance={"name": "Test Organization"}, schema=organization_json_schema
+    )
+    with pytest.raises(ValidationError) as error:
+        validate_request(instance={"given_names": "Jane"}, schema=user_json_schema)
+    assert error.value.message == "'surname' is a required property"
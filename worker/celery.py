@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.schedules import crontab
 
 
 def make_celery(app):
@@ -7,6 +8,23 @@ def make_celery(app):
         app.import_name, backend=app.config["REDIS_URL"], broker=app.config["REDIS_URL"]
     )
     celery.conf.update(app.config)
+
+    # define periodic tasks
+    celery.conf.beat_schedule = {
+        "prune-expired-blacklisted-tokens": {
+            "task": "worker.tasks.prune_expired_blacklisted_tokens",
+            "schedule": crontab(minute=0),
+        },
+        "prune-expired-password-reset-tokens": {
+            "task": "worker.tasks.prune_expired_password_reset_tokens",
+            "schedule": crontab(minute=30),
+        },
+        "prune-expired-one-time-passwords": {
+            "task": "worker.tasks.prune_expired_one_time_passwords",
+            "schedule": crontab(minute=45),
+        },
+    }
+
     TaskBase = celery.Task
 
     class ContextTask(TaskBase):
@@ -1,36 +1,325 @@
+import io
+from datetime import datetime
+
 from celery.utils.log import get_task_logger
 from flask_mail import Message
 
+from app.config import get_settings
+from app.server import db
 from app.server import mailer
+from app.server.models.blacklisted_token import BlacklistedToken
+from app.server.models.one_time_password import OneTimePassword
+from app.server.models.password_reset_token import PasswordResetToken
+from app.server.utils.mail_queue import dequeue_emails
+from app.server.utils.mail_queue import get_max_emails_per_connection
+from app.server.utils.sms import coalesce_sms
+from app.server.utils.sms import dequeue_sms
+from app.server.utils.sms import get_sms_provider
 from worker import celery
 
 task_logger = get_task_logger(__name__)
 
 
+def _build_message(email: dict) -> Message:
+    if not email["mail_sender"]:
+        raise ValueError("Mail sender cannot be empty")
+
+    return Message(
+        subject=email["subject"],
+        recipients=email["email_recipients"],
+        sender=email["mail_sender"],
+        body=email.get("text_body"),
+        html=email.get("html_body"),
+    )
+
+
 @celery.task
-def send_email(mail_sender: str, email_recipients: list, subject: str, html_body=None):
+def send_email_batch(emails: list):
     """
+    Sends emails over a single mail server connection.
+    :param emails: list of emails as queued by enqueue_email.
+    :return: list of per email results.
+    """
+    results = []
+
+    try:
+        with mailer.connect() as connection:
+            for email in emails:
+                try:
+                    connection.send(_build_message(email))
+                    results.append(
+                        {
+                            "email_recipients": email["email_recipients"],
+                            "subject": email["subject"],
+                            "sent": True,
+                        }
+                    )
+                except Exception as exception:
+                    task_logger.error(f"Failed to send email: {exception}")
+                    results.append(
+                        {
+                            "email_recipients": email["email_recipients"],
+                            "subject": email["subject"],
+                            "sent": False,
+                            "error": str(exception),
+                        }
+                    )
+
+    # failing to open or close the connection fails any emails not yet attempted
+    except Exception as exception:
+        task_logger.error(f"Mail server connection failed: {exception}")
+        for email in emails[len(results) :]:
+            results.append(
+                {
+                    "email_recipients": email["email_recipients"],
+                    "subject": email["subject"],
+                    "sent": False,
+                    "error": str(exception),
+                }
+            )
 
-    :param email_recipients: a list of email address that will receive an email.
-    :param mail_sender: the email that the organization uses to send out emails.
-    :param subject: email subject
-    :param html_body: html version constituting email body
-    :return:
+    return results
+
+
+@celery.task
+def send_queued_emails():
     """
+    Drains the email queue, sending up to MAILER_MAX_EMAILS emails over each mail server connection.
+    :return: list of per email results.
+    """
+    results = []
 
-    if not mail_sender:
-        raise ValueError("Mail sender cannot be empty")
+    while True:
+        queued_emails = dequeue_emails(get_max_emails_per_connection())
+        if not queued_emails:
+            break
+        results.extend(send_email_batch(queued_emails))
 
+    return results
+
+
+@celery.task
+def send_template_email(
+    mail_type: str, email: str, given_names: str, organization_id: int, token: str
+):
+    """
+    Renders a template email in the worker and hands it to the mail handler, which queues it to be sent with any
+    other queued emails.
+    :param mail_type: type of email to render, eg: user_activation.
+    :param email: recipient email address.
+    :param given_names: the recipient's given names for mail personalization.
+    :param organization_id: id of the organization sending the email.
+    :param token: token embedded in the email's action url.
+    """
+    # imported here since the mailer module enqueues tasks from this module
+    from app.server.utils.mailer import get_organization_mailer
+    from app.server.utils.mailer import mail_handler
+
+    mailer_client = get_organization_mailer(organization_id)
+    subject, text_body, html_body = mailer_client.render_template_email(
+        mail_type=mail_type, given_names=given_names, token=token
+    )
+    # the mail handler only logs emails in development and testing deployments
+    mail_handler(
+        email_recipients=[email],
+        html_body=html_body,
+        mail_sender=mailer_client.mail_sender,
+        subject=subject,
+        text_body=text_body,
+    )
+
+
+@celery.task
+def import_users_file(job_id: str, import_format: str, default_public_identifier=None):
+    """
+    Imports users from the file uploaded for an import job and records the results against the job.
+    :param job_id: id of the import job, whose upload is read from redis.
+    :param import_format: one of csv or ndjson.
+    :param default_public_identifier: organization for rows without a public identifier.
+    """
+    # imported here since the user import module enqueues tasks from this module
+    from app.server.utils.user_import import import_users
+    from app.server.utils.user_import import pop_import_upload
+    from app.server.utils.user_import import set_import_job
+
+    contents = pop_import_upload(job_id)
+    if contents is None:
+        set_import_job(
+            job_id,
+            {"id": job_id, "status": "FAILED", "message": "Import file has expired."},
+        )
+        return
+
+    set_import_job(job_id, {"id": job_id, "status": "RUNNING"})
     try:
-        # build mail message
-        message = Message(
-            subject=subject, recipients=email_recipients, sender=mail_sender
+        result = import_users(
+            stream=io.StringIO(contents),
+            import_format=import_format,
+            default_public_identifier=default_public_identifier,
+        )
+    except Exception as exception:
+        set_import_job(
+            job_id, {"id": job_id, "status": "FAILED", "message": f"{exception}"}
         )
+        raise
+    set_import_job(job_id, {"id": job_id, "status": "COMPLETE", **result.to_dict()})
+
+
+@celery.task
+def send_user_import_notifications(user_ids: list):
+    """
+    Sends one time pins to imported mobile users and activation emails to imported admin users.
+    :param user_ids: ids of imported users to notify.
+    """
+    # imported here since these modules enqueue tasks from this module
+    from app.server.models.user import SignupMethod
+    from app.server.models.user import User
+    from app.server.utils.mailer import check_mailer_configured
+    from app.server.utils.mailer import get_organization_mailer
+    from app.server.utils.messaging import send_one_time_pin
+
+    users = (
+        User.query.execution_options(show_all=True).filter(User.id.in_(user_ids)).all()
+    )
+    for user in users:
+        try:
+            if user.signup_method == SignupMethod.MOBILE_SIGNUP:
+                send_one_time_pin(user=user)
+            elif (
+                user.role.name == "ADMIN"
+                and user.signup_method == SignupMethod.WEB_SIGNUP
+            ):
+                if not check_mailer_configured(user.parent_organization):
+                    task_logger.error(
+                        f"Mailer not configured, not sending activation email to user {user.id}"
+                    )
+                    continue
+                mailer = get_organization_mailer(user.parent_organization_id)
+                mailer.send_template_email(
+                    mail_type="user_activation",
+                    token=user.encode_single_use_jws(token_type="user_activation"),
+                    email=user.email,
+                    given_names=user.given_names,
+                )
+        except Exception as exception:
+            task_logger.error(f"Failed to notify imported user {user.id}: {exception}")
 
-        # get html body if present
-        message.html = html_body
+    # persist issued one time passwords
+    db.session.commit()
 
-        mailer.send(message)
 
+@celery.task
+def send_queued_sms():
+    """
+    Drains the sms queue, sending each distinct message to all its queued recipients in as few provider calls as
+    possible. Batches that fail to send are retried with backoff.
+    :return: number of messages sent.
+    """
+    sent_messages = 0
+
+    while True:
+        queued_messages = dequeue_sms(get_settings().SMS_MAX_BATCH_SIZE)
+        if not queued_messages:
+            break
+
+        for message, recipients in coalesce_sms(
+            queued_messages, get_settings().SMS_MAX_RECIPIENTS
+        ):
+            try:
+                get_sms_provider().send(message=message, recipients=recipients)
+                sent_messages += len(recipients)
+            except Exception as exception:
+                task_logger.error(f"Failed to send sms batch: {exception}")
+                send_sms_batch.apply_async(
+                    args=(message, recipients),
+                    countdown=get_settings().SMS_RETRY_BACKOFF,
+                )
+
+    return sent_messages
+
+
+@celery.task(bind=True, max_retries=5)
+def send_sms_batch(self, message: str, recipients: list):
+    """
+    :param message: sms text.
+    :param recipients: list of recipient phone numbers.
+    """
+    try:
+        get_sms_provider().send(message=message, recipients=recipients)
     except Exception as exception:
-        task_logger.error("An error occurred: {}".format(exception))
+        task_logger.error(f"Failed to send sms batch: {exception}")
+        raise self.retry(
+            exc=exception,
+            countdown=get_settings().SMS_RETRY_BACKOFF * 2**self.request.retries,
+        )
+
+
+def _prune_expired_tokens(token_model, batch_size: int) -> int:
+    """
+    Deletes rows whose expiry has passed, in batches to keep each transaction short.
+    :param token_model: model with an expires_at column.
+    :param batch_size: maximum number of rows deleted per transaction.
+    :return: number of deleted rows.
+    """
+    pruned_tokens = 0
+    now = datetime.utcnow()
+
+    while True:
+        expired_token_ids = [
+            token_id
+            for token_id, in db.session.query(token_model.id)
+            .filter(token_model.expires_at < now)
+            .limit(batch_size)
+        ]
+
+        if not expired_token_ids:
+            break
+
+        token_model.query.filter(token_model.id.in_(expired_token_ids)).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+        pruned_tokens += len(expired_token_ids)
+
+        if len(expired_token_ids) < batch_size:
+            break
+
+    return pruned_tokens
+
+
+@celery.task
+def prune_expired_blacklisted_tokens(batch_size: int = 1000):
+    """
+    Deletes blacklisted tokens whose expiry has passed. Expired tokens are rejected when decoded, so they no longer
+    need to be blacklisted. Rows are deleted in batches to keep each transaction short.
+    :param batch_size: maximum number of rows deleted per transaction.
+    :return: number of deleted rows.
+    """
+    pruned_tokens = _prune_expired_tokens(BlacklistedToken, batch_size)
+    task_logger.info(f"Pruned {pruned_tokens} expired blacklisted tokens.")
+    return pruned_tokens
+
+
+@celery.task
+def prune_expired_password_reset_tokens(batch_size: int = 1000):
+    """
+    Deletes password reset tokens that expired without being used.
+    :param batch_size: maximum number of rows deleted per transaction.
+    :return: number of deleted rows.
+    """
+    pruned_tokens = _prune_expired_tokens(PasswordResetToken, batch_size)
+    task_logger.info(f"Pruned {pruned_tokens} expired password reset tokens.")
+    return pruned_tokens
+
+
+@celery.task
+def prune_expired_one_time_passwords(batch_size: int = 1000):
+    """
+    Deletes one time passwords that expired without being verified. Expired one time passwords are rejected when
+    verified, and are otherwise only replaced when the user is issued a new one.
+    :param batch_size: maximum number of rows deleted per transaction.
+    :return: number of deleted rows.
+    """
+    pruned_one_time_passwords = _prune_expired_tokens(OneTimePassword, batch_size)
+    task_logger.info(f"Pruned {pruned_one_time_passwords} expired one time passwords.")
+    return pruned_one_time_passwords